@@ -1,17 +1,60 @@
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, PlainTextResponse, Response, StreamingResponse
 from pydantic import BaseModel
+from collections import OrderedDict
+from functools import partial
+from multiprocessing import get_context
+from pathlib import Path
+import json
+import os
+import time
+import uuid
 
-from src.aba_core import ABA
-from src.aba_transform import make_non_circular, make_atomic_sensitive
-from src.aba_attacks import compute_attacks, compute_attacks_sets
+from src.aba_pipeline import build_aba, explain, normalize_options, run_pipeline, stream_pipeline, view_graph
+from src.aba_binary import BinaryABA, framework_path, load
+from src.aba_query import GoalSolver
+from src.aba_cache import ResultCache, canonical_key
+from src.aba_session import ABASession
+from src.aba_batch import dumps_line, evaluate, run_batch
+from src.aba_control import BudgetExceeded, Control, Interrupted, merge_limits
+from src.aba_executor import Overloaded, SolverPool
+from src.aba_jobs import DONE, JobManager
+from src.aba_metrics import Metrics, Profile
 from src.utils import parse_any
 
 
 app = FastAPI()
 
+# cache des réponses de /api/aba/run (ABA_CACHE_SIZE, ABA_CACHE_DIR)
+cache = ResultCache.from_env()
+
+# sessions d'édition incrémentale (les plus anciennes sont oubliées au-delà de ABA_MAX_SESSIONS)
+sessions = OrderedDict()
+MAX_SESSIONS = int(os.environ.get("ABA_MAX_SESSIONS", "64"))
+
+# calculs hors de la boucle asyncio (ABA_WORKERS, ABA_MAX_QUEUE, ABA_TIMEOUT)
+pool = SolverPool.from_env()
+
+# calculs longs en arrière-plan (ABA_JOB_WORKERS, ABA_MAX_JOBS, ABA_JOB_TIMEOUT)
+jobs = JobManager.from_env()
+
+# lots : un seul pool de processus partagé par toutes les requêtes, créé au
+# premier lot (ABA_BATCH_WORKERS, défaut : nombre de cœurs, max 8)
+BATCH_WORKERS = int(os.environ.get("ABA_BATCH_WORKERS", "0")) or min(8, os.cpu_count() or 1)
+_batch_pool = None
+
+# mesures agrégées, exposées sur /metrics ; ABA_METRICS=1 profile tous les calculs
+# de /api/aba/run (sinon seulement ceux qui demandent "__options.profile")
+metrics = Metrics()
+PROFILE_ALL = os.environ.get("ABA_METRICS", "") not in ("", "0")
+
+# cadres précompilés (.abab, voir src.aba_binary) servis par nom depuis ABA_FRAMEWORKS_DIR,
+# ouverts une fois par mmap
+FRAMEWORKS_DIR = os.environ.get("ABA_FRAMEWORKS_DIR")
+frameworks = {}
+
 # CORS permissif (pour dev)
 app.add_middleware(
     CORSMiddleware,
@@ -23,6 +66,15 @@ app.add_middleware(
 # Sert le front depuis ./web
 app.mount("/web", StaticFiles(directory="web", html=False), name="web")
 
+@app.middleware("http")
+async def count_requests(request: Request, call_next):
+    response = await call_next(request)
+    endpoint = request.scope.get("endpoint")
+    if endpoint is not None and request.url.path.startswith("/api/"):
+        # nom de la fonction plutôt que le chemin (les ids ne font pas de séries)
+        metrics.request(endpoint.__name__, response.status_code)
+    return response
+
 @app.get("/")
 def index():
     return FileResponse("web/index.html") 
@@ -40,38 +92,448 @@ class RunInput(BaseModel):
 def health():
     return {"status": "ok"}
 
+def dumps(res):
+    # même rendu que JSONResponse
+    return json.dumps(res, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+def timeout_of(opts):
+    # "__options.timeout" (secondes), plafonné par ABA_TIMEOUT ; hors clé de cache
+    t = opts.get("timeout")
+    return None if t is None else float(t)
+
+async def solve(fn, *args, **kw):
+    """
+    Calcul dans le pool : 503 si la file est pleine, 504 si l'échéance est dépassée,
+    422 si un budget est dépassé (détail : ressource, limite, consommation, étape).
+    """
+    try:
+        return await pool.run(fn, *args, **kw)
+    except Overloaded as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except BudgetExceeded as e:
+        raise HTTPException(status_code=422, detail={"error": str(e), **e.info()})
+    except Interrupted as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def framework(name):
+    """Cadre binaire `name` de ABA_FRAMEWORKS_DIR (rouvert si le fichier a changé)."""
+    path = framework_path(FRAMEWORKS_DIR, name)
+    mtime = path.stat().st_mtime_ns
+    entry = frameworks.get(name)
+    if entry is None or entry[0] != mtime:
+        frameworks[name] = (mtime, load(path))
+        if entry is not None:
+            # fermée dès que les calculs qui la lisent encore ont fini
+            entry[1].retire()
+        entry = frameworks[name]
+    return entry[1]
+
+def parse_payload(payload):
+    """parse_any, plus {"framework": "<nom>", "__options": {...}} pour un cadre précompilé."""
+    if isinstance(payload, dict) and "framework" in payload:
+        return framework(payload["framework"]), payload.get("__options", {}) or {}
+    return parse_any(payload)
+
+@app.get("/api/aba/frameworks")
+def list_frameworks():
+    if not FRAMEWORKS_DIR or not Path(FRAMEWORKS_DIR).is_dir():
+        return {"frameworks": []}
+    return {"frameworks": sorted(p.stem for p in Path(FRAMEWORKS_DIR).glob("*.abab"))}
+
+@app.get("/api/aba/cache")
+def cache_stats():
+    return cache.stats()
+
+@app.get("/api/aba/pool")
+def pool_stats():
+    return pool.stats()
+
+@app.get("/metrics")
+def metrics_text():
+    p = pool.stats()
+    c = cache.stats()
+    gauges = {
+        "aba_pool_running": p["running"],
+        "aba_pool_queued": p["queued"],
+        "aba_cache_size": c["size"],
+        "aba_sessions": len(sessions),
+    }
+    counters = {
+        "aba_pool_rejected_total": p["rejected"],
+        "aba_pool_timeouts_total": p["timeouts"],
+        "aba_cache_hits_total": c["hits"],
+        "aba_cache_disk_hits_total": c["disk_hits"],
+        "aba_cache_misses_total": c["misses"],
+        "aba_cache_evictions_total": c["evictions"],
+        "aba_cache_disk_evictions_total": c["disk_evictions"],
+    }
+    return PlainTextResponse(metrics.render(gauges, counters), media_type="text/plain; version=0.0.4")
+
+def profiled(prof, data, opts, report):
+    """
+    run_pipeline sous le profil `prof` (étapes + compteurs), sérialisation
+    comprise ; report : ajouter le bloc "_profile" à la réponse.
+    """
+    with prof.active():
+        res = run_pipeline(data, opts)
+    with prof.stage("serialize"):
+        body = dumps(res)
+    metrics.record(prof)
+    if report:
+        # res est un objet JSON : le bloc est inséré avant l'accolade finale
+        body = body[:-1] + b',"_profile":' + dumps(prof.report()) + b"}"
+    return body
+
+async def ndjson(first, records, ctl, request):
+    # une erreur en cours de flux (statut 200 déjà envoyé) devient une ligne "error" ;
+    # le calcul passe par le pool paquet par paquet, annulé si le client part
+    yield dumps(first) + b"\n"
+    chunks = pool.pull(records, ctl)
+    try:
+        async for chunk in chunks:
+            yield b"".join(dumps(rec) + b"\n" for rec in chunk)
+            if await request.is_disconnected():
+                return
+    except BudgetExceeded as e:
+        yield dumps({"type": "error", "detail": str(e), **e.info()}) + b"\n"
+    except Exception as e:
+        yield dumps({"type": "error", "detail": str(e)}) + b"\n"
+    finally:
+        await chunks.aclose()
+
 @app.post("/api/aba/run")
 async def run(request: Request):
     try:
         payload = await request.json()
 
-        data, opts = parse_any(payload)
+        t0 = time.perf_counter()
+        data, opts = parse_payload(payload)
+        t_parse = time.perf_counter() - t0
+        timeout = timeout_of(opts)
+        stream = bool(opts.get("stream", False))
+        profile = bool(opts.get("profile", False))
+        opts = normalize_options(opts)
+
+        # même cadre (à l'ordre près des ensembles) + mêmes options => réponse en cache
+        key = canonical_key(data, opts, pool.limits)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if stream:
+        # "__options.stream" : NDJSON au fil du calcul, sans cache
+        # une seule échéance et les mêmes budgets pour tout le flux
+        records = stream_pipeline(data, opts)
+        ctl = Control(pool.limit(timeout), limits=merge_limits(pool.limits, opts["limits"]))
+        first = await solve(next, records, ctl=ctl)   # entrée invalide => 400
+        return StreamingResponse(ndjson(first, records, ctl, request), media_type="application/x-ndjson")
+
+    if profile:
+        # "__options.profile" : temps par étape et compteurs dans "_profile", sans cache
+        prof = Profile()
+        prof.add_time("parse", t_parse)
+        body = await solve(profiled, prof, data, opts, True, timeout=timeout)
+        return Response(content=body, media_type="application/json")
+
+    body = cache.get(key)
+    if body is None:
+        if PROFILE_ALL:
+            prof = Profile()
+            prof.add_time("parse", t_parse)
+            body = await solve(profiled, prof, data, opts, False, timeout=timeout)
+        else:
+            body = await solve(lambda: dumps(run_pipeline(data, opts)), timeout=timeout)
+        cache.put(key, body)
+    return Response(content=body, media_type="application/json")
+
+def batch_pool():
+    global _batch_pool
+    if _batch_pool is None:
+        # "spawn" : pas de fork d'un serveur multi-thread
+        _batch_pool = get_context("spawn").Pool(BATCH_WORKERS)
+    return _batch_pool
+
+@app.post("/api/aba/batch")
+async def batch(request: Request):
+    """
+    Lot de cadres : {"items": [<payload comme /api/aba/run, {"framework": nom} compris> ou texte, ...],
+    "__options": {...}, "workers": n, "chunksize": k} ; workers plafonné par
+    ABA_BATCH_WORKERS (1 = sans processus).
+    Réponse NDJSON, une ligne par cadre dès qu'il est calculé (champ "index").
+    """
+    try:
+        payload = await request.json()
+        items = payload.get("items")
+        if not isinstance(items, list):
+            raise ValueError("champ 'items' (liste) manquant")
+        opts = payload.get("__options", {}) or {}
+        workers = int(payload.get("workers", BATCH_WORKERS))
+        if workers < 1:
+            raise ValueError("workers >= 1 attendu")
+        workers = min(workers, BATCH_WORKERS)
+        chunksize = int(payload.get("chunksize", 1))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # échéance et budgets du serveur appliqués à chaque élément (dans son processus) ;
+    # le lot est tiré ligne par ligne dans le pool de calcul (admission comme /run)
+    task = partial(evaluate, limits=pool.limits, timeout=pool.timeout, frameworks_dir=FRAMEWORKS_DIR)
+    results = run_batch(items, opts, workers, chunksize, task=task,
+                        pool=batch_pool() if workers > 1 else None)
+    chunks = pool.pull(results, Control(), size=1)
+    try:
+        first = await chunks.__anext__()
+    except StopAsyncIteration:
+        first = []
+    except Overloaded as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+
+    async def lines():
+        try:
+            for line in first:
+                yield dumps_line(line)
+            async for chunk in chunks:
+                for line in chunk:
+                    yield dumps_line(line)
+        except Exception as e:
+            yield dumps_line({"error": str(e)})
+        finally:
+            await chunks.aclose()
 
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+@app.post("/api/aba/query")
+async def query(request: Request):
+    """
+    Question sur un ou plusieurs littéraux (chaînage arrière) :
+    {"input": ..., "goal": "p"} ou {"input": ..., "goals": ["p", "q"]}
+    """
+    try:
+        payload = await request.json()
+        goals = payload["goals"] if "goals" in payload else [payload.get("goal")]
+        if not isinstance(goals, list) or not goals:
+            raise ValueError("goals : liste de littéraux attendue")
+        if not all(isinstance(g, str) and g for g in goals):
+            raise ValueError("goal manquant")
+        payload = {k: v for k, v in payload.items() if k not in ("goal", "goals")}
+
+        data, opts = parse_payload(payload)
         do_non_circular = bool(opts.get("do_non_circular", False))
         do_atomic       = bool(opts.get("do_atomic", False))
         use_prefs       = bool(opts.get("use_preferences", True))
+        credulous       = bool(opts.get("credulous", True))
+        timeout         = timeout_of(opts)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-        # pour onstruire ABA avec les infos recup dans data 
-        aba = ABA.from_dict(data)
-        aba.validate()
-
-        if do_non_circular:
-            make_non_circular(aba)
-        if do_atomic:
-            make_atomic_sensitive(aba)
-
-        args = aba.derive_arguments()
-        atks = compute_attacks(aba, args, use_preferences=use_prefs)
-        atks_sets = compute_attacks_sets(aba, args) if use_prefs else []
+    def answer():
+        solver = GoalSolver(build_aba(data, do_non_circular, do_atomic))
+        return [solver.query(g, use_preferences=use_prefs, credulous=credulous) for g in goals]
 
-        res = aba.export_results(args, atks)
-        res["attacks_sets"] = atks_sets
-        res["_options"] = {
+    return {
+        "queries": await solve(answer, timeout=timeout),
+        "_options": {
             "do_non_circular": do_non_circular,
             "do_atomic": do_atomic,
             "use_preferences": use_prefs,
-        }
-        return res
+            "credulous": credulous,
+        },
+    }
+
+@app.post("/api/aba/explain")
+async def explain_arguments(request: Request):
+    """
+    Dérivations (arbres de preuve) à la demande, sur le DAG partagé :
+    {"input": ..., "arguments": [ids], "depth": n, "tree": false}
+    ou {"input": ..., "nodes": [ids de la frontière], "depth": n} pour développer la suite.
+    """
+    try:
+        payload = await request.json()
+        ids = payload.get("arguments")
+        roots = payload.get("nodes")
+        depth = payload.get("depth")
+        tree = bool(payload.get("tree", False))
+        for v in (ids or []) + (roots or []):
+            if not isinstance(v, int):
+                raise ValueError("ids entiers attendus")
+        if depth is not None:
+            depth = int(depth)
+        payload = {k: v for k, v in payload.items() if k not in ("arguments", "nodes", "depth", "tree")}
+
+        data, opts = parse_payload(payload)
+        timeout = timeout_of(opts)
+        opts = normalize_options(opts)
+        key = canonical_key(data, {**opts, "explain": [ids, roots, depth, tree]})
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    body = cache.get(key)
+    if body is None:
+        body = await solve(lambda: dumps(explain(data, opts, ids, roots, depth, tree)), timeout=timeout)
+        cache.put(key, body)
+    return Response(content=body, media_type="application/json")
+
+@app.post("/api/aba/graph")
+async def graph(request: Request):
+    """
+    Graphe d'attaques condensé pour l'affichage, avec coordonnées :
+    {"input": ..., "group": "auto", "center": [ids], "radius": 1, "max_nodes": 200, "layout": true}
+    (regroupements et voisinage : voir src.aba_view).
+    """
+    try:
+        payload = await request.json()
+        group = str(payload.get("group", "auto"))
+        center = payload.get("center")
+        if isinstance(center, int):
+            center = [center]
+        for v in center or []:
+            if not isinstance(v, int):
+                raise ValueError("ids entiers attendus")
+        radius = int(payload.get("radius", 1))
+        max_nodes = int(payload.get("max_nodes", 200))
+        layout = bool(payload.get("layout", True))
+        if radius < 0 or max_nodes < 1:
+            raise ValueError("radius >= 0 et max_nodes >= 1 attendus")
+        view = [group, center, radius, max_nodes, layout]
+        payload = {k: v for k, v in payload.items() if k not in ("group", "center", "radius", "max_nodes", "layout")}
 
+        data, opts = parse_payload(payload)
+        timeout = timeout_of(opts)
+        opts = normalize_options(opts)
+        key = canonical_key(data, {**opts, "graph": view})
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+
+    body = cache.get(key)
+    if body is None:
+        body = await solve(lambda: dumps(view_graph(data, opts, *view)), timeout=timeout)
+        cache.put(key, body)
+    return Response(content=body, media_type="application/json")
+
+def _session(sid):
+    sess = sessions.get(sid)
+    if sess is None:
+        raise HTTPException(status_code=404, detail="session inconnue")
+    sessions.move_to_end(sid)
+    return sess
+
+def _session_results(sid, sess, changes=None):
+    with sess.lock:
+        res = sess.results()
+    res["session"] = sid
+    if changes is not None:
+        res["changes"] = changes
+    res["_options"] = {
+        "use_preferences": sess.use_preferences,
+        "attacks_sets_mode": sess.sets_mode,
+    }
+    return res
+
+@app.post("/api/aba/sessions")
+async def create_session(request: Request):
+    """Crée une session (même entrée que /api/aba/run) et renvoie son id et ses résultats."""
+    try:
+        payload = await request.json()
+        data, opts = parse_payload(payload)
+        timeout = timeout_of(opts)
+        opts = normalize_options(opts)
+        if opts["do_non_circular"] or opts["do_atomic"]:
+            raise ValueError("sessions : transformations non supportées")
+        if isinstance(data, BinaryABA):
+            data.check_options()
+            data = data.to_dict()
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    sess = await solve(ABASession, data, opts["use_preferences"], opts["attacks_sets_mode"],
+                       timeout=timeout)
+    sid = uuid.uuid4().hex
+    sessions[sid] = sess
+    while len(sessions) > MAX_SESSIONS:
+        sessions.popitem(last=False)
+    return await solve(_session_results, sid, sess, timeout=timeout)
+
+@app.get("/api/aba/sessions/{sid}")
+async def get_session(sid: str):
+    return await solve(_session_results, sid, _session(sid))
+
+@app.post("/api/aba/sessions/{sid}/edits")
+async def edit_session(sid: str, request: Request):
+    """
+    Applique des éditions : {"edits": [{"op": "add_rule", "head": ..., "body": [...]},
+    {"op": "remove_rule", "index": k}, {"op": "set_contrary", "assumption": ..., "contrary": ...},
+    {"op": "set_preferences", "preferences": "a > b"}]}
+    Tout ou rien : si une édition échoue, la session reste inchangée (400).
+    """
+    sess = _session(sid)
+    try:
+        payload = await request.json()
+        edits = payload.get("edits", [])
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    def apply():
+        with sess.lock:
+            return sess.apply_all(edits)
+
+    # une édition interrompue laisserait la session incohérente : pas d'échéance
+    changes = await solve(apply, deadline=False)
+    return await solve(_session_results, sid, sess, changes)
+
+@app.delete("/api/aba/sessions/{sid}")
+def delete_session(sid: str):
+    if sessions.pop(sid, None) is None:
+        raise HTTPException(status_code=404, detail="session inconnue")
+    return {"deleted": sid}
+
+def _job(job_id):
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="job inconnu")
+    return job
+
+@app.post("/api/aba/jobs", status_code=202)
+async def submit_job(request: Request):
+    """
+    Soumet un calcul (même entrée que /api/aba/run) et renvoie aussitôt son id.
+    Suivi : GET /api/aba/jobs/{id} ; résultat : GET /api/aba/jobs/{id}/result.
+    """
+    try:
+        payload = await request.json()
+        data, opts = parse_payload(payload)
+        opts = normalize_options(opts)
+        key = canonical_key(data, opts, jobs.limits)
+        body = cache.get(key)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if body is not None:
+        return jobs.completed(body).info()
+    try:
+        job = jobs.submit(lambda: dumps(run_pipeline(data, opts)),
+                          on_done=lambda body: cache.put(key, body))
+    except Overloaded as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    return job.info()
+
+@app.get("/api/aba/jobs")
+def job_stats():
+    return jobs.stats()
+
+@app.get("/api/aba/jobs/{job_id}")
+def job_status(job_id: str):
+    return _job(job_id).info()
+
+@app.get("/api/aba/jobs/{job_id}/result")
+def job_result(job_id: str):
+    job = _job(job_id)
+    if job.status != DONE:
+        # pas (encore) de résultat : 409 avec l'état courant
+        raise HTTPException(status_code=409, detail=job.info())
+    return Response(content=job.result, media_type="application/json")
+
+@app.post("/api/aba/jobs/{job_id}/cancel")
+def cancel_job(job_id: str):
+    _job(job_id)
+    return jobs.cancel(job_id).info()
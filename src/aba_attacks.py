@@ -1,14 +1,8 @@
+from itertools import combinations, islice
+from src.aba_compiled import compile_arguments, iter_bits
+from src.aba_control import BudgetExceeded, current
+from src.aba_metrics import current as current_profile
 
-def _is_strictly_less(x, y, prefs):
-    """
-    True si x est STRICTEMENT moins préféré que y (rang(x) > rang(y)).
-    Si l'un n'a pas de rang => incomparables => False.
-    """
-    rx = prefs.get(x, None)
-    ry = prefs.get(y, None)
-    if rx is None or ry is None:
-        return False
-    return rx > ry  # rang 0 = meilleur
 
 def compute_attacks(aba, args, use_preferences=False):
     """
@@ -18,54 +12,305 @@ def compute_attacks(aba, args, use_preferences=False):
         * Normal: A -> B si, pour ce b, aucun a ∈ Supp(A) n'est STRICTEMENT moins préféré que b.
         * Reverse: sinon (B -> A).
       On agrège par paire (A,B): priorité au 'normal', sinon 'reverse' (au plus 1 arête par paire).
+    Travaille sur la forme compilée (supports en masques, témoins en bits).
+    Les paires candidates viennent de la jointure contrary(b) = concl(A) :
+    index conclusion -> attaquants, assumption -> arguments qui la contiennent.
     """
-    pair = {}  # (i,j) -> {"normal": set(witness), "reverse": set(witness)}
-
-    def reg(kind, i, j, w):
-        entry = pair.setdefault((i, j), {"normal": set(), "reverse": set()})
-        entry[kind].add(w)
-
-    for A in args:
-        i = A["id"]; conclA = A["conclusion"]; suppA = A["assumptions"]
-        for B in args:
-            j = B["id"]; suppB = B["assumptions"]
-            for b in suppB:
-                if aba.contraries.get(b) != conclA:
-                    continue
-                if not use_preferences:
-                    reg("normal", i, j, b)
+    fw, args = compile_arguments(aba, args)
+    worse = fw.worse
+    ctl = current()
+    prof = current_profile()
+    examined = 0
+
+    by_concl = {}
+    by_asm = {}
+    for pos, A in enumerate(args):
+        by_concl.setdefault(A.concl, []).append(pos)
+        for b in iter_bits(A.mask):
+            by_asm.setdefault(b, []).append(pos)
+
+    # (i,j) -> [bits normaux, bits reverse, rang du 1er événement]
+    # le rang de (posA, posB, b) reproduit l'ordre de l'ancien parcours A, B, b
+    n_args = len(args)
+    n_asm = fw.n_assumptions
+    pair = {}
+
+    def reg(key, kind, bit, at):
+        entry = pair.get(key)
+        if entry is None:
+            pair[key] = entry = [0, 0, at]
+        elif at < entry[2]:
+            entry[2] = at
+        entry[kind] |= bit
+
+    for b, c in enumerate(fw.contrary):
+        if ctl is not None:
+            ctl.progress("attacks", b, n_asm)
+        if c < 0 or c not in by_concl or b not in by_asm:
+            continue
+        bit = 1 << b
+        wb = worse[b] if use_preferences else 0
+        targets = by_asm[b]
+        examined += len(targets) * len(by_concl[c])
+        for pa in by_concl[c]:
+            if ctl is not None:
+                ctl.checkpoint()
+            A = args[pa]
+            # préférence évaluée une seule fois par (support attaquant, témoin)
+            less = A.mask & wb
+            i = A.id
+            for pb in targets:
+                j = args[pb].id
+                if less:
+                    reg((j, i), 1, bit, (pa * n_args + pb) * n_asm + b)  # inversion
                 else:
-                    any_less = any(_is_strictly_less(a, b, aba.preferences) for a in suppA)
-                    if any_less:
-                        reg("reverse", j, i, b)  # inversion
-                    else:
-                        reg("normal", i, j, b)
+                    reg((i, j), 0, bit, (pa * n_args + pb) * n_asm + b)
 
-    attacks = []
-    seen = set()
-    for (i, j), kinds in pair.items():
-        if kinds["normal"]:
-            w = sorted(kinds["normal"])[0]
-            key = (i, j, "normal", w)
-            if key not in seen:
-                seen.add(key)
-                attacks.append({"attacker": i, "target": j, "kind": "normal", "witness": w})
-        elif kinds["reverse"]:
-            w = sorted(kinds["reverse"])[0]
-            key = (i, j, "reverse", w)
-            if key not in seen:
-                seen.add(key)
-                attacks.append({"attacker": i, "target": j, "kind": "reverse", "witness": w})
+    if prof is not None:
+        prof.count("attack_pairs", examined)
+    ordered = sorted(pair.items(), key=lambda kv: kv[1][2])
+    return _aggregate(fw, ordered)
+
+
+def iter_attacks(aba, args, use_preferences=False):
+    """
+    Version flux de compute_attacks : mêmes arêtes (même type, même témoin),
+    produites attaquant par attaquant, triées par (id attaquant, id cible).
+    Pour l'attaquant A, la paire (A,B) réunit :
+      - les attaques normales de A sur B (concl(A) = contrary(b), b ∈ Supp(B)) ;
+      - les attaques de B sur A inversées par les préférences (reverse).
+    Seules les arêtes d'un attaquant sont en mémoire à la fois.
+    """
+    fw, args = compile_arguments(aba, args)
+    worse = fw.worse if use_preferences else [0] * fw.n_assumptions
+    names = fw.asm_names
+    ctl = current()
+    prof = current_profile()
+
+    by_concl = {}
+    by_asm = {}
+    for pos, A in enumerate(args):
+        by_concl.setdefault(A.concl, []).append(pos)
+        for b in iter_bits(A.mask):
+            by_asm.setdefault(b, []).append(pos)
+    witnesses = {}   # conclusion -> bits b tels que contrary(b) = conclusion
+    for b, c in enumerate(fw.contrary):
+        if c >= 0:
+            witnesses.setdefault(c, []).append(b)
 
+    for k, pa in enumerate(sorted(range(len(args)), key=lambda p: args[p].id)):
+        if ctl is not None:
+            ctl.progress("attacks", k, len(args))
+            ctl.checkpoint()
+        A = args[pa]
+        row = {}   # id cible -> [bits normaux, bits reverse]
+        for b in witnesses.get(A.concl, ()):
+            if A.mask & worse[b]:
+                continue
+            for pb in by_asm.get(b, ()):
+                row.setdefault(args[pb].id, [0, 0])[0] |= 1 << b
+        for b in iter_bits(A.mask):
+            c = fw.contrary[b]
+            wb = worse[b]
+            if c < 0 or not wb:
+                continue
+            for pb in by_concl.get(c, ()):
+                B = args[pb]
+                if B.mask & wb:
+                    row.setdefault(B.id, [0, 0])[1] |= 1 << b
+        if prof is not None:
+            prof.count("attack_pairs", len(row))
+        for j in sorted(row):
+            normal, reverse = row[j]
+            bits, kind = (normal, "normal") if normal else (reverse, "reverse")
+            w = (bits & -bits).bit_length() - 1
+            yield {"attacker": A.id, "target": j, "kind": kind, "witness": names[w]}
+
+
+def _aggregate(fw, pair):
+    """
+    pair : suite de ((i,j), [bits normaux, bits reverse, ...]) dans l'ordre de sortie.
+    Une arête par paire : 'normal' prioritaire, sinon 'reverse' ;
+    témoin = plus petite assumption (plus petit bit).
+    """
+    attacks = []
+    for (i, j), (normal, reverse, *_) in pair:
+        if normal:
+            w = (normal & -normal).bit_length() - 1
+            attacks.append({"attacker": i, "target": j, "kind": "normal", "witness": fw.asm_names[w]})
+        elif reverse:
+            w = (reverse & -reverse).bit_length() - 1
+            attacks.append({"attacker": i, "target": j, "kind": "reverse", "witness": fw.asm_names[w]})
     return attacks
 
 
-def _rank_of(x, prefs):
-    """rang plus petit = plus préféré. Retourne None si inconnue."""
-    return prefs.get(x, None)
+class SetAttacks:
+    """
+    Attaques entre coalitions X,Y ⊆ A sous forme compacte ("up-closed").
+    Les attaques sont fermées vers le haut : si X attaque Y, tout X' ⊇ X attaque
+    tout Y' ⊇ Y. On ne garde donc que les générateurs issus des supports minimaux :
+      - normal  (S, y)  : S support de overline(y) sans x' ∈ S strictement moins
+                          préféré que y  => tout X ⊇ S attaque tout Y ∋ y ;
+      - reverse (x, S') : S' support de overline(x) avec un y' ∈ S' strictement
+                          moins préféré que x => tout X ∋ x attaque tout Y ⊇ S'.
+    Coalitions et supports sont des masques (voir CompiledABA).
+    Sans préférences, tous les générateurs sont normaux.
+    """
+
+    __slots__ = ("fw", "normal", "reverse")
+
+    def __init__(self, fw, args, use_preferences=True):
+        self.fw = fw
+        # existe x' ∈ S strictement moins préféré que y : S & worse[y]
+        # (non comparable : pas de preuve d'infériorité)
+        worse = fw.worse if use_preferences else [0] * fw.n_assumptions
+
+        concl2supports = {}
+        for a in args:
+            concl2supports.setdefault(a.concl, []).append(a.mask)
+
+        self.normal = []   # (S, y)
+        self.reverse = []  # (x, S')
+        for y, over_y in enumerate(fw.contrary):
+            if over_y < 0:
+                continue
+            for S in concl2supports.get(over_y, ()):
+                if S & worse[y]:
+                    self.reverse.append((y, S))
+                else:
+                    self.normal.append((S, y))
+
+    @classmethod
+    def from_generators(cls, fw, normal, reverse):
+        """Construit directement à partir de générateurs (S, y) / (x, S') déjà calculés."""
+        sa = cls.__new__(cls)
+        sa.fw = fw
+        sa.normal = list(normal)
+        sa.reverse = list(reverse)
+        return sa
+
+    def _mask(self, coalition):
+        return coalition if isinstance(coalition, int) else self.fw.mask_of(coalition)
+
+    def normal_witnesses(self, X):
+        """Masque des y tels que X attaque (normal) toute coalition contenant y."""
+        w = 0
+        for S, y in self.normal:
+            if S & X == S:
+                w |= 1 << y
+        return w
+
+    def reverse_witnesses(self, Y):
+        """Masque des x tels que toute coalition contenant x attaque (reverse) Y."""
+        w = 0
+        for x, S in self.reverse:
+            if S & Y == S:
+                w |= 1 << x
+        return w
+
+    def attack(self, X, Y):
+        """
+        X attaque-t-il Y ? X, Y : masques ou itérables de noms.
+        Retourne l'entrée {"X", "Y", "kind", "witness"} ou None.
+        """
+        X = self._mask(X)
+        Y = self._mask(Y)
+        return self._entry(X, Y, self.normal_witnesses(X) & Y, self.reverse_witnesses(Y) & X)
+
+    def _entry(self, X, Y, nw, rw):
+        # both si les deux ; témoin = plus petit bit (plus petit nom), normal en priorité
+        if nw and rw:
+            kind, w = "both", nw
+        elif nw:
+            kind, w = "normal", nw
+        elif rw:
+            kind, w = "reverse", rw
+        else:
+            return None
+        fw = self.fw
+        return {
+            "X": fw.sorted_names_of(X),
+            "Y": fw.sorted_names_of(Y),
+            "kind": kind,
+            "witness": fw.asm_names[(w & -w).bit_length() - 1]
+        }
+
+    def minimal(self):
+        """
+        Générateurs minimaux : chaque entrée (X0, Y0) vaut pour tous X ⊇ X0, Y ⊇ Y0.
+        Taille linéaire en nombre d'arguments (pas d'énumération des coalitions).
+        """
+        fw = self.fw
+        out = []
+        for S, y in self.normal:
+            out.append({"X": fw.sorted_names_of(S), "Y": [fw.asm_names[y]],
+                        "kind": "normal", "witness": fw.asm_names[y]})
+        for x, S in self.reverse:
+            out.append({"X": [fw.asm_names[x]], "Y": fw.sorted_names_of(S),
+                        "kind": "reverse", "witness": fw.asm_names[x]})
+        return out
+
+    def coalitions(self):
+        """Toutes les coalitions, par taille puis ordre lexicographique des bits."""
+        n = self.fw.n_assumptions
+        for r in range(n + 1):
+            for comb in combinations(range(n), r):
+                m = 0
+                for b in comb:
+                    m |= 1 << b
+                yield m
+
+    def iter_expanded(self, offset=0, limit=None):
+        """
+        Énumère (en flux) toutes les paires (X,Y) qui s'attaquent, dans le même
+        ordre que la liste complète. offset/limit permettent de paginer.
+        Chaque paire coûte deux ET binaires ; le nombre de paires reste 4^|A|.
+        Le nombre d'entrées d'une ligne n'est connu qu'après l'avoir parcourue :
+        les lignes avant `offset` sont donc examinées (comptées sans construire
+        d'entrée), une page lointaine coûte autant de ET que les précédentes.
+        Budget "pairs" débité ligne par ligne ; en mode partiel, l'énumération
+        s'arrête à la dernière ligne permise.
+        """
+        coalitions = list(self.coalitions())
+        rev = [self.reverse_witnesses(Y) for Y in coalitions]
+        ctl = current()
+        prof = current_profile()
+
+        n = len(coalitions)
+
+        def gen(skip):
+            for row, X in enumerate(coalitions):
+                if ctl is not None:
+                    ctl.progress("attacks_sets", row * n, n * n)
+                    ctl.check()   # une ligne = 2^|A| paires : test à chaque ligne
+                    try:
+                        ctl.spend("pairs", n)
+                    except BudgetExceeded as e:
+                        ctl.truncate(e)
+                        return
+                if prof is not None:
+                    prof.count("coalitions", n)
+                wn = self.normal_witnesses(X)
+                if skip:
+                    k = sum(1 for Y, wr in zip(coalitions, rev) if wn & Y or wr & X)
+                    if k <= skip:
+                        skip -= k
+                        continue
+                for Y, wr in zip(coalitions, rev):
+                    nw = wn & Y
+                    rw = wr & X
+                    if nw or rw:
+                        if skip:
+                            skip -= 1
+                            continue
+                        yield self._entry(X, Y, nw, rw)
+            if ctl is not None:
+                ctl.progress("attacks_sets", n * n, n * n)
+
+        return islice(gen(offset), limit)
 
 
-def compute_attacks_sets(aba, args):
+def compute_attacks_sets(aba, args, mode="full"):
     """
     Calcule les attaques entre coalitions X,Y ⊆ A (assumptions).
     Pour chaque paire (X,Y) on regarde :
@@ -75,106 +320,33 @@ def compute_attacks_sets(aba, args):
         et il existe y' ∈ leaves(t) tel que y' < x (i.e. x est mieux que y').
     On renvoie une liste d'entrées dict:
       {"X": sorted list, "Y": sorted list, "kind": "normal"|"reverse"|"both", "witness": elem}
+    mode :
+      - "full"    : toutes les paires (X,Y) (4^|A| paires examinées) ;
+      - "minimal" : seulement les générateurs minimaux (voir SetAttacks.minimal).
     """
-    # index: conclusion -> list of supports (sets)
-    concl2supports = {}
-    for a in args:
-        concl2supports.setdefault(a["conclusion"], []).append(set(a["assumptions"]))
-
-    A = set(aba.assumptions)
-    prefs = aba.preferences or {}
-
-    # on va considérer toutes les coalitions "utiles" — ici : toutes les subsets des assumptions
-    # (pour petits A, ok; si A large -> à optimiser)
-    def all_subsets(s):
-        lst = list(s)
-        for r in range(len(lst)+1):
-            from itertools import combinations
-            for comb in combinations(lst, r):
-                yield set(comb)
-
-    coalitions = list(all_subsets(A))
-
-    results = []
-
-    # helper to pretty key
-    def key_set(S):
-        return tuple(sorted(S))
-
-    # pour chaque paire X,Y
-    for X in coalitions:
-        for Y in coalitions:
-            normal_witnesses = set()
-            reverse_witnesses = set()
-
-            # NORMAL: exists y in Y and exists support S (subset of X) s.t. cl(S) = overline(y)
-            for y in Y:
-                over_y = aba.contraries.get(y)
-                if not over_y:
-                    continue
-                supports = concl2supports.get(over_y, [])
-                for S in supports:
-                    if not S.issubset(X):
-                        continue
-                    # condition normal: aucun x' in S tel que x' strictly less preferred than y
-                    #  NOT exists x' with _rank_of(x') > _rank_of(y)
-                    any_worse = False
-                    for xp in S:
-                        # xp is strictly less preferred than y <=> xp has rank > y
-                        r_xp = _rank_of(xp, prefs)
-                        r_y = _rank_of(y, prefs)
-                        if r_xp is None or r_y is None:
-                            # si non comparable, on considère qu'il n'y a pas de preuve d'infiriorité
-                            continue
-                        if r_xp > r_y:
-                            any_worse = True
-                            break
-                    if not any_worse:
-                        normal_witnesses.add(y)
-
-            # REVERSE: exists x in X and exists support S' subset of Y s.t. cl(S') = overline(x)
-            #            and exists y' in S' with y' strictly less preferred than x (i.e. x better than y')
-            for x in X:
-                over_x = aba.contraries.get(x)
-                if not over_x:
-                    continue
-                supports = concl2supports.get(over_x, [])
-                for Sprime in supports:
-                    if not Sprime.issubset(Y):
-                        continue
-                    # condition reverse: exists y' in Sprime s.t. y' < x (y' strictly less preferred than x)
-                    exist_yprime_weaker = False
-                    for yp in Sprime:
-                        r_yp = _rank_of(yp, prefs)
-                        r_x = _rank_of(x, prefs)
-                        if r_yp is None or r_x is None:
-                            continue
-                        if r_yp > r_x:
-                            exist_yprime_weaker = True
-                            break
-                    if exist_yprime_weaker:
-                        reverse_witnesses.add(x)
-
-            # build result: both if both non-empty
-            kind = None
-            witness = None
-            if normal_witnesses and reverse_witnesses:
-                kind = "both"
-                # choose deterministic witness (smallest by name)
-                witness = sorted(list(normal_witnesses))[0]
-            elif normal_witnesses:
-                kind = "normal"
-                witness = sorted(list(normal_witnesses))[0]
-            elif reverse_witnesses:
-                kind = "reverse"
-                witness = sorted(list(reverse_witnesses))[0]
-
-            if kind is not None:
-                results.append({
-                    "X": sorted(list(X)),
-                    "Y": sorted(list(Y)),
-                    "kind": kind,
-                    "witness": witness
-                })
-
-    return results
+    sa = set_attacks(aba, args)
+    if mode == "minimal":
+        return sa.minimal()
+    if mode != "full":
+        raise ValueError(f"mode d'attaques par coalitions inconnu: {mode}")
+    return list(sa.iter_expanded())
+
+
+def set_attacks(aba, args, use_preferences=True):
+    """Construit la représentation compacte SetAttacks."""
+    fw, args = compile_arguments(aba, args)
+    return SetAttacks(fw, args, use_preferences)
+
+
+def iter_attacks_sets(aba, args, offset=0, limit=None, mode="full"):
+    """
+    Version flux/paginée de compute_attacks_sets : "full" énumère en flux
+    (voir SetAttacks.iter_expanded pour le coût de offset), "minimal" pagine
+    la liste des générateurs.
+    """
+    sa = set_attacks(aba, args)
+    if mode == "minimal":
+        return islice(sa.minimal(), offset, None if limit is None else offset + limit)
+    if mode != "full":
+        raise ValueError(f"mode d'attaques par coalitions inconnu: {mode}")
+    return sa.iter_expanded(offset, limit)
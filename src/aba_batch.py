@@ -0,0 +1,175 @@
+"""
+Évaluation par lots : beaucoup de cadres ABA répartis sur un pool de processus,
+résultats rendus au fil de l'eau (une ligne JSON par cadre, NDJSON).
+
+    python -m src.aba_batch data/*.txt --workers 4 --chunksize 8 > out.ndjson
+    python -m src.aba_batch data/ --compile compiled/     # -> compiled/*.abab
+"""
+from functools import partial
+from itertools import islice
+from multiprocessing import get_context
+from pathlib import Path
+import argparse
+import json
+import os
+import sys
+
+from src.aba_binary import framework_path, load
+from src.aba_control import BudgetExceeded, Control, cap_timeout
+from src.aba_pipeline import compile_binary, normalize_options, run_pipeline
+from src.utils import parse_any
+
+
+def _source(payload, frameworks_dir=None):
+    """
+    Payload d'un élément -> (chemin .abab ou None, payload pour parse_any, options propres).
+    Un Path est lu ici, dans le worker (.abab : ouvert par mmap ; sinon texte) ;
+    {"framework": nom, "__options": ...} est résolu dans `frameworks_dir` comme
+    par /api/aba/run.
+    """
+    if isinstance(payload, dict) and "framework" in payload:
+        path = framework_path(frameworks_dir, payload["framework"])
+        return path, None, payload.get("__options", {}) or {}
+    if isinstance(payload, Path):
+        if payload.suffix == ".abab":
+            return payload, None, {}
+        payload = payload.read_text(encoding="utf-8")
+    if isinstance(payload, str):
+        payload = {"input": payload}
+    return None, payload, None
+
+
+def evaluate(item, limits=None, timeout=None, frameworks_dir=None):
+    """
+    Calcule un élément (index, nom, payload, options du lot).
+    Les options propres au payload ("__options") priment sur celles du lot ;
+    un payload Path désigne un fichier (cadre binaire .abab, ouvert par mmap
+    dans le worker, ou texte / JSON lu dans le worker), {"framework": nom} un
+    cadre précompilé de `frameworks_dir`.
+    Chaque élément a son Control : échéance "timeout" de ses options plafonnée
+    par `timeout`, budgets `limits` (plafonds du serveur) combinés à ses "max_*".
+    Retourne une ligne {"index", "name", "result"} ou {"index", "name", "error"}
+    (plus ressource, limite, consommation et étape si un budget est dépassé).
+    """
+    index, name, payload, opts = item
+    line = {"index": index}
+    if name is not None:
+        line["name"] = name
+    try:
+        path, payload, own = _source(payload, frameworks_dir)
+        if path is not None:
+            opts = {**(opts or {}), **own}
+            ctl = Control(cap_timeout(opts.get("timeout"), timeout), limits=limits)
+            with load(path) as data, ctl.active():
+                line["result"] = run_pipeline(data, normalize_options(opts))
+            return line
+        data, own = parse_any(payload)
+        opts = {**(opts or {}), **own}
+        ctl = Control(cap_timeout(opts.get("timeout"), timeout), limits=limits)
+        with ctl.active():
+            line["result"] = run_pipeline(data, normalize_options(opts))
+    except BudgetExceeded as e:
+        line["error"] = str(e)
+        line.update(e.info())
+    except Exception as e:
+        line["error"] = str(e)
+    return line
+
+
+def compile_item(out_dir, item):
+    """
+    Comme evaluate, mais écrit le cadre compilé (arguments et attaques compris)
+    dans <out_dir>/<nom>.abab ; retourne {"index", "name", "path"} ou "error".
+    """
+    index, name, payload, opts = item
+    line = {"index": index}
+    if name is not None:
+        line["name"] = name
+    try:
+        path, payload, _ = _source(payload)
+        if path is not None:
+            raise ValueError("cadre déjà compilé")
+        data, own = parse_any(payload)
+        target = Path(out_dir) / (Path(name).stem + ".abab" if name else f"{index}.abab")
+        target.write_bytes(compile_binary(data, normalize_options({**(opts or {}), **own})))
+        line["path"] = str(target)
+    except Exception as e:
+        line["error"] = str(e)
+    return line
+
+
+def run_batch(payloads, opts=None, workers=None, chunksize=1, names=None, task=evaluate, pool=None):
+    """
+    Itère sur les résultats de `payloads` (textes ou dicts acceptés par parse_any,
+    ou Path de fichiers, lus par les workers) dans l'ordre de fin de calcul ;
+    chaque ligne porte l'index d'origine.
+      - workers   : nombre de processus (défaut : nombre de cœurs ; 1 = sans pool) ;
+      - chunksize : éléments envoyés à un processus en une fois ;
+      - task      : calcul d'un élément (evaluate, ou compile_item partiel) ;
+      - pool      : pool de processus existant (partagé, serveur) à la place
+                    d'un pool de `workers` processus créé pour le lot.
+    Avec un pool partagé, les éléments sont soumis par fenêtres de
+    2 x workers x chunksize : un lot abandonné en cours de route n'occupe
+    pas le pool au-delà de la fenêtre en cours.
+    """
+    workers = workers or os.cpu_count() or 1
+    names = names or []
+    items = (
+        (i, names[i] if i < len(names) else None, p, opts)
+        for i, p in enumerate(payloads)
+    )
+    chunksize = max(1, chunksize)
+    if workers <= 1:
+        for item in items:
+            yield task(item)
+        return
+    if pool is not None:
+        window = 2 * workers * chunksize
+        while True:
+            block = list(islice(items, window))
+            if not block:
+                return
+            yield from pool.imap_unordered(task, block, chunksize=chunksize)
+    # "spawn" : pas de fork d'un serveur multi-thread
+    with get_context("spawn").Pool(workers) as own:
+        yield from own.imap_unordered(task, items, chunksize=chunksize)
+
+
+def dumps_line(line):
+    return json.dumps(line, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+def _inputs(paths):
+    """Fichiers donnés (les dossiers sont parcourus : *.txt, *.json, *.abab)."""
+    for p in map(Path, paths):
+        if p.is_dir():
+            yield from sorted(q for q in p.iterdir() if q.suffix in (".txt", ".json", ".abab"))
+        else:
+            yield p
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m src.aba_batch", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("paths", nargs="+", help="fichiers ou dossiers de cadres ABA")
+    parser.add_argument("--workers", type=int, default=None, help="nombre de processus (défaut : cœurs)")
+    parser.add_argument("--chunksize", type=int, default=1, help="cadres par envoi à un processus")
+    parser.add_argument("--options", default="{}", help='options JSON, ex. \'{"use_preferences": false}\'')
+    parser.add_argument("--compile", metavar="DIR", default=None,
+                        help="écrire les cadres compilés (.abab) dans DIR au lieu de les évaluer")
+    args = parser.parse_args(argv)
+
+    files = list(_inputs(args.paths))
+    # fichiers passés par chemin : chaque worker lit (ou ouvre par mmap) les siens
+    opts = json.loads(args.options)
+    task = evaluate
+    if args.compile:
+        Path(args.compile).mkdir(parents=True, exist_ok=True)
+        task = partial(compile_item, args.compile)
+    for line in run_batch(files, opts, args.workers, args.chunksize,
+                          names=[str(f) for f in files], task=task):
+        sys.stdout.write(dumps_line(line))
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
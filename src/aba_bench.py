@@ -0,0 +1,198 @@
+"""
+Mesures de performance par étape (temps, pic mémoire, taille produite) sur des
+cadres synthétiques, avec comparaison à une référence enregistrée.
+
+    python -m src.aba_bench --preset medium --save bench-medium.json
+    python -m src.aba_bench --preset medium --compare bench-medium.json
+"""
+from copy import deepcopy
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+from src.aba_core import ABA
+from src.aba_attacks import compute_attacks, compute_attacks_sets
+from src.aba_generate import generate, to_text
+from src.aba_matrix import AttackMatrix, available as matrix_available
+from src.aba_parser import parse_aba_text
+from src.aba_transform import AtomicView, make_non_circular
+
+# jeux de paramètres de generate() ; "tiny" sert aux tests
+PRESETS = {
+    "tiny": [
+        {"n_literals": 20, "n_assumptions": 5, "depth": 3, "pref_density": 0.5},
+    ],
+    "small": [
+        {"n_literals": 100, "n_assumptions": 12, "depth": 4, "pref_density": 0.5},
+        {"n_literals": 100, "n_assumptions": 12, "depth": 4, "cycle_density": 0.1, "pref_density": 0.5},
+    ],
+    "medium": [
+        {"n_literals": 400, "n_assumptions": 16, "depth": 8, "pref_density": 0.5},
+        {"n_literals": 400, "n_assumptions": 16, "depth": 8, "cycle_density": 0.05, "pref_density": 0.5},
+        {"n_literals": 400, "n_assumptions": 16, "fan_in": 3, "depth": 12, "pref_density": 1.0},
+    ],
+    "large": [
+        {"n_literals": 2000, "n_assumptions": 20, "depth": 10, "pref_density": 0.5},
+        {"n_literals": 2000, "n_assumptions": 20, "depth": 10, "cycle_density": 0.02, "pref_density": 0.5},
+    ],
+}
+
+# "attacks_numpy" (backend NumPy des attaques) seulement s'il est installé
+STAGES = ("parse", "derive", "attacks") + (("attacks_numpy",) if matrix_available() else ()) + (
+    "attacks_sets", "non_circular", "atomic")
+
+
+def config_name(params):
+    return ",".join(f"{k}={params[k]}" for k in sorted(params))
+
+
+def measure(fn, memory=True, repeat=1):
+    """
+    Exécute fn() et retourne (résultat, secondes, pic mémoire en Kio ou None).
+    Temps : le meilleur de `repeat` appels. Le pic est mesuré par un appel
+    de plus sous tracemalloc (qui ralentit le calcul) pour ne pas fausser le temps.
+    """
+    elapsed = None
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        out = fn()
+        t = time.perf_counter() - t0
+        elapsed = t if elapsed is None else min(elapsed, t)
+    peak = None
+    if memory:
+        tracemalloc.start()
+        try:
+            fn()
+            peak = tracemalloc.get_traced_memory()[1] // 1024
+        finally:
+            tracemalloc.stop()
+    return out, elapsed, peak
+
+
+def bench_framework(data, stages=STAGES, memory=True, repeat=1):
+    """Mesures {étape: {"time", "peak_kb", "size"}} pour un cadre (dict)."""
+    out = {}
+
+    def record(stage, fn, size):
+        res, elapsed, peak = measure(fn, memory, repeat)
+        out[stage] = {"time": round(elapsed, 6), "peak_kb": peak, "size": size(res)}
+        return res
+
+    text = to_text(data)
+    if "parse" in stages:
+        record("parse", lambda: parse_aba_text(text), lambda d: len(d["rules"]))
+    aba = ABA.from_dict(data)
+    args = aba.derive_arguments()
+    if "derive" in stages:
+        args = record("derive", aba.derive_arguments, len)
+    if "attacks" in stages:
+        record("attacks", lambda: compute_attacks(aba, args, use_preferences=True), len)
+    if "attacks_numpy" in stages:
+        record("attacks_numpy", lambda: AttackMatrix(aba, args, use_preferences=True).to_dicts(), len)
+    if "attacks_sets" in stages:
+        record("attacks_sets", lambda: compute_attacks_sets(aba, args, mode="minimal"), len)
+
+    def transformed(transform):
+        def run():
+            t = ABA.from_dict(deepcopy(data))
+            t = transform(t) or t
+            return t, t.derive_arguments()
+        return run
+
+    # taille : règles du cadre transformé, arguments dérivés
+    if "non_circular" in stages:
+        record("non_circular", transformed(make_non_circular), lambda r: [len(r[0].rules), len(r[1])])
+    if "atomic" in stages:
+        record("atomic", transformed(AtomicView), lambda r: [len(r[0].rules), len(r[1])])
+    return out
+
+
+def run_bench(configs, seed=0, stages=STAGES, memory=True, repeat=1):
+    """Résultats {"env", "results": {nom de config: mesures}} pour des paramètres de generate()."""
+    results = {}
+    for params in configs:
+        data = generate(seed=seed, **params)
+        results[config_name(params)] = bench_framework(data, stages, memory, repeat)
+    return {
+        "env": {"python": platform.python_version(), "machine": platform.machine(), "seed": seed},
+        "results": results,
+    }
+
+
+def compare(current, baseline, tolerance=1.25, min_time=0.005):
+    """
+    Écarts par rapport à une référence : temps > tolerance x référence (au-delà
+    de min_time secondes, le bruit domine en dessous), pic mémoire idem, taille
+    produite différente. Retourne une liste de lignes {"config", "stage", "what", ...}.
+    """
+    issues = []
+    for name, stages in current["results"].items():
+        base_stages = baseline.get("results", {}).get(name)
+        if base_stages is None:
+            continue
+        for stage, m in stages.items():
+            b = base_stages.get(stage)
+            if b is None:
+                continue
+            if m["size"] != b["size"]:
+                issues.append({"config": name, "stage": stage, "what": "size",
+                               "baseline": b["size"], "current": m["size"]})
+            if m["time"] > min_time and m["time"] > tolerance * b["time"]:
+                issues.append({"config": name, "stage": stage, "what": "time",
+                               "baseline": b["time"], "current": m["time"]})
+            if m["peak_kb"] and b.get("peak_kb") and m["peak_kb"] > tolerance * b["peak_kb"]:
+                issues.append({"config": name, "stage": stage, "what": "peak_kb",
+                               "baseline": b["peak_kb"], "current": m["peak_kb"]})
+    return issues
+
+
+def _report(res, baseline=None, out=sys.stdout):
+    for name, stages in res["results"].items():
+        out.write(f"{name}\n")
+        for stage, m in stages.items():
+            line = f"  {stage:<13} {m['time'] * 1000:10.1f} ms"
+            if m["peak_kb"] is not None:
+                line += f" {m['peak_kb']:10d} Kio"
+            line += f"   taille {m['size']}"
+            b = (baseline or {}).get("results", {}).get(name, {}).get(stage)
+            if b and b["time"]:
+                line += f"   x{m['time'] / b['time']:.2f}"
+            out.write(line + "\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m src.aba_bench", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--preset", default="small", choices=sorted(PRESETS))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--stages", default=",".join(STAGES), help="étapes mesurées (séparées par des virgules)")
+    parser.add_argument("--repeat", type=int, default=3, help="temps retenu : meilleur de N appels")
+    parser.add_argument("--no-memory", action="store_true", help="ne pas mesurer le pic mémoire")
+    parser.add_argument("--save", metavar="FICHIER", help="enregistrer les résultats comme référence (JSON)")
+    parser.add_argument("--compare", metavar="FICHIER", help="comparer à une référence enregistrée")
+    parser.add_argument("--tolerance", type=float, default=1.25, help="facteur toléré avant de signaler")
+    args = parser.parse_args(argv)
+
+    stages = tuple(s for s in args.stages.split(",") if s)
+    res = run_bench(PRESETS[args.preset], args.seed, stages, not args.no_memory, args.repeat)
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fh:
+            baseline = json.load(fh)
+    _report(res, baseline)
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as fh:
+            json.dump(res, fh, indent=2, sort_keys=True)
+    if baseline is not None:
+        issues = compare(res, baseline, args.tolerance)
+        for i in issues:
+            sys.stdout.write(f"RÉGRESSION {i['config']} {i['stage']} {i['what']}: "
+                             f"{i['baseline']} -> {i['current']}\n")
+        return 1 if issues else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
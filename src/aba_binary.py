@@ -0,0 +1,452 @@
+"""
+Format binaire versionné d'un cadre ABA compilé (fichiers .abab).
+
+    en-tête   : "ABAB", version (u16), drapeaux (u16), nombre de sections (u32)
+    sections  : table (étiquette 4 octets, position u64, taille u64) puis
+                contenus alignés sur 8 octets, entiers little-endian :
+      SOFF/STRS  table des symboles : n+1 positions (i32) + noms UTF-8 concaténés
+      ASMS       id de littéral de chaque assumption (ordre des bits)
+      CTRY       contraire par bit d'assumption (-1 = absent)
+      RNKD       rang par bit d'assumption (v3) : float64, NaN = absent ;
+                 un rang entier est relu comme int (v1/v2 : RANK, i32, -1 = absent)
+      WRSE       index des préférences (v2) : par bit, masque des assumptions
+                 strictement moins préférées, sur ceil(n_assumptions/64) mots
+      RHED/ROFF/RBOD  règles : têtes, n+1 positions dans RBOD, corps concaténés
+      AIDS/AMSK  arguments (facultatif) : (id, conclusion), masques sur
+                 ceil(n_assumptions/64) mots de 64 bits
+      ATKS       attaques (facultatif) : (attaquant, cible, type, bit témoin)
+Les drapeaux disent quelles transformations le cadre stocké a déjà subies
+et avec quelles préférences les attaques ont été calculées.
+Un fichier est lu par mmap : les tables restent des vues sur le fichier
+(sans copie) et ne sont converties qu'à la demande.
+"""
+from array import array
+from contextlib import contextmanager
+from pathlib import Path
+import hashlib
+import math
+import mmap
+import struct
+import sys
+import threading
+
+from src.aba_core import ABA
+from src.aba_compiled import Argument, CompiledABA, compile_arguments, worse_masks
+from src.aba_transform import AtomicView, make_non_circular
+
+MAGIC = b"ABAB"
+# v2 : section WRSE (ordres partiels) ; v3 : rangs RNKD (réels, négatifs)
+# à la place de RANK ; les fichiers v1 et v2 restent lisibles
+VERSION = 3
+
+# drapeaux d'en-tête
+NON_CIRCULAR = 1    # cadre stocké déjà non-circulaire
+ATOMIC = 2          # cadre stocké déjà atomique
+PREFERENCES = 4     # attaques stockées calculées avec les préférences
+
+_HEADER = struct.Struct("<4sHHI")
+_ENTRY = struct.Struct("<4sQQ")
+_KINDS = ("normal", "reverse")
+
+
+class BinaryFormatError(ValueError):
+    """Contenu binaire illisible (magic, version ou tables incohérentes)."""
+
+
+def is_binary(buf):
+    return bytes(buf[:4]) == MAGIC
+
+
+def _pack(values):
+    a = array("i", values)
+    if sys.byteorder == "big":
+        a.byteswap()
+    return a.tobytes()
+
+
+def _ranks(ranks):
+    out = array("d")
+    for r in ranks:
+        if r is None:
+            out.append(math.nan)
+        elif isinstance(r, float) and math.isnan(r) or isinstance(r, int) and abs(r) > 1 << 53:
+            raise ValueError(f"rang de préférence non représentable: {r!r}")
+        else:
+            out.append(float(r))
+    if sys.byteorder == "big":
+        out.byteswap()
+    return out.tobytes()
+
+
+def _align(n):
+    return (n + 7) & ~7
+
+
+def _width(n_assumptions):
+    # octets d'un masque d'assumptions (mots de 64 bits)
+    return 8 * max(1, (n_assumptions + 63) // 64)
+
+
+def _masks(sec, width):
+    return [int.from_bytes(sec[k:k + width], "little") for k in range(0, len(sec), width)]
+
+
+def dumps(aba, args=None, attacks=None, flags=0):
+    """
+    Cadre `aba` (et, si donnés, ses arguments et ses attaques) -> bytes.
+    Les ids de littéraux et les bits d'assumptions sont ceux de la forme
+    compilée des arguments (ou de aba.compile() sans arguments).
+    """
+    fw, cargs = compile_arguments(aba, args or [])
+    names = [s.encode("utf-8") for s in fw.lit_names]
+    offsets = [0]
+    for s in names:
+        offsets.append(offsets[-1] + len(s))
+    body_off = [0]
+    for _, body in fw.rules:
+        body_off.append(body_off[-1] + len(body))
+
+    sections = [
+        (b"SOFF", _pack(offsets)),
+        (b"STRS", b"".join(names)),
+        (b"ASMS", _pack(fw.asm_lit)),
+        (b"CTRY", _pack(fw.contrary)),
+        (b"RNKD", _ranks(fw.rank)),
+        (b"RHED", _pack(h for h, _ in fw.rules)),
+        (b"ROFF", _pack(body_off)),
+        (b"RBOD", _pack(b for _, body in fw.rules for b in body)),
+    ]
+    width = _width(fw.n_assumptions)
+    sections.append((b"WRSE", b"".join(w.to_bytes(width, "little") for w in fw.worse)))
+    if args is not None:
+        sections.append((b"AIDS", _pack(x for a in cargs for x in (a.id, a.concl))))
+        sections.append((b"AMSK", b"".join(a.mask.to_bytes(width, "little") for a in cargs)))
+    if attacks is not None:
+        kind = {k: i for i, k in enumerate(_KINDS)}
+        sections.append((b"ATKS", _pack(
+            x for t in attacks
+            for x in (t["attacker"], t["target"], kind[t["kind"]], fw.asm_bit[t["witness"]])
+        )))
+
+    pos = _align(_HEADER.size + _ENTRY.size * len(sections))
+    entries, blobs = [], []
+    for tag, blob in sections:
+        entries.append(_ENTRY.pack(tag, pos, len(blob)))
+        pad = _align(len(blob)) - len(blob)
+        blobs.append(blob + b"\0" * pad)
+        pos += len(blob) + pad
+    head = _HEADER.pack(MAGIC, VERSION, flags, len(sections)) + b"".join(entries)
+    return head + b"\0" * (_align(len(head)) - len(head)) + b"".join(blobs)
+
+
+def dump(aba, path, args=None, attacks=None, flags=0):
+    with open(path, "wb") as fh:
+        fh.write(dumps(aba, args, attacks, flags))
+
+
+def loads(buf):
+    """Lecture depuis un tampon (bytes, bytearray, mmap...), sans copie."""
+    return BinaryABA(buf)
+
+
+def load(path):
+    """Lecture d'un fichier .abab par mmap ; fermer avec close() (ou `with`)."""
+    with open(path, "rb") as fh:
+        try:
+            mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise BinaryFormatError("fichier binaire vide")
+    return BinaryABA(mm, closer=mm.close)
+
+
+def framework_path(directory, name):
+    """
+    Chemin du cadre précompilé `name` (payload {"framework": name}) dans
+    `directory` ; ValueError si pas de répertoire, nom invalide ou cadre absent.
+    """
+    if not directory:
+        raise ValueError("aucun répertoire de cadres (ABA_FRAMEWORKS_DIR)")
+    if not isinstance(name, str) or not name or Path(name).name != name or name.startswith("."):
+        raise ValueError("nom de cadre invalide")
+    path = Path(directory) / f"{name}.abab"
+    if not path.is_file():
+        raise ValueError(f"cadre inconnu: {name}")
+    return path
+
+
+class BinaryABA:
+    """
+    Cadre lu depuis le format binaire. Les tables restent des vues sur le
+    tampon ; compiled(), arguments() et to_aba() construisent les objets
+    Python à la demande (sans analyse ni saturation).
+    """
+
+    def __init__(self, buf, closer=None):
+        self._buf = buf
+        self._closer = closer
+        self._views = []
+        self._tables = {}
+        self._fw = None
+        # lectures en cours (prepare, build, to_dict) et fermeture différée (retire)
+        self._lock = threading.Lock()
+        self._users = 0
+        self._retired = False
+        self.closed = False
+        try:
+            self._open()
+        except Exception:
+            self.close()
+            raise
+
+    def _open(self):
+        mv = self._view(memoryview(self._buf).cast("B"))
+        if len(mv) < _HEADER.size:
+            raise BinaryFormatError("en-tête binaire tronqué")
+        magic, version, flags, count = _HEADER.unpack_from(mv)
+        if magic != MAGIC:
+            raise BinaryFormatError("pas un cadre ABA binaire")
+        if version > VERSION:
+            raise BinaryFormatError(f"version binaire {version} non supportée (max {VERSION})")
+        if len(mv) < _HEADER.size + _ENTRY.size * count:
+            raise BinaryFormatError("table des sections tronquée")
+        self.version = version
+        self.flags = flags
+        # empreinte calculée une fois à l'ouverture (clé de cache de chaque requête)
+        self._digest = hashlib.sha256(mv).hexdigest()
+        self._sections = {}
+        for k in range(count):
+            tag, pos, size = _ENTRY.unpack_from(mv, _HEADER.size + k * _ENTRY.size)
+            if pos + size > len(mv):
+                raise BinaryFormatError(f"section {tag.decode('ascii', 'replace')} hors du fichier")
+            # étiquettes inconnues ignorées (versions futures)
+            self._sections[tag] = self._view(mv[pos:pos + size])
+
+        self._soff = self._ints(b"SOFF")
+        self._asms = self._ints(b"ASMS")
+        self._ctry = self._ints(b"CTRY")
+        if b"RNKD" in self._sections:
+            self._rank = [None if math.isnan(r) else int(r) if r.is_integer() else r
+                          for r in self._floats(b"RNKD")]
+        else:
+            self._rank = [None if r < 0 else r for r in self._ints(b"RANK")]
+        self._rhed = self._ints(b"RHED")
+        self._roff = self._ints(b"ROFF")
+        self._rbod = self._ints(b"RBOD")
+        self.n_literals = len(self._soff) - 1
+        self.n_assumptions = len(self._asms)
+        self.n_rules = len(self._rhed)
+        self._check()
+
+    # ---------- lecture des tables ----------
+
+    def _view(self, mv):
+        self._views.append(mv)
+        return mv
+
+    def _section(self, tag, required=True):
+        sec = self._sections.get(tag)
+        if sec is None and required:
+            raise BinaryFormatError(f"section {tag.decode('ascii')} manquante")
+        return sec
+
+    def _ints(self, tag, required=True):
+        # vue i32 sur la section (copie retournée seulement sur machine big-endian)
+        if tag in self._tables:
+            return self._tables[tag]
+        sec = self._section(tag, required)
+        if sec is None:
+            return None
+        if len(sec) % 4:
+            raise BinaryFormatError(f"section {tag.decode('ascii')} mal formée")
+        if sys.byteorder == "big":
+            ints = array("i")
+            ints.frombytes(sec)
+            ints.byteswap()
+        else:
+            ints = self._view(sec.cast("i"))
+        self._tables[tag] = ints
+        return ints
+
+    def _floats(self, tag):
+        sec = self._section(tag)
+        if len(sec) % 8:
+            raise BinaryFormatError(f"section {tag.decode('ascii')} mal formée")
+        floats = array("d")
+        floats.frombytes(sec)
+        if sys.byteorder == "big":
+            floats.byteswap()
+        return floats
+
+    def _check(self):
+        n, m = self.n_literals, self.n_assumptions
+        if n < 0 or len(self._ctry) != m or len(self._rank) != m or len(self._roff) != self.n_rules + 1:
+            raise BinaryFormatError("tailles de tables incohérentes")
+        for ids in (self._asms, self._rhed, self._rbod):
+            if len(ids) and (min(ids) < 0 or max(ids) >= n):
+                raise BinaryFormatError("id de littéral hors table")
+        if len(self._ctry) and (min(self._ctry) < -1 or max(self._ctry) >= n):
+            raise BinaryFormatError("id de contraire hors table")
+        if self._roff[0] != 0 or self._roff[-1] != len(self._rbod) \
+                or self._soff[0] != 0 or self._soff[-1] != len(self._section(b"STRS")):
+            raise BinaryFormatError("positions incohérentes")
+
+    @property
+    def has_arguments(self):
+        return b"AIDS" in self._sections
+
+    @property
+    def has_attacks(self):
+        return b"ATKS" in self._sections
+
+    def digest(self):
+        """Empreinte SHA-256 du contenu (clé de cache)."""
+        return self._digest
+
+    def literal_names(self):
+        strs = self._section(b"STRS")
+        off = self._soff
+        return [str(strs[off[i]:off[i + 1]], "utf-8") for i in range(self.n_literals)]
+
+    def compiled(self):
+        """CompiledABA (construit une fois, partagé par les arguments)."""
+        if self._fw is None:
+            body, off = self._rbod, self._roff
+            rules = [(h, tuple(body[off[i]:off[i + 1]])) for i, h in enumerate(self._rhed)]
+            rank = self._rank
+            worse = self._section(b"WRSE", required=False)
+            if worse is not None:
+                worse = _masks(worse, _width(self.n_assumptions))
+                if len(worse) != self.n_assumptions:
+                    raise BinaryFormatError("section WRSE mal formée")
+            self._fw = CompiledABA.from_tables(self.literal_names(), self._asms, self._ctry,
+                                               rank, rules, worse)
+        return self._fw
+
+    def arguments(self):
+        """Arguments stockés (liste d'Argument), ou None s'il n'y en a pas."""
+        ids = self._ints(b"AIDS", required=False)
+        if ids is None:
+            return None
+        masks = self._section(b"AMSK")
+        fw = self.compiled()
+        if len(masks) != _width(self.n_assumptions) * (len(ids) // 2):
+            raise BinaryFormatError("section AMSK mal formée")
+        masks = _masks(masks, _width(self.n_assumptions))
+        return [Argument(ids[2 * k], masks[k], ids[2 * k + 1], fw) for k in range(len(ids) // 2)]
+
+    def attacks(self):
+        """Attaques stockées (dicts comme compute_attacks), ou None."""
+        t = self._ints(b"ATKS", required=False)
+        if t is None:
+            return None
+        names = self.compiled().asm_names
+        return [
+            {"attacker": t[k], "target": t[k + 1], "kind": _KINDS[t[k + 2]], "witness": names[t[k + 3]]}
+            for k in range(0, len(t), 4)
+        ]
+
+    def to_aba(self):
+        """ABA équivalent (déjà validé à l'écriture : pas de revalidation)."""
+        fw = self.compiled()
+        names = fw.lit_names
+        aba = ABA()
+        aba.literals = set(names)
+        aba.assumptions = set(fw.asm_names)
+        aba.contraries = {a: names[c] for a, c in zip(fw.asm_names, fw.contrary) if c >= 0}
+        aba.rules = [{"head": names[h], "body": [names[b] for b in body]} for h, body in fw.rules]
+        aba.preferences = {a: r for a, r in zip(fw.asm_names, fw.rank) if r is not None}
+        if fw.worse != worse_masks(fw.asm_names, aba.preferences):
+            # ordre partiel : chaque assumption -> celles qui lui sont strictement inférieures
+            aba.preferences = {a: fw.sorted_names_of(w) for a, w in zip(fw.asm_names, fw.worse) if w}
+        return aba
+
+    def to_dict(self):
+        """Dict accepté par ABA.from_dict (sessions, etc.)."""
+        with self._use():
+            return self.to_aba().export_framework()
+
+    def build(self, do_non_circular=False, do_atomic=False):
+        """
+        ABA avec les transformations demandées qui n'ont pas déjà été appliquées.
+        Un cadre stocké déjà transformé ne peut pas servir sans cette
+        transformation (le cadre d'origine n'est pas stocké) : ValueError.
+        """
+        self.check_options(do_non_circular, do_atomic)
+        with self._use():
+            aba = self.to_aba()
+        if do_non_circular and not self.flags & NON_CIRCULAR:
+            make_non_circular(aba)
+        if do_atomic and not self.flags & ATOMIC:
+            aba = AtomicView(aba)
+        return aba
+
+    def check_options(self, do_non_circular=False, do_atomic=False):
+        """ValueError si le cadre stocké a subi une transformation non demandée."""
+        missing = [name for flag, name, wanted in ((NON_CIRCULAR, "do_non_circular", do_non_circular),
+                                                    (ATOMIC, "do_atomic", do_atomic))
+                   if self.flags & flag and not wanted]
+        if missing:
+            raise ValueError(f"cadre compilé avec {', '.join(missing)} : option requise "
+                             "(le cadre d'origine n'est pas stocké)")
+
+    def prepare(self, opts):
+        """
+        (aba, args, attacks) pour des options normalisées. Les arguments stockés
+        ne sont repris que si aucune transformation n'est à faire, les attaques
+        que si elles ont été calculées avec le même réglage de préférences ;
+        sinon None (à recalculer).
+        """
+        fresh = (opts["do_non_circular"] and not self.flags & NON_CIRCULAR) \
+            or (opts["do_atomic"] and not self.flags & ATOMIC)
+        with self._use():
+            aba = self.build(opts["do_non_circular"], opts["do_atomic"])
+            if fresh:
+                return aba, None, None
+            args = self.arguments()
+            attacks = None
+            if args is not None and bool(self.flags & PREFERENCES) == opts["use_preferences"]:
+                attacks = self.attacks()
+        return aba, args, attacks
+
+    # ---------- fermeture ----------
+
+    @contextmanager
+    def _use(self):
+        # lecture des tables : une fermeture différée (retire) attend la fin
+        with self._lock:
+            if self.closed:
+                raise BinaryFormatError("cadre binaire fermé (fichier remplacé), réessayer")
+            self._users += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._users -= 1
+                last = self._retired and not self._users
+            if last:
+                self.close()
+
+    def retire(self):
+        """Ferme dès qu'aucune lecture n'est en cours (cadre remplacé par une nouvelle version)."""
+        with self._lock:
+            self._retired = True
+            if self._users:
+                return
+        self.close()
+
+    def close(self):
+        """Libère les vues puis le mmap (les objets déjà construits restent valides)."""
+        self.closed = True
+        for mv in reversed(self._views):
+            mv.release()
+        self._views = []
+        self._tables = {}
+        if self._closer is not None:
+            self._closer()
+            self._closer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,197 @@
+from collections import OrderedDict
+from pathlib import Path
+import hashlib
+import json
+import os
+import threading
+
+from src.aba_binary import BinaryABA
+from src.aba_control import merge_limits
+from src.utils import parse_preferences
+
+
+def canonical_framework(data):
+    """
+    Forme normalisée d'un cadre (dict venant de parse_any) pour la clé de cache.
+    Seules les différences sans effet sur la réponse sont effacées : ensembles
+    (littéraux, assumptions) triés, préférences texte ou dict ramenées aux rangs.
+    L'ordre des règles, des contraires et des préférences est gardé : il fixe
+    celui de la réponse (règles renvoyées, ids d'arguments).
+    """
+    pref = data.get("preferences", {})
+    if isinstance(pref, str):
+        pref = parse_preferences(pref)
+    elif not isinstance(pref, dict):
+        pref = {}
+    rules = [
+        (str(r.get("head")), [str(b) for b in r.get("body", [])])
+        for r in data.get("rules", [])
+    ]
+    return {
+        "literals": sorted(set(data.get("literals", []))),
+        "assumptions": sorted(set(data.get("assumptions", []))),
+        "contraries": list(dict(data.get("contraries", {})).items()),
+        "rules": rules,
+        "preferences": [(a, sorted(v) if isinstance(v, (list, tuple)) else v)
+                        for a, v in pref.items()],
+    }
+
+
+def canonical_key(data, opts, limits=None):
+    """
+    Empreinte SHA-256 du cadre normalisé et des options de calcul
+    (cadre binaire : empreinte de son contenu). Le backend des attaques
+    n'en fait pas partie : les deux donnent la même réponse.
+    limits : plafonds du serveur ; avec on_limit="partial", la réponse peut
+    être tronquée selon eux, les budgets effectifs font alors partie de la clé.
+    """
+    opts = {k: v for k, v in opts.items() if k != "attacks_backend"}
+    if opts.get("on_limit") == "partial":
+        opts["limits"] = merge_limits(limits, opts.get("limits"))
+    if isinstance(data, BinaryABA):
+        framework = {"binary": data.digest()}
+    else:
+        framework = canonical_framework(data)
+    blob = json.dumps(
+        {"framework": framework, "options": opts},
+        sort_keys=True, separators=(",", ":"), ensure_ascii=False,
+    )
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """
+    Cache LRU de réponses déjà sérialisées (bytes JSON), indexé par canonical_key.
+      - maxsize      : nombre d'entrées gardées en mémoire (0 = cache désactivé) ;
+      - directory    : si donné, chaque entrée est aussi écrite sur disque
+                       (<directory>/<clé>.json) et relue après un redémarrage ;
+      - disk_maxsize : entrées gardées sur disque (défaut : maxsize), les moins
+                       récemment utilisées (date de modification, mise à jour
+                       à chaque lecture) supprimées au-delà.
+    """
+
+    def __init__(self, maxsize=128, directory=None, disk_maxsize=None):
+        self.maxsize = maxsize
+        self.disk_maxsize = maxsize if disk_maxsize is None else disk_maxsize
+        self.directory = Path(directory) if directory else None
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_evictions = 0
+
+    @classmethod
+    def from_env(cls):
+        """Configuration par ABA_CACHE_SIZE / ABA_CACHE_DIR / ABA_CACHE_DISK_SIZE."""
+        disk = os.environ.get("ABA_CACHE_DISK_SIZE")
+        return cls(
+            maxsize=int(os.environ.get("ABA_CACHE_SIZE", "128")),
+            directory=os.environ.get("ABA_CACHE_DIR") or None,
+            disk_maxsize=None if disk is None else int(disk),
+        )
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key):
+        with self._lock:
+            body = self._data.get(key)
+            if body is not None:
+                self._data.move_to_end(key)
+                self.hits += 1
+        if body is not None:
+            self._touch(key)
+            return body
+        body = self._load(key)
+        with self._lock:
+            if body is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._remember(key, body)
+        return body
+
+    def put(self, key, body):
+        if self.maxsize <= 0 and (self.directory is None or self.disk_maxsize <= 0):
+            return
+        with self._lock:
+            self._remember(key, body)
+        self._store(key, body)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "disk_evictions": self.disk_evictions,
+            "persistent": self.directory is not None and self.disk_maxsize > 0,
+            "disk_maxsize": self.disk_maxsize,
+        }
+
+    # ---------- interne ----------
+
+    def _remember(self, key, body):
+        if self.maxsize <= 0:
+            return
+        self._data[key] = body
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def _path(self, key):
+        return self.directory / f"{key}.json"
+
+    def _load(self, key):
+        if self.directory is None:
+            return None
+        path = self._path(key)
+        try:
+            body = path.read_bytes()
+        except OSError:
+            return None
+        self._touch(key)
+        return body
+
+    def _touch(self, key):
+        # récence de l'entrée sur disque (éviction LRU du répertoire)
+        if self.directory is not None:
+            try:
+                os.utime(self._path(key))
+            except OSError:
+                pass
+
+    def _store(self, key, body):
+        if self.directory is None or self.disk_maxsize <= 0:
+            return
+        path = self._path(key)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_bytes(body)
+        os.replace(tmp, path)
+        self._evict_disk()
+
+    def _evict_disk(self):
+        entries = []
+        for p in self.directory.glob("*.json"):
+            try:
+                entries.append((p.stat().st_mtime_ns, p.name, p))
+            except OSError:   # supprimée entre-temps (autre processus)
+                pass
+        entries.sort()
+        for _, _, p in entries[:max(0, len(entries) - self.disk_maxsize)]:
+            try:
+                p.unlink()
+                self.disk_evictions += 1
+            except OSError:
+                pass
@@ -0,0 +1,214 @@
+class CompiledABA:
+    """
+    Représentation compilée d'un cadre ABA :
+      - littéraux internés en entiers denses (ordre alphabétique) ;
+      - assumptions numérotées par bit (ordre alphabétique), un support = un masque int ;
+      - règles = liste de (head, (body...)) en ids de littéraux ;
+      - contrary / rank = tableaux indexés par bit d'assumption ;
+      - worse[b] = masque des assumptions strictement moins préférées que b :
+        "S contient-il un élément pire que b" devient S & worse[b] (voir worse_masks).
+    L'ordre alphabétique des bits garantit que le plus petit bit d'un masque
+    est aussi la plus petite assumption par nom (choix déterministe des témoins).
+    """
+
+    __slots__ = ("lit_names", "lit_id", "asm_names", "asm_bit", "asm_lit",
+                 "lit_bit", "contrary", "rank", "worse", "rules")
+
+    def __init__(self, literals, assumptions, contraries, rules, preferences):
+        self.lit_names = sorted(literals)
+        self.lit_id = {name: i for i, name in enumerate(self.lit_names)}
+        self.asm_names = sorted(assumptions)
+        self.asm_bit = {name: i for i, name in enumerate(self.asm_names)}
+        self.asm_lit = [self.lit_id[a] for a in self.asm_names]
+        self.lit_bit = [-1] * len(self.lit_names)
+        for bit, lid in enumerate(self.asm_lit):
+            self.lit_bit[lid] = bit
+
+        # contraire de chaque assumption (-1 si absent ou hors L)
+        self.contrary = [self.lit_id.get(contraries.get(a), -1) for a in self.asm_names]
+        # rang de préférence (None = incomparable ou ordre partiel) et index des pires
+        prefs = preferences or {}
+        self.rank = [rank_of(prefs.get(a)) for a in self.asm_names]
+        self.worse = worse_masks(self.asm_names, prefs)
+
+        self.rules = [
+            (self.lit_id[r["head"]], tuple(self.lit_id[b] for b in r.get("body", [])))
+            for r in rules
+        ]
+
+    @classmethod
+    def from_aba(cls, aba):
+        return cls(aba.literals, aba.assumptions, aba.contraries, aba.rules, aba.preferences)
+
+    @classmethod
+    def from_tables(cls, lit_names, asm_lit, contrary, rank, rules, worse=None):
+        """
+        Reconstruction directe depuis des tables déjà compilées (format binaire) :
+        ni tri ni résolution de noms, l'ordre des ids est repris tel quel.
+        worse : index des pires (par défaut, déduit des rangs).
+        """
+        fw = cls.__new__(cls)
+        fw.lit_names = list(lit_names)
+        fw.lit_id = {name: i for i, name in enumerate(fw.lit_names)}
+        fw.asm_lit = list(asm_lit)
+        fw.asm_names = [fw.lit_names[lid] for lid in fw.asm_lit]
+        fw.asm_bit = {name: i for i, name in enumerate(fw.asm_names)}
+        fw.lit_bit = [-1] * len(fw.lit_names)
+        for bit, lid in enumerate(fw.asm_lit):
+            fw.lit_bit[lid] = bit
+        fw.contrary = list(contrary)
+        fw.rank = list(rank)
+        if worse is None:
+            worse = worse_masks(fw.asm_names, {a: r for a, r in zip(fw.asm_names, fw.rank) if r is not None})
+        fw.worse = list(worse)
+        fw.rules = list(rules)
+        return fw
+
+    def set_preferences(self, preferences, worse=None):
+        """Remplace rangs et index des pires (édition de session ; worse si déjà calculé)."""
+        prefs = preferences or {}
+        self.rank[:] = [rank_of(prefs.get(a)) for a in self.asm_names]
+        self.worse[:] = worse_masks(self.asm_names, prefs) if worse is None else worse
+
+    def intern(self, name):
+        """Id du littéral `name`, ajouté en fin de table s'il est nouveau (non-assumption)."""
+        lid = self.lit_id.get(name)
+        if lid is None:
+            lid = len(self.lit_names)
+            self.lit_names.append(name)
+            self.lit_id[name] = lid
+            self.lit_bit.append(-1)
+        return lid
+
+    @property
+    def n_assumptions(self):
+        return len(self.asm_names)
+
+    def mask_of(self, names):
+        m = 0
+        for x in names:
+            m |= 1 << self.asm_bit[x]
+        return m
+
+    def names_of(self, mask):
+        """Masque -> frozenset des noms d'assumptions."""
+        return frozenset(self.sorted_names_of(mask))
+
+    def sorted_names_of(self, mask):
+        """Masque -> liste triée des noms (les bits suivent l'ordre alphabétique)."""
+        out = []
+        names = self.asm_names
+        while mask:
+            low = mask & -mask
+            out.append(names[low.bit_length() - 1])
+            mask ^= low
+        return out
+
+
+def rank_of(value):
+    # un rang numérique ; une liste (ordre partiel) n'est pas un rang
+    return value if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+
+
+def worse_masks(asm_names, prefs):
+    """
+    Index des préférences : pour chaque bit b, masque des assumptions
+    strictement moins préférées que b.
+    prefs : {a: rang} (0 = meilleur, voir parse_preferences) et/ou
+            {a: [assumptions strictement moins préférées que a]} pour un ordre
+            partiel quelconque, fermé ici par transitivité (un cycle est une erreur).
+    Les noms qui ne sont pas des assumptions sont ignorés.
+    """
+    bit = {a: i for i, a in enumerate(asm_names)}
+    worse = [0] * len(asm_names)
+
+    # rangs : niveaux du pire au meilleur, chaque niveau reçoit les pires déjà vus
+    levels = {}
+    for a, v in prefs.items():
+        r = rank_of(v)
+        if r is not None and a in bit:
+            levels[r] = levels.get(r, 0) | 1 << bit[a]
+    acc = 0
+    for r in sorted(levels, reverse=True):
+        for b in iter_bits(levels[r]):
+            worse[b] = acc
+        acc |= levels[r]
+
+    # ordre partiel explicite
+    partial = False
+    for a, v in prefs.items():
+        if isinstance(v, (list, tuple, set, frozenset)) and a in bit:
+            partial = True
+            for x in v:
+                if x in bit:
+                    worse[bit[a]] |= 1 << bit[x]
+    if partial:
+        for k in range(len(worse)):
+            kbit = 1 << k
+            wk = worse[k]
+            for i, wi in enumerate(worse):
+                if wi & kbit:
+                    worse[i] = wi | wk
+        for b, w in enumerate(worse):
+            if w >> b & 1:
+                raise ValueError(f"préférences cycliques autour de '{asm_names[b]}'")
+    return worse
+
+
+def iter_bits(mask):
+    """Indices des bits à 1 d'un masque, du plus petit au plus grand."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class Argument:
+    """
+    Argument compilé : support (masque) ⊢ conclusion (id de littéral).
+    Reste lisible comme l'ancien dict {"id", "assumptions", "conclusion"} :
+    les noms ne sont reconstruits qu'à la lecture.
+    """
+
+    __slots__ = ("id", "mask", "concl", "fw")
+
+    def __init__(self, id, mask, concl, fw):
+        self.id = id
+        self.mask = mask
+        self.concl = concl
+        self.fw = fw
+
+    def __getitem__(self, key):
+        if key == "id":
+            return self.id
+        if key == "assumptions":
+            return self.fw.names_of(self.mask)
+        if key == "conclusion":
+            return self.fw.lit_names[self.concl]
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        return ("id", "assumptions", "conclusion")
+
+    def __repr__(self):
+        return (f"Argument(id={self.id}, assumptions={sorted(self['assumptions'])}, "
+                f"conclusion={self['conclusion']!r})")
+
+
+def compile_arguments(aba, args):
+    """
+    Retourne (fw, args) en forme compilée. Accepte aussi des arguments
+    sous forme de dicts {"id", "assumptions", "conclusion"} (ancien format).
+    """
+    if args and isinstance(args[0], Argument):
+        return args[0].fw, args
+    fw = CompiledABA.from_aba(aba)
+    out = [Argument(a["id"], fw.mask_of(a["assumptions"]), fw.lit_id[a["conclusion"]], fw)
+           for a in args]
+    return fw, out
@@ -0,0 +1,205 @@
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+import os
+import time
+
+# budgets de calcul (voir Control.spend / Control.bound) :
+#   arguments    : arguments dérivés en tout ;
+#   supports     : supports minimaux d'un même littéral ;
+#   combinations : combinaisons de supports essayées par la saturation ;
+#   pairs        : paires de coalitions (X,Y) énumérées.
+RESOURCES = ("arguments", "supports", "combinations", "pairs")
+
+
+class Interrupted(Exception):
+    """Calcul interrompu (délai dépassé ou annulation)."""
+
+
+class TimedOut(Interrupted):
+    pass
+
+
+class Cancelled(Interrupted):
+    pass
+
+
+class BudgetExceeded(Interrupted):
+    """Budget de calcul dépassé : ressource, limite, consommation et étape en cours."""
+
+    def __init__(self, resource, limit, used, stage=None):
+        super().__init__(f"budget dépassé ({stage or 'calcul'}) : {resource} > {limit}")
+        self.resource = resource
+        self.limit = limit
+        self.used = used
+        self.stage = stage
+
+    def info(self):
+        return {"resource": self.resource, "limit": self.limit, "used": self.used, "stage": self.stage}
+
+
+def merge_limits(a, b):
+    """Budgets de a et b, le plus petit l'emporte (None = pas de limite)."""
+    out = dict(a or {})
+    for k, v in (b or {}).items():
+        if v is not None:
+            out[k] = v if out.get(k) is None else min(out[k], v)
+    return out
+
+
+def cap_timeout(requested, cap):
+    """Échéance effective : celle demandée (None ou <= 0 : aucune), plafonnée par `cap`."""
+    if requested is None or requested <= 0:
+        return cap
+    if cap is None:
+        return requested
+    return min(requested, cap)
+
+
+def limits_from_env(environ=os.environ):
+    """Plafonds du serveur : ABA_MAX_ARGUMENTS, ABA_MAX_SUPPORTS, ABA_MAX_COMBINATIONS, ABA_MAX_PAIRS (0 = aucun)."""
+    out = {}
+    for r in RESOURCES:
+        v = int(environ.get(f"ABA_MAX_{r.upper()}", "0"))
+        if v > 0:
+            out[r] = v
+    return out
+
+
+_current = ContextVar("aba_control", default=None)
+
+
+def current():
+    """Contrôle actif pour le calcul en cours (None hors d'un `Control.active()`)."""
+    return _current.get()
+
+
+class Control:
+    """
+    Contrôle coopératif d'un calcul : échéance, annulation, avancement.
+    Les boucles coûteuses récupèrent le contrôle actif une fois (current())
+    puis appellent checkpoint() ; l'horloge n'est lue qu'un appel sur `every`.
+    Elles signalent aussi leur avancement par progress(stage, done, total)
+    (tours de point fixe, lignes de paires de coalitions, ...).
+    Sans contrôle actif, le coût est un test `is not None`.
+    Budgets (limits, voir RESOURCES) : les boucles les débitent par paquets
+    (un produit de supports, une ligne de paires) avant de faire le travail.
+    Un dépassement lève BudgetExceeded ; en mode partiel, les étapes qui savent
+    s'arrêter proprement (dérivation, paires de coalitions) le notent
+    (`exceeded`) et rendent ce qu'elles ont déjà.
+    """
+
+    __slots__ = ("deadline", "cancelled", "every", "_left",
+                 "stage", "done", "total", "on_progress",
+                 "limits", "used", "partial", "exceeded")
+
+    def __init__(self, timeout=None, every=256, on_progress=None, limits=None, partial=False):
+        self.deadline = None if not timeout else time.monotonic() + timeout
+        self.cancelled = False
+        self.every = every
+        self._left = every
+        self.stage = None
+        self.done = 0
+        self.total = None
+        self.on_progress = on_progress
+        self.limits = dict(limits or {})
+        self.used = {}
+        self.partial = partial
+        self.exceeded = None
+
+    def cancel(self):
+        self.cancelled = True
+
+    def progress(self, stage, done, total=None):
+        """Avancement de l'étape `stage` : `done` unités sur `total` (None = inconnu)."""
+        self.stage = stage
+        self.done = done
+        self.total = total
+        if self.on_progress is not None:
+            self.on_progress(stage, done, total)
+
+    def check(self):
+        if self.cancelled:
+            raise Cancelled("calcul annulé")
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise TimedOut("délai de calcul dépassé")
+
+    def checkpoint(self):
+        self._left -= 1
+        if self._left <= 0:
+            self._left = self.every
+            self.check()
+
+    def spend(self, resource, n=1):
+        """Débite n unités de `resource` ; BudgetExceeded au-delà de la limite."""
+        limit = self.limits.get(resource)
+        if limit is None:
+            return
+        used = self.used.get(resource, 0) + n
+        self.used[resource] = used
+        if used > limit:
+            raise BudgetExceeded(resource, limit, used, self.stage)
+
+    def bound(self, resource, value):
+        """Comme spend, pour une taille instantanée (non cumulée)."""
+        limit = self.limits.get(resource)
+        if limit is not None and value > limit:
+            raise BudgetExceeded(resource, limit, value, self.stage)
+
+    def truncate(self, exc):
+        """
+        Dépassement rattrapé par une étape capable de rendre un résultat partiel :
+        noté en mode partiel, relevé sinon.
+        """
+        if not self.partial:
+            raise exc
+        if self.exceeded is None:
+            self.exceeded = exc
+
+    def wrap(self, iterable):
+        """
+        Itère `iterable` avec ce contrôle actif pendant chaque pas seulement
+        (générateur consommé par morceaux, éventuellement depuis plusieurs threads).
+        """
+        it = iter(iterable)
+        while True:
+            with self.active():
+                try:
+                    item = next(it)
+                except StopIteration:
+                    return
+            yield item
+
+    @contextmanager
+    def active(self):
+        """Rend ce contrôle visible (current()) le temps du bloc."""
+        token = _current.set(self)
+        try:
+            yield self
+        finally:
+            _current.reset(token)
+
+
+def limited(limits=None, partial=False):
+    """
+    Budgets d'un calcul : posés sur le contrôle actif (sans relâcher ses propres
+    plafonds), ou sur un nouveau contrôle s'il n'y en a pas. Bloc vide si
+    aucun budget n'est demandé.
+    """
+    ctl = current()
+    if not limits and not partial:
+        return nullcontext(ctl)
+    if ctl is None:
+        return Control(limits=limits, partial=partial).active()
+    return _restricted(ctl, limits, partial)
+
+
+@contextmanager
+def _restricted(ctl, limits, partial):
+    saved = ctl.limits, ctl.partial, ctl.exceeded
+    ctl.limits = merge_limits(ctl.limits, limits)
+    ctl.partial = partial
+    ctl.exceeded = None
+    try:
+        yield ctl
+    finally:
+        ctl.limits, ctl.partial, ctl.exceeded = saved
@@ -1,6 +1,177 @@
 from itertools import product
+from src.aba_supports import SupportSet
+from src.aba_compiled import CompiledABA, Argument, compile_arguments
+from src.aba_control import BudgetExceeded, current
+from src.aba_dag import DerivationDAG
+from src.aba_graph import RuleGraph
+from src.aba_metrics import current as current_profile
 from src.utils import parse_preferences
 
+def saturate(fw, supports, rule_ids=None, delta=None, dag=None):
+    """
+    Ferme `supports` (liste de SupportSet indexée par id de littéral) par les
+    règles `rule_ids` (toutes par défaut) jusqu'à stabilité.
+    delta : supports à propager au départ (par défaut tous les supports présents).
+    dag   : DerivationDAG où noter la dérivation de chaque support ajouté
+            (les supports de départ doivent y être déjà).
+    Interruptible (Control.checkpoint) si un contrôle est actif, qui débite
+    aussi les budgets "combinations" (avant chaque produit), "arguments"
+    (supports ajoutés) et "supports" (par littéral).
+    """
+    ctl = current()
+    prof = current_profile()
+    if rule_ids is None:
+        rule_ids = range(len(fw.rules))
+    if delta is None:
+        delta = {l: set(S) for l, S in enumerate(supports) if S}
+
+    # index : littéral -> règles qui l'utilisent dans leur corps
+    by_body = {}
+    for idx in rule_ids:
+        for b in fw.rules[idx][1]:
+            lst = by_body.setdefault(b, [])
+            if not lst or lst[-1] != idx:
+                lst.append(idx)
+
+    # fermeture semi-naïve : à chaque tour, on ne compose que les
+    # combinaisons qui utilisent au moins un support nouveau (delta).
+    # Pour la position i choisie comme "première nouvelle", les positions
+    # j < i prennent les anciens supports, les positions j > i tous les supports.
+    rounds = 0
+    combos = added_total = 0
+    while delta:
+        rounds += 1
+        if ctl is not None:
+            ctl.progress("derive", rounds)
+            ctl.check()
+        old = {l: [s for s in supports[l] if s not in D] for l, D in delta.items()}
+        touched = sorted({idx for l in delta for idx in by_body.get(l, ())})
+        fresh = {}
+        for idx in touched:
+            head, body = fw.rules[idx]
+            store = supports[head]
+            for i, bi in enumerate(body):
+                if bi not in delta:
+                    continue
+                pools = []
+                for j, b in enumerate(body):
+                    if j < i:
+                        pools.append(old.get(b, supports[b]))
+                    elif j == i:
+                        pools.append(delta[b])
+                    else:
+                        pools.append(supports[b])
+                if prof is not None or ctl is not None:
+                    k = 1
+                    for pool in pools:
+                        k *= len(pool)
+                    combos += k
+                    if ctl is not None:
+                        ctl.spend("combinations", k)
+                for combo in product(*pools):
+                    if ctl is not None:
+                        ctl.checkpoint()
+                    acc = 0
+                    for m in combo:
+                        acc |= m
+                    if not store.covers(acc):
+                        if dag is None:
+                            fresh.setdefault(head, set()).add(acc)
+                        else:
+                            # première dérivation trouvée pour ce support
+                            fresh.setdefault(head, {}).setdefault(acc, (idx, combo))
+
+        # intégration : le SupportSet ne garde que les supports minimaux
+        delta = {}
+        for head, cands in fresh.items():
+            added = supports[head].update(cands)
+            if added:
+                delta[head] = set(added)
+                added_total += len(added)
+                if dag is not None:
+                    for acc in added:
+                        idx, combo = cands[acc]
+                        dag.derive(head, acc, idx, fw.rules[idx][1], combo)
+                if ctl is not None:
+                    ctl.spend("arguments", len(added))
+                    ctl.bound("supports", len(supports[head]))
+    if prof is not None:
+        prof.count("fixpoint_rounds", rounds)
+        prof.count("combinations", combos)
+        prof.count("supports_pruned", combos - added_total)
+    return supports
+
+
+def saturate_stratified(fw, supports, graph=None, dag=None):
+    """
+    Même résultat que saturate(fw, supports), strate par strate : les composantes
+    du graphe de dépendance sont prises dans l'ordre topologique, leurs prémisses
+    extérieures sont donc déjà définitives. Une composante acyclique ne demande
+    qu'un passage sur ses règles ; seule une composante cyclique est saturée
+    jusqu'à stabilité. Les règles mortes (prémisse sans argument) sont sautées.
+    dag : voir saturate.
+    """
+    ctl = current()
+    prof = current_profile()
+    graph = graph or RuleGraph(fw)
+    combos = added = 0
+    dead = set(graph.dead)
+    n = len(graph.components)
+    for k, comp in enumerate(graph.components):
+        if ctl is not None:
+            ctl.progress("derive", k, n)
+            ctl.check()
+        rule_ids = [idx for l in comp for idx in graph.heads[l] if idx not in dead]
+        if not rule_ids:
+            continue
+        if graph.cyclic[k]:
+            delta = {b: set(supports[b]) for idx in rule_ids for b in fw.rules[idx][1]}
+            saturate(fw, supports, rule_ids, delta, dag)
+            continue
+        # un seul littéral, sans boucle : un passage suffit
+        head = comp[0]
+        store = supports[head]
+        cands = set() if dag is None else {}
+        for idx in rule_ids:
+            body = fw.rules[idx][1]
+            if not body:
+                continue
+            if prof is not None or ctl is not None:
+                size = 1
+                for b in body:
+                    size *= len(supports[b])
+                combos += size
+                if ctl is not None:
+                    ctl.spend("combinations", size)
+            for combo in product(*(supports[b] for b in body)):
+                if ctl is not None:
+                    ctl.checkpoint()
+                acc = 0
+                for m in combo:
+                    acc |= m
+                if not store.covers(acc):
+                    if dag is None:
+                        cands.add(acc)
+                    else:
+                        cands.setdefault(acc, (idx, combo))
+        fresh = store.update(cands)
+        if dag is not None:
+            for acc in fresh:
+                idx, combo = cands[acc]
+                dag.derive(head, acc, idx, fw.rules[idx][1], combo)
+        new = len(fresh)
+        added += new
+        if ctl is not None:
+            ctl.spend("arguments", new)
+            ctl.bound("supports", len(store))
+    if prof is not None:
+        # passages uniques des strates acycliques (les cycliques comptent dans saturate)
+        prof.count("fixpoint_rounds", 1)
+        prof.count("combinations", combos)
+        prof.count("supports_pruned", combos - added)
+    return supports
+
+
 class ABA:
     """
     Cadre ABA minimal :
@@ -65,91 +236,105 @@ class ABA:
 
     # ---------- génération d'arguments ----------
 
+    def compile(self):
+        """Représentation compilée (ids entiers, supports en masques)."""
+        return CompiledABA.from_aba(self)
+
+    def derive_supports(self, fw, supports, dag=None):
+        """
+        Remplit `supports` (SupportSet par id de littéral) : supports minimaux
+        de chaque littéral ; dag : DerivationDAG où noter leurs dérivations.
+        """
+        # une assumption prouve elle-même
+        for bit, lid in enumerate(fw.asm_lit):
+            supports[lid].add(1 << bit)
+            if dag is not None:
+                dag.assume(lid, 1 << bit)
+
+        # règles sans prémisses
+        for idx, (head, body) in enumerate(fw.rules):
+            if not body and supports[head].add(0) and dag is not None:
+                dag.derive(head, 0, idx, (), ())
+
+        saturate_stratified(fw, supports, dag=dag)
+
     def derive_arguments(self):
         """
         Génère tous les arguments minimaux possibles.
-        Un argument = {"id": int, "assumptions": frozenset(...), "conclusion": literal}
+        Un argument = Argument(id, mask, concl) : support en masque d'assumptions,
+        lisible comme {"id": int, "assumptions": frozenset(...), "conclusion": literal}
         """
-        supports = {l: set() for l in self.literals}
+        return list(self.iter_arguments())
 
-        # une assumption prouve elle-même
-        for a in self.assumptions:
-            supports[a].add(frozenset([a]))
+    def derivations(self):
+        """
+        (arguments, DerivationDAG) : mêmes arguments que derive_arguments, plus
+        une dérivation partagée par support (dag.node_of(arg), dag.tree(...)).
+        """
+        dag = DerivationDAG()
+        return list(self.iter_arguments(dag)), dag
 
-        # règles sans prémisses
-        for r in self.rules:
-            if not r.get("body", []):
-                supports[r["head"]].add(frozenset())
-
-        # fermeture par règles jusqu'à stabilité
-        def minimalize(sets_):
-            lst = list(sets_)
-            keep = []
-            n = len(lst)
-            for i in range(n):
-                s = lst[i]
-                ok = True
-                for j in range(n):
-                    if i == j: 
-                        continue
-                    if lst[j] < s:  # strict subset
-                        ok = False
-                        break
-                if ok:
-                    keep.append(s)
-            return set(keep)
-
-        changed = True
-        while changed:
-            changed = False
-            for r in self.rules:
-                head = r["head"]
-                body = r.get("body", [])
-                if not body:
-                    continue
-                # il faut que toutes les prémisses soient déjà prouvables
-                for b in body:
-                    if len(supports[b]) == 0:
-                        break
-                else:
-                    # composer les supports
-                    pools = [list(supports[b]) for b in body]
-                    for combo in product(*pools):
-                        acc = frozenset().union(*combo)
-                        if acc not in supports[head]:
-                            supports[head].add(acc)
-                            changed = True
-                    # garder les supports minimaux
-                    new_min = minimalize(supports[head])
-                    if new_min != supports[head]:
-                        supports[head] = new_min
-                        changed = True
-
-        # conversion en liste
-        args = []
+    def iter_arguments(self, dag=None):
+        """
+        Version flux de derive_arguments (mêmes arguments, même ordre).
+        La saturation doit aboutir avant le premier argument (un support peut
+        être remplacé par un plus petit jusqu'au bout) ; les Argument ne sont
+        ensuite créés qu'au fil de la lecture.
+        Budgets (contrôle actif) : en mode partiel, un dépassement pendant la
+        saturation rend les supports déjà trouvés (des arguments valides, pas
+        forcément minimaux ni complets), et au-delà de "arguments" les premiers.
+        """
+        ctl = current()
+        fw = self.compile()
+        if dag is not None:
+            dag.fw = fw
+        supports = [SupportSet() for _ in range(len(fw.lit_names))]
+        try:
+            self.derive_supports(fw, supports, dag)
+        except BudgetExceeded as e:
+            ctl.truncate(e)
+
+        n_max = None
+        if ctl is not None:
+            try:
+                ctl.bound("arguments", sum(len(Sset) for Sset in supports))
+            except BudgetExceeded as e:
+                ctl.truncate(e)
+                n_max = e.limit
+
+        # ordre : conclusion puis masque
         k = 0
-        for concl, Sset in supports.items():
-            for S in Sset:
-                args.append({"id": k, "assumptions": S, "conclusion": concl})
+        for concl, Sset in enumerate(supports):
+            for S in sorted(Sset):
+                if k == n_max:
+                    return
+                yield Argument(k, S, concl, fw)
                 k += 1
-        return args
 
     # ---------- export ----------
 
-    def export_results(self, args, attacks):
-        out_args = []
-        for a in args:
-            out_args.append({
-                "id": a["id"],
-                "conclusion": a["conclusion"],
-                "assumptions": sorted(list(a["assumptions"]))
-            })
+    def export_framework(self):
         return {
             "literals": sorted(self.literals),
             "assumptions": sorted(self.assumptions),
             "contraries": dict(self.contraries),
-            "rules": self.rules,
-            "preferences": self.preferences,
-            "arguments": out_args,
-            "attacks": attacks
+            "rules": [dict(r) for r in self.rules],
+            "preferences": dict(self.preferences),
         }
+
+    @staticmethod
+    def export_argument(a):
+        # seul endroit où les ids/masques redeviennent des noms
+        fw = a.fw
+        return {
+            "id": a.id,
+            "conclusion": fw.lit_names[a.concl],
+            "assumptions": fw.sorted_names_of(a.mask)
+        }
+
+    def export_results(self, args, attacks):
+        fw, args = compile_arguments(self, args)
+        res = self.export_framework()
+        res["arguments"] = [self.export_argument(a) for a in args]
+        res["attacks"] = attacks
+        return res
@@ -0,0 +1,97 @@
+class DerivationDAG:
+    """
+    Dérivations des supports minimaux, partagées (hash-consing) :
+    un nœud = (conclusion, règle, nœuds enfants), stocké une seule fois ;
+    une assumption est une feuille (règle -1). Chaque support (littéral, masque)
+    pointe vers le nœud qui l'a produit. La mémoire est proportionnelle au
+    nombre d'étapes de dérivation distinctes, pas à la taille des arbres.
+    Rempli par la saturation quand il est passé à derive_supports.
+    """
+
+    __slots__ = ("fw", "concl", "rule", "children", "_key", "best")
+
+    def __init__(self, fw=None):
+        self.fw = fw
+        self.concl = []
+        self.rule = []
+        self.children = []
+        self._key = {}
+        self.best = {}   # (id de littéral, masque) -> nœud
+
+    def __len__(self):
+        return len(self.rule)
+
+    def intern(self, concl, rule, children):
+        key = (concl, rule, children)
+        node = self._key.get(key)
+        if node is None:
+            node = self._key[key] = len(self.rule)
+            self.concl.append(concl)
+            self.rule.append(rule)
+            self.children.append(children)
+        return node
+
+    def assume(self, lid, mask):
+        """Feuille : l'assumption `lid` (support `mask`) se prouve elle-même."""
+        self.best[(lid, mask)] = self.intern(lid, -1, ())
+
+    def derive(self, head, mask, rule, body, combo):
+        """Support `mask` de `head` obtenu par la règle `rule` avec les supports `combo` du corps."""
+        best = self.best
+        children = tuple(best[(b, m)] for b, m in zip(body, combo))
+        best[(head, mask)] = self.intern(head, rule, children)
+
+    def node_of(self, arg):
+        """Nœud racine de la dérivation d'un Argument."""
+        return self.best[(arg.concl, arg.mask)]
+
+    def export_node(self, node):
+        fw = self.fw
+        r = self.rule[node]
+        return {
+            "id": node,
+            "conclusion": fw.lit_names[self.concl[node]],
+            "rule": None if r < 0 else r,
+            "children": list(self.children[node]),
+        }
+
+    def subgraph(self, roots, depth=None):
+        """
+        Nœuds atteignables depuis `roots` (au plus `depth` niveaux sous une racine),
+        chacun une seule fois : {"nodes": [export_node, ...], "frontier": [ids]}.
+        La frontière (enfants pas encore envoyés) se développe par un nouvel
+        appel qui les prend comme racines.
+        """
+        seen = set()
+        nodes = []
+        level = list(dict.fromkeys(roots))
+        k = 0
+        while level and (depth is None or k <= depth):
+            nxt = []
+            for n in level:
+                if n in seen:
+                    continue
+                seen.add(n)
+                nodes.append(self.export_node(n))
+                nxt.extend(c for c in self.children[n] if c not in seen)
+            level = list(dict.fromkeys(nxt))
+            k += 1
+        frontier = sorted(set(level) - seen)
+        return {"nodes": sorted(nodes, key=lambda x: x["id"]), "frontier": frontier}
+
+    def tree(self, root, depth=None):
+        """
+        Arbre de preuve développé depuis `root` (sous-arbres partagés recopiés) ;
+        au-delà de `depth`, un enfant reste {"id": id} à développer plus tard.
+        """
+        top = self.export_node(root)
+        # pile explicite : pas de limite de récursion sur les longues chaînes
+        stack = [(top, 0)]
+        while stack:
+            out, k = stack.pop()
+            if depth is not None and k >= depth:
+                out["children"] = [{"id": c} for c in out["children"]]
+                continue
+            out["children"] = [self.export_node(c) for c in out["children"]]
+            stack.extend((c, k + 1) for c in out["children"])
+        return top
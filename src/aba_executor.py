@@ -0,0 +1,128 @@
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+import asyncio
+import os
+import threading
+
+from src.aba_control import Control, TimedOut, cap_timeout, limits_from_env
+
+
+class Overloaded(Exception):
+    """File d'attente pleine : la requête est refusée (HTTP 503)."""
+
+
+def _take(it, n):
+    return list(islice(it, n))
+
+
+class SolverPool:
+    """
+    Exécution des calculs hors de la boucle asyncio :
+      - workers   : threads de calcul ;
+      - max_queue : calculs en attente acceptés au-delà des workers (sinon Overloaded) ;
+      - timeout   : échéance par défaut d'un calcul, en secondes (None = aucune) ;
+      - limits    : plafonds de budget de chaque calcul (voir aba_control.RESOURCES).
+    L'échéance est coopérative : les boucles du solveur appellent
+    Control.checkpoint() et lèvent TimedOut, ce qui libère le worker ; de même
+    un budget dépassé lève BudgetExceeded avant que le calcul n'explose.
+    """
+
+    def __init__(self, workers=None, max_queue=32, timeout=None, limits=None):
+        self.workers = workers or min(8, os.cpu_count() or 1)
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.limits = dict(limits or {})
+        self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="aba-solver")
+        # pending / rejected / timeouts : modifiés depuis la boucle asyncio ;
+        # running : depuis les workers (sous verrou)
+        self._lock = threading.Lock()
+        self.running = 0
+        self.pending = 0
+        self.rejected = 0
+        self.timeouts = 0
+
+    @classmethod
+    def from_env(cls):
+        """
+        Configuration par ABA_WORKERS / ABA_MAX_QUEUE / ABA_TIMEOUT (0 = sans échéance)
+        et ABA_MAX_ARGUMENTS / ABA_MAX_SUPPORTS / ABA_MAX_COMBINATIONS / ABA_MAX_PAIRS.
+        """
+        workers = int(os.environ.get("ABA_WORKERS", "0")) or None
+        timeout = float(os.environ.get("ABA_TIMEOUT", "60")) or None
+        return cls(workers, int(os.environ.get("ABA_MAX_QUEUE", "32")), timeout, limits_from_env())
+
+    def limit(self, requested=None):
+        """Échéance effective : celle demandée, plafonnée par celle du serveur."""
+        return cap_timeout(requested, self.timeout)
+
+    async def run(self, fn, *args, timeout=None, deadline=True, ctl=None):
+        """
+        Exécute fn(*args) dans un worker, sous un Control actif.
+        timeout  : échéance demandée (plafonnée par celle du pool) ;
+        deadline : False pour un calcul qui ne doit pas être interrompu
+                   (édition de session), seule l'admission s'applique alors
+                   (ni échéance ni budgets) ;
+        ctl      : contrôle à utiliser à la place d'un nouveau (calcul réparti
+                   sur plusieurs appels, voir pull) ; timeout et deadline ignorés.
+        """
+        if self.pending >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise Overloaded("serveur occupé, réessayer plus tard")
+        if ctl is None:
+            ctl = Control(self.limit(timeout), limits=self.limits) if deadline else Control()
+        self.pending += 1
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._executor, self._call, ctl, fn, args)
+        except TimedOut:
+            self.timeouts += 1
+            raise
+        except asyncio.CancelledError:
+            # client parti : le worker s'arrête au prochain checkpoint
+            ctl.cancel()
+            raise
+        finally:
+            self.pending -= 1
+
+    async def pull(self, records, ctl, size=256):
+        """
+        Consomme l'itérateur `records` (flux NDJSON) par paquets de `size`,
+        chaque paquet calculé dans un worker sous le même contrôle `ctl`
+        (échéance et budgets de tout le flux) : le flux passe par l'admission
+        (Overloaded) et ne dépasse pas le nombre de workers. Générateur
+        asynchrone de listes ; à sa fermeture (client parti, erreur), ctl est
+        annulé et un paquet en cours s'arrête au prochain checkpoint.
+        """
+        try:
+            while True:
+                chunk = await self.run(_take, records, size, ctl=ctl)
+                if not chunk:
+                    return
+                yield chunk
+        finally:
+            ctl.cancel()
+
+    def _call(self, ctl, fn, args):
+        with self._lock:
+            self.running += 1
+        try:
+            with ctl.active():
+                return fn(*args)
+        finally:
+            with self._lock:
+                self.running -= 1
+
+    def stats(self):
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "timeout": self.timeout,
+            "limits": dict(self.limits),
+            "running": self.running,
+            "queued": max(0, self.pending - self.running),
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+        }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
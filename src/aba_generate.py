@@ -0,0 +1,98 @@
+"""
+Générateur de cadres ABA synthétiques (reproductibles par graine).
+
+    python -m src.aba_generate --literals 200 --assumptions 30 --depth 6 --seed 1 > cadre.txt
+"""
+import argparse
+import random
+import sys
+
+
+def generate(n_literals=50, n_assumptions=10, fan_in=2, depth=4, cycle_density=0.0,
+             pref_density=0.0, rules_per_literal=2, seed=0):
+    """
+    Cadre synthétique au format de parse_any (dict) :
+      - n_literals        : littéraux en tout (assumptions comprises) ;
+      - n_assumptions     : assumptions (a0, a1, ...), chacune avec un contraire ;
+      - fan_in            : prémisses par règle (au plus) ;
+      - depth             : couches de non-assumptions (p0, p1, ...) ; une règle de
+                            couche k ne s'appuie que sur des couches < k et des
+                            assumptions, d'où des chaînes de longueur `depth` ;
+      - cycle_density     : probabilité qu'une prémisse vienne d'une couche >= k
+                            (arête retour, crée des cycles) ;
+      - pref_density      : part des assumptions qui reçoivent un rang de préférence ;
+      - rules_per_literal : règles par non-assumption (en moyenne).
+    """
+    if n_assumptions < 1 or n_literals <= n_assumptions:
+        raise ValueError("il faut au moins une assumption et une non-assumption")
+    rng = random.Random(seed)
+    asms = [f"a{i}" for i in range(n_assumptions)]
+    lits = [f"p{i}" for i in range(n_literals - n_assumptions)]
+    depth = max(1, min(depth, len(lits)))
+    # couches de taille à peu près égale
+    layers = [lits[k * len(lits) // depth:(k + 1) * len(lits) // depth] for k in range(depth)]
+
+    rules = []
+    for k, layer in enumerate(layers):
+        below = [p for l in layers[:k] for p in l]
+        above = [p for l in layers[k:] for p in l]
+        for head in layer:
+            for _ in range(max(1, round(rng.uniform(0.5, 1.5) * rules_per_literal))):
+                body = []
+                for _ in range(rng.randint(1, max(1, fan_in))):
+                    r = rng.random()
+                    if r < cycle_density:
+                        body.append(rng.choice(above))
+                    elif below and r < 0.5 + cycle_density / 2:
+                        body.append(rng.choice(below))
+                    else:
+                        body.append(rng.choice(asms))
+                rules.append({"head": head, "body": list(dict.fromkeys(body))})
+
+    contraries = {a: rng.choice(lits) for a in asms}
+    ranked = [a for a in asms if rng.random() < pref_density]
+    preferences = {a: rng.randint(0, 3) for a in ranked}
+    return {
+        "literals": asms + lits,
+        "assumptions": asms,
+        "contraries": contraries,
+        "rules": rules,
+        "preferences": preferences,
+    }
+
+
+def to_text(data):
+    """Cadre (dict) -> format texte lu par parse_aba_text."""
+    lines = [
+        f"L: [{', '.join(data['literals'])}]",
+        f"A: [{', '.join(data['assumptions'])}]",
+    ]
+    lines += [f"C({a}): {c}" for a, c in data["contraries"].items()]
+    lines += [f"[r{i}]: {r['head']} <- {', '.join(r['body'])}" for i, r in enumerate(data["rules"])]
+    prefs = data.get("preferences") or {}
+    if prefs:
+        levels = {}
+        for a, r in prefs.items():
+            levels.setdefault(r, []).append(a)
+        lines.append("PREF: " + " > ".join(", ".join(levels[r]) for r in sorted(levels)))
+    return "\n".join(lines) + "\n"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m src.aba_generate", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--literals", type=int, default=50)
+    parser.add_argument("--assumptions", type=int, default=10)
+    parser.add_argument("--fan-in", type=int, default=2)
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--cycles", type=float, default=0.0, help="densité d'arêtes retour (0-1)")
+    parser.add_argument("--prefs", type=float, default=0.0, help="part des assumptions classées (0-1)")
+    parser.add_argument("--rules-per-literal", type=float, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    data = generate(args.literals, args.assumptions, args.fan_in, args.depth, args.cycles,
+                    args.prefs, args.rules_per_literal, args.seed)
+    sys.stdout.write(to_text(data))
+
+
+if __name__ == "__main__":
+    main()
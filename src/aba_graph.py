@@ -0,0 +1,125 @@
+def dependency_graph(rules, assumptions):
+    """
+    Graphe de dépendance des règles : tête -> non-assumptions de ses corps.
+    rules : dicts {"head", "body"} ; seuls les littéraux qui apparaissent
+    (têtes ou corps) sont des sommets.
+    """
+    A = set(assumptions)
+    succ = {}
+    for r in rules:
+        deps = succ.setdefault(r["head"], set())
+        for b in r.get("body", []):
+            if b not in A:
+                deps.add(b)
+                succ.setdefault(b, set())
+    return succ
+
+
+def strongly_connected(succ):
+    """
+    Composantes fortement connexes (Tarjan, itératif) de succ : sommet -> voisins.
+    Ordre de sortie : une composante après toutes celles dont elle dépend
+    (feuilles d'abord).
+    """
+    index = {}
+    low = {}
+    stack = []
+    on_stack = set()
+    out = []
+    counter = 0
+
+    for root in succ:
+        if root in index:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(succ[root]))]
+        while work:
+            v, it = work[-1]
+            advanced = False
+            for w in it:
+                if w not in index:
+                    index[w] = low[w] = counter
+                    counter += 1
+                    stack.append(w)
+                    on_stack.add(w)
+                    work.append((w, iter(succ.get(w, ()))))
+                    advanced = True
+                    break
+                if w in on_stack and index[w] < low[v]:
+                    low[v] = index[w]
+            if advanced:
+                continue
+            work.pop()
+            if work:
+                u = work[-1][0]
+                if low[v] < low[u]:
+                    low[u] = low[v]
+            if low[v] == index[v]:
+                comp = []
+                while True:
+                    w = stack.pop()
+                    on_stack.discard(w)
+                    comp.append(w)
+                    if w == v:
+                        break
+                out.append(comp)
+    return out
+
+
+def cyclic_components(succ):
+    """Composantes qui portent un cycle (plusieurs sommets, ou une boucle sur soi)."""
+    return [
+        comp for comp in strongly_connected(succ)
+        if len(comp) > 1 or comp[0] in succ.get(comp[0], ())
+    ]
+
+
+class RuleGraph:
+    """
+    Analyse du graphe de dépendance d'un cadre compilé (ids de littéraux),
+    construite une fois :
+      - heads / users  : littéral -> règles qui le concluent / qui l'utilisent ;
+      - components     : composantes fortement connexes, feuilles d'abord
+                         (une composante ne dépend que des précédentes) ;
+      - cyclic         : composante portant un cycle (donc à saturer) ;
+      - derivable      : littéraux qui ont au moins un argument ;
+      - dead           : règles dont une prémisse n'a aucun argument.
+    """
+
+    def __init__(self, fw):
+        n = len(fw.lit_names)
+        self.heads = [[] for _ in range(n)]
+        self.users = [[] for _ in range(n)]
+        succ = {l: set() for l in range(n)}
+        for idx, (head, body) in enumerate(fw.rules):
+            self.heads[head].append(idx)
+            for b in body:
+                if not self.users[b] or self.users[b][-1] != idx:
+                    self.users[b].append(idx)
+                succ[head].add(b)
+
+        self.components = strongly_connected(succ)
+        self.cyclic = [len(c) > 1 or c[0] in succ[c[0]] for c in self.components]
+
+        # dérivabilité : propagation avec compteur de prémisses manquantes par règle
+        self.derivable = [False] * n
+        missing = [len(set(body)) for _, body in fw.rules]
+        queue = list(fw.asm_lit)
+        queue += [head for head, body in fw.rules if not body]
+        while queue:
+            l = queue.pop()
+            if self.derivable[l]:
+                continue
+            self.derivable[l] = True
+            for idx in self.users[l]:
+                missing[idx] -= 1
+                if missing[idx] == 0:
+                    queue.append(fw.rules[idx][0])
+        self.dead = [idx for idx, m in enumerate(missing) if m]
+
+    def underivable(self):
+        """Ids des littéraux sans aucun argument."""
+        return [l for l, ok in enumerate(self.derivable) if not ok]
@@ -0,0 +1,161 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import os
+import threading
+import time
+import uuid
+
+from src.aba_control import Cancelled, Control, limits_from_env
+from src.aba_executor import Overloaded
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+
+
+class Job:
+    """Un calcul soumis : état, avancement (via son Control) et résultat (bytes JSON)."""
+
+    def __init__(self):
+        self.id = uuid.uuid4().hex
+        self.status = QUEUED
+        self.ctl = Control()
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+
+    def info(self):
+        ctl = self.ctl
+        out = {
+            "id": self.id,
+            "status": self.status,
+            "stage": ctl.stage,
+            "progress": {"done": ctl.done, "total": ctl.total},
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+        }
+        if self.error is not None:
+            out["error"] = self.error
+        return out
+
+
+class JobManager:
+    """
+    Calculs longs en arrière-plan (threads dédiés, séparés du SolverPool) :
+      - workers  : jobs exécutés en même temps ;
+      - max_jobs : jobs gardés en mémoire ; au-delà, les plus anciens terminés
+                   sont oubliés, et une soumission est refusée (Overloaded)
+                   si tous sont encore en attente ou en cours ;
+      - timeout  : échéance d'un job en secondes (None = aucune) ;
+      - limits   : plafonds de budget d'un job (voir aba_control.RESOURCES).
+    L'annulation est coopérative (Control.cancel) : le worker s'arrête au
+    prochain checkpoint et reste disponible.
+    """
+
+    def __init__(self, workers=2, max_jobs=256, timeout=None, limits=None):
+        self.workers = workers
+        self.max_jobs = max_jobs
+        self.timeout = timeout
+        self.limits = dict(limits or {})
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix="aba-job")
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        """
+        Configuration par ABA_JOB_WORKERS / ABA_MAX_JOBS / ABA_JOB_TIMEOUT (0 = sans échéance) ;
+        budgets : mêmes plafonds ABA_MAX_* que le SolverPool.
+        """
+        return cls(
+            workers=int(os.environ.get("ABA_JOB_WORKERS", "2")),
+            max_jobs=int(os.environ.get("ABA_MAX_JOBS", "256")),
+            timeout=float(os.environ.get("ABA_JOB_TIMEOUT", "0")) or None,
+            limits=limits_from_env(),
+        )
+
+    def submit(self, fn, *args, on_done=None):
+        """
+        Lance fn(*args) (qui renvoie des bytes) en arrière-plan et retourne le Job.
+        on_done(result) est appelé après un calcul réussi (ex. mise en cache).
+        """
+        job = Job()
+        with self._lock:
+            self._evict()
+            if len(self._jobs) >= self.max_jobs:
+                raise Overloaded("trop de jobs en cours, réessayer plus tard")
+            self._jobs[job.id] = job
+        self._executor.submit(self._run, job, fn, args, on_done)
+        return job
+
+    def completed(self, result):
+        """Job déjà terminé (résultat trouvé en cache) : même interface, sans calcul."""
+        job = Job()
+        job.status = DONE
+        job.result = result
+        job.started = job.finished = job.created
+        with self._lock:
+            self._evict()
+            self._jobs[job.id] = job
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        job = self.get(job_id)
+        if job is not None and job.status in (QUEUED, RUNNING):
+            job.ctl.cancel()
+        return job
+
+    def stats(self):
+        with self._lock:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+        return {"workers": self.workers, "max_jobs": self.max_jobs, "jobs": counts}
+
+    def shutdown(self):
+        for job in list(self._jobs.values()):
+            job.ctl.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    # ---------- interne ----------
+
+    def _run(self, job, fn, args, on_done):
+        if job.ctl.cancelled:
+            job.status = CANCELLED
+            job.finished = time.time()
+            return
+        job.status = RUNNING
+        job.started = time.time()
+        if self.timeout:
+            # l'échéance court à partir du démarrage, pas de la soumission
+            job.ctl.deadline = time.monotonic() + self.timeout
+        job.ctl.limits = dict(self.limits)
+        try:
+            with job.ctl.active():
+                result = fn(*args)
+            job.result = result
+            job.status = DONE
+        except Cancelled:
+            job.status = CANCELLED
+        except Exception as e:
+            # y compris TimedOut (échéance du job)
+            job.error = str(e)
+            job.status = FAILED
+        finally:
+            job.finished = time.time()
+        if job.status == DONE and on_done is not None:
+            on_done(job.result)
+
+    def _evict(self):
+        # appelé sous verrou : oublie les plus anciens jobs terminés
+        if len(self._jobs) < self.max_jobs:
+            return
+        for jid in [j for j, job in self._jobs.items() if job.status in (DONE, FAILED, CANCELLED)]:
+            del self._jobs[jid]
+            if len(self._jobs) < self.max_jobs:
+                break
@@ -0,0 +1,155 @@
+"""
+Relation d'attaque argument -> argument sur tableaux NumPy (dépendance facultative).
+
+    pip install numpy
+
+Même résultat que compute_attacks (mêmes arêtes, types, témoins et ordre), mais
+calculé par lots : matrice booléenne des supports (arguments x assumptions),
+vecteurs conclusion / contraire, test de préférence pour tous les couples
+(argument, témoin) par un seul produit matriciel, puis jointure vectorisée
+témoin par témoin. La relation est gardée en CSR (attaquant -> cibles, par
+position) ; les dicts de l'API ne sont produits qu'à la sortie (to_dicts).
+"""
+from src.aba_compiled import compile_arguments, iter_bits
+from src.aba_control import current
+from src.aba_metrics import current as current_profile
+from src.aba_semantics import AttackGraph
+
+try:
+    import numpy as np
+except ImportError:  # backend facultatif
+    np = None
+
+KINDS = ("normal", "reverse")
+
+
+def available():
+    return np is not None
+
+
+def support_matrix(fw, args):
+    """Matrice booléenne (arguments x assumptions) : S[k, b] = b ∈ Supp(args[k])."""
+    S = np.zeros((len(args), fw.n_assumptions), dtype=bool)
+    for k, a in enumerate(args):
+        for b in iter_bits(a.mask):
+            S[k, b] = True
+    return S
+
+
+def worse_matrix(fw):
+    """W[b, x] = x strictement moins préférée que b (voir CompiledABA.worse)."""
+    n = fw.n_assumptions
+    W = np.zeros((n, n), dtype=bool)
+    for b, w in enumerate(fw.worse):
+        for x in iter_bits(w):
+            W[b, x] = True
+    return W
+
+
+class AttackMatrix:
+    """
+    Attaques en CSR, indexées par position d'argument :
+      - indptr / indices : cibles de chaque attaquant (triées) ;
+      - kind             : 0 normal, 1 reverse (par arête) ;
+      - witness          : bit du témoin (plus petite assumption) ;
+      - order            : arêtes dans l'ordre de sortie de compute_attacks.
+    """
+
+    __slots__ = ("fw", "ids", "indptr", "indices", "kind", "witness", "order")
+
+    def __init__(self, aba, args, use_preferences=False):
+        if np is None:
+            raise ValueError("backend numpy indisponible (pip install numpy)")
+        fw, args = compile_arguments(aba, args)
+        self.fw = fw
+        self.ids = np.array([a.id for a in args], dtype=np.int64)
+        n = len(args)
+        n_asm = fw.n_assumptions
+        ctl = current()
+        prof = current_profile()
+
+        S = support_matrix(fw, args)
+        concl = np.array([a.concl for a in args], dtype=np.int64)
+        if use_preferences and any(fw.worse):
+            # L[k, b] : Supp(args[k]) contient une assumption pire que b
+            L = (S.astype(np.int32) @ worse_matrix(fw).T.astype(np.int32)) > 0
+        else:
+            L = np.zeros((n, n_asm), dtype=bool)
+
+        # jointure contrary(b) = concl(A), b ∈ Supp(B), un témoin à la fois
+        src, dst, kind, bit, rank = [], [], [], [], []
+        for b, c in enumerate(fw.contrary):
+            if ctl is not None:
+                ctl.progress("attacks", b, n_asm)
+                ctl.checkpoint()
+            if c < 0:
+                continue
+            att = np.flatnonzero(concl == c)
+            tgt = np.flatnonzero(S[:, b])
+            if not len(att) or not len(tgt):
+                continue
+            pa = np.repeat(att, len(tgt))
+            pb = np.tile(tgt, len(att))
+            less = L[pa, b]
+            src.append(np.where(less, pb, pa))
+            dst.append(np.where(less, pa, pb))
+            kind.append(less.astype(np.int8))
+            bit.append(np.full(len(pa), b, dtype=np.int32))
+            # rang de l'événement dans le parcours de compute_attacks
+            rank.append((pa * n + pb) * n_asm + b)
+
+        if not src:
+            self.indptr = np.zeros(n + 1, dtype=np.int64)
+            self.indices = np.zeros(0, dtype=np.int64)
+            self.kind = np.zeros(0, dtype=np.int8)
+            self.witness = np.zeros(0, dtype=np.int32)
+            self.order = np.zeros(0, dtype=np.int64)
+            return
+        src, dst = np.concatenate(src), np.concatenate(dst)
+        kind, bit, rank = np.concatenate(kind), np.concatenate(bit), np.concatenate(rank)
+        if prof is not None:
+            prof.count("attack_pairs", len(src))
+
+        # une arête par paire : normal d'abord, puis plus petit témoin
+        key = src * n + dst
+        perm = np.lexsort((bit, kind, key))
+        key, kind, bit, rank = key[perm], kind[perm], bit[perm], rank[perm]
+        first = np.flatnonzero(np.r_[True, key[1:] != key[:-1]])
+        edges = key[first]
+        rows = edges // n
+        self.indices = edges % n
+        self.kind = kind[first]
+        self.witness = bit[first]
+        self.indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n), out=self.indptr[1:])
+        self.order = np.argsort(np.minimum.reduceat(rank, first), kind="stable")
+
+    def __len__(self):
+        return len(self.indices)
+
+    def rows(self):
+        """Position de l'attaquant de chaque arête (ordre CSR)."""
+        return np.repeat(np.arange(len(self.indptr) - 1), np.diff(self.indptr))
+
+    def to_dicts(self):
+        """Arêtes au format de compute_attacks (même ordre)."""
+        ids = self.ids
+        names = self.fw.asm_names
+        o = self.order
+        # conversion en listes Python par tableau entier, pas élément par élément
+        attackers = ids[self.rows()[o]].tolist()
+        targets = ids[self.indices[o]].tolist()
+        kinds = self.kind[o].tolist()
+        witnesses = self.witness[o].tolist()
+        return [
+            {"attacker": i, "target": j, "kind": KINDS[k], "witness": names[w]}
+            for i, j, k, w in zip(attackers, targets, kinds, witnesses)
+        ]
+
+    def graph(self, args):
+        """AttackGraph (positions = celles de args) construit depuis le CSR, sans dicts."""
+        g = AttackGraph(args)
+        for i, j in zip(self.rows().tolist(), self.indices.tolist()):
+            g.targets[i].add(j)
+            g.attackers[j].add(i)
+        return g
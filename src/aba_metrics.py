@@ -0,0 +1,143 @@
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+import threading
+import time
+
+_current = ContextVar("aba_profile", default=None)
+
+
+def current():
+    """Profil actif pour le calcul en cours (None hors d'un `Profile.active()`)."""
+    return _current.get()
+
+
+def stage(name):
+    """Chronomètre l'étape `name` si un profil est actif (sinon bloc vide)."""
+    prof = _current.get()
+    return nullcontext() if prof is None else prof.stage(name)
+
+
+class Profile:
+    """
+    Mesures d'un calcul : temps par étape (secondes, cumulées) et compteurs
+    de travail. Comme Control, les boucles récupèrent le profil une fois
+    (current()) et ne comptent que s'il existe ; les compteurs sont cumulés
+    localement puis ajoutés en fin de boucle. Sans profil actif, le coût est
+    un test `is not None`.
+    Compteurs : fixpoint_rounds, combinations (produits de supports essayés),
+    supports_pruned (combinaisons sans nouveau support minimal),
+    attack_pairs (paires candidates examinées), coalitions, labellings.
+    """
+
+    __slots__ = ("stages", "counters")
+
+    def __init__(self):
+        self.stages = {}
+        self.counters = {}
+
+    @contextmanager
+    def stage(self, name):
+        t0 = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.add_time(name, time.perf_counter() - t0)
+
+    def add_time(self, name, seconds):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def report(self):
+        """Bloc `_profile` de la réponse."""
+        return {
+            "stages": {k: round(v, 6) for k, v in self.stages.items()},
+            "counters": dict(self.counters),
+        }
+
+    @contextmanager
+    def active(self):
+        """Rend ce profil visible (current()) le temps du bloc."""
+        token = _current.set(self)
+        try:
+            yield self
+        finally:
+            _current.reset(token)
+
+
+def _labels(**labels):
+    return "{" + ",".join(f'{k}="{v}"' for k, v in sorted(labels.items())) + "}"
+
+
+class Metrics:
+    """
+    Agrégat des profils de toutes les requêtes, rendu au format texte
+    Prometheus (GET /metrics). Thread-safe.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stage_seconds = {}
+        self.stage_calls = {}
+        self.counters = {}
+        self.requests = {}
+
+    def record(self, prof):
+        with self._lock:
+            for name, seconds in prof.stages.items():
+                self.stage_seconds[name] = self.stage_seconds.get(name, 0.0) + seconds
+                self.stage_calls[name] = self.stage_calls.get(name, 0) + 1
+            for name, n in prof.counters.items():
+                self.counters[name] = self.counters.get(name, 0) + n
+
+    def request(self, endpoint, status):
+        with self._lock:
+            key = (endpoint, str(status))
+            self.requests[key] = self.requests.get(key, 0) + 1
+
+    def render(self, gauges=None, counters=None):
+        """
+        Texte d'exposition Prometheus ; gauges : {nom: valeur} d'état courant
+        (pool, cache, ...) ajoutées telles quelles ; counters : {nom: valeur}
+        cumuls qui ne font que croître (rejets, hits...), de type counter et
+        suffixés "_total" (rate() côté Prometheus).
+        """
+        with self._lock:
+            stage_seconds = dict(self.stage_seconds)
+            stage_calls = dict(self.stage_calls)
+            work = dict(self.counters)
+            requests = dict(self.requests)
+        out = [
+            "# HELP aba_requests_total Requêtes de calcul par endpoint et statut.",
+            "# TYPE aba_requests_total counter",
+        ]
+        for (endpoint, status), n in sorted(requests.items()):
+            out.append(f"aba_requests_total{_labels(endpoint=endpoint, status=status)} {n}")
+        out += [
+            "# HELP aba_stage_seconds_total Temps cumulé par étape de calcul.",
+            "# TYPE aba_stage_seconds_total counter",
+        ]
+        for name, s in sorted(stage_seconds.items()):
+            out.append(f"aba_stage_seconds_total{_labels(stage=name)} {s:.6f}")
+        out += [
+            "# HELP aba_stage_calls_total Nombre de passages par étape de calcul.",
+            "# TYPE aba_stage_calls_total counter",
+        ]
+        for name, n in sorted(stage_calls.items()):
+            out.append(f"aba_stage_calls_total{_labels(stage=name)} {n}")
+        out += [
+            "# HELP aba_work_total Compteurs de travail des calculs profilés.",
+            "# TYPE aba_work_total counter",
+        ]
+        for name, n in sorted(work.items()):
+            out.append(f"aba_work_total{_labels(counter=name)} {n}")
+        for name, value in sorted((counters or {}).items()):
+            if not name.endswith("_total"):
+                name += "_total"
+            out.append(f"# TYPE {name} counter")
+            out.append(f"{name} {value}")
+        for name, value in sorted((gauges or {}).items()):
+            out.append(f"# TYPE {name} gauge")
+            out.append(f"{name} {value}")
+        return "\n".join(out) + "\n"
@@ -0,0 +1,237 @@
+import re
+
+# un jeton : flèche, ponctuation, symbole (tout sauf blancs et ponctuation), ou caractère isolé
+_TOKEN = re.compile(r"[ \t]*(?:(<-)|([\[\](),:])|([^\s\[\](),:<]+)|(\S))")
+# ligne de règle bien formée "[r]: h <- b1, b2" (étiquette facultative, éléments vides
+# tolérés), reconnue directement sur le tampon : le moteur de regex saute de règle
+# en règle, seules les autres lignes passent par le tokenizer
+_SYM = r"[^\s\[\](),:<]+"
+_RULE_LINE = re.compile(
+    rf"^[ \t]*(?:\[[^\]\n]*\][ \t]*:[ \t]*)?({_SYM})[ \t]*<-"
+    rf"([ \t]*(?:{_SYM}[ \t]*)?(?:,[ \t]*(?:{_SYM}[ \t]*)?)*)\r?(?:\n|\Z)",
+    re.M,
+)
+_CHUNK = 1 << 20
+# ligne de préférences : le mot PREF (toute casse) suivi de ":" ou d'un blanc
+_PREF = re.compile(r"pref(?=[:\s]|$)", re.I)
+
+
+class ABAParseError(ValueError):
+    """Erreur de syntaxe du format texte, avec sa position (ligne et colonne à partir de 1)."""
+
+    def __init__(self, message, line, col):
+        super().__init__(f"ligne {line}, colonne {col} : {message}")
+        self.message = message
+        self.line = line
+        self.col = col
+
+
+class _Tokens:
+    """Jetons d'une ligne : (type, texte, colonne) avec type ∈ {"arrow", "punct", "sym"}."""
+
+    __slots__ = ("toks", "i", "lineno", "end")
+
+    def __init__(self, text, lineno, start=0):
+        toks = []
+        for m in _TOKEN.finditer(text, start):
+            if m.group(1):
+                toks.append(("arrow", "<-", m.start(1)))
+            elif m.group(2):
+                toks.append(("punct", m.group(2), m.start(2)))
+            elif m.group(3):
+                toks.append(("sym", m.group(3), m.start(3)))
+            elif m.group(4):
+                raise ABAParseError(f"caractère inattendu '{m.group(4)}'", lineno, m.start(4) + 1)
+        self.toks = toks
+        self.i = 0
+        self.lineno = lineno
+        self.end = len(text.rstrip())
+
+    def error(self, message, col=None):
+        if col is None:
+            col = self.toks[self.i][2] if self.i < len(self.toks) else self.end
+        return ABAParseError(message, self.lineno, col + 1)
+
+    def peek(self):
+        return self.toks[self.i] if self.i < len(self.toks) else None
+
+    def at_end(self):
+        return self.i >= len(self.toks)
+
+    def take(self, value):
+        tok = self.peek()
+        if tok is not None and tok[0] != "sym" and tok[1] == value:
+            self.i += 1
+            return True
+        return False
+
+    def expect(self, value):
+        if not self.take(value):
+            raise self.error(f"'{value}' attendu")
+
+    def symbol(self):
+        tok = self.peek()
+        if tok is None or tok[0] != "sym":
+            raise self.error("symbole attendu")
+        self.i += 1
+        return tok[1]
+
+    def finish(self):
+        if not self.at_end():
+            raise self.error(f"'{self.peek()[1]}' en trop")
+
+
+def _blocks(source):
+    """Texte entier, ou fichier lu par blocs coupés en fin de ligne."""
+    if isinstance(source, str):
+        yield source
+        return
+    rest = ""
+    while True:
+        block = source.read(_CHUNK)
+        if not block:
+            break
+        block = rest + block
+        cut = block.rfind("\n") + 1
+        rest = block[cut:]
+        if cut:
+            yield block[:cut]
+    if rest:
+        yield rest
+
+
+def parse_aba_text(source):
+    """
+    Parseur en une passe du format texte :
+        L: [a, b, ...]          littéraux
+        A: [a, ...]             assumptions
+        C(a): x                 contraire
+        [r1]: h <- b1, b2       règle (étiquette facultative : "h <- b1, b2")
+        PREF: a > b             préférences (texte, lu par parse_preferences)
+    Lignes vides et commentaires (#, %, //) ignorés ; toute autre ligne est une
+    erreur ABAParseError (ligne, colonne).
+    source : texte ou fichier texte (lu par blocs, sans tout charger).
+    Retourne le dict {"literals", "assumptions", "contraries", "rules", "preferences"}
+    attendu par ABA.from_dict ; chaque nom n'existe qu'en un exemplaire (internement).
+    """
+    symbols = {}        # internement : nom -> chaîne partagée (= les littéraux vus)
+    intern = symbols.setdefault
+    assumptions = []
+    contraries = {}
+    rules = []
+    pref_str = None
+
+    def sym(tokens):
+        s = tokens.symbol()
+        return intern(s, s)
+
+    def sym_list(tokens):
+        # [a, b, c] ou a, b, c ; les éléments vides sont ignorés, mais deux
+        # symboles doivent être séparés par une virgule
+        bracket = tokens.take("[")
+        out = []
+        after_sym = False
+        while True:
+            tok = tokens.peek()
+            if tok is None:
+                if bracket:
+                    raise tokens.error("']' attendu")
+                return out
+            if tok[0] == "sym" and not after_sym:
+                out.append(sym(tokens))
+                after_sym = True
+            elif tok[1] == "]" and bracket and tok[0] != "sym":
+                tokens.i += 1
+                tokens.finish()
+                return out
+            elif tok[1] != "," or tok[0] == "sym":
+                raise tokens.error("',' attendu")
+            else:
+                tokens.i += 1
+                after_sym = False
+
+    def rule(tokens):
+        head = sym(tokens)
+        tokens.expect("<-")
+        rules.append({"head": head, "body": sym_list(tokens)})
+
+    def line(text, lineno):
+        # toute ligne qui n'est pas une règle bien formée
+        nonlocal assumptions, pref_str
+        ln = text.strip()
+        if not ln or ln[0] in "#%" or ln.startswith("//"):
+            return
+        indent = len(text) - len(text.lstrip())
+        first = ln[0]
+
+        if _PREF.match(ln):
+            rest = ln[4:].lstrip()
+            # "pref <- ..." reste une règle (de tête pref)
+            if not rest.startswith("<-"):
+                pref_str = (rest[1:] if rest.startswith(":") else rest).strip()
+                return
+
+        if first == "[":
+            # étiquette libre jusqu'au "]", puis ": h <- ..."
+            close = text.find("]", indent)
+            if close < 0:
+                raise ABAParseError("']' attendu", lineno, len(text.rstrip()) + 1)
+            tokens = _Tokens(text, lineno, close + 1)
+            tokens.expect(":")
+            rule(tokens)
+            return
+
+        tokens = _Tokens(text, lineno)
+        toks = tokens.toks
+        second = toks[1][1] if len(toks) > 1 else None
+        if first in "LA" and toks[0][1] == first and second == ":":
+            tokens.i = 2
+            items = sym_list(tokens)
+            if first == "A":
+                assumptions = items
+        elif first in "Cc" and toks[0][1] in ("C", "c") and second == "(":
+            tokens.i = 2
+            a = sym(tokens)
+            tokens.expect(")")
+            tokens.expect(":")
+            contraries[a] = sym(tokens)
+            tokens.finish()
+        elif any(t[0] == "arrow" for t in toks):
+            rule(tokens)
+        else:
+            raise ABAParseError("ligne non reconnue (L:, A:, C(x):, [r]: h <- ..., PREF:)",
+                                lineno, indent + 1)
+
+    def gap(block, start, end, lineno):
+        for k, text in enumerate(block[start:end].split("\n")):
+            line(text.rstrip("\r"), lineno + k)
+
+    lineno = 1
+    for block in _blocks(source):
+        # numéros de ligne recalculés seulement aux trous (count en C)
+        pos = seen = 0
+        for m in _RULE_LINE.finditer(block):
+            if m.start() > pos:
+                lineno += block.count("\n", seen, pos)
+                seen = pos
+                gap(block, pos, m.start(), lineno)
+            head, body = m.groups()
+            # les symboles ne contiennent pas de blancs : on peut tous les retirer
+            body = body.replace(" ", "").replace("\t", "")
+            rules.append({
+                "head": intern(head, head),
+                "body": [intern(x, x) for x in body.split(",") if x] if body else [],
+            })
+            pos = m.end()
+        lineno += block.count("\n", seen, pos)
+        if pos < len(block):
+            gap(block, pos, len(block), lineno)
+        lineno += block.count("\n", pos)
+
+    return {
+        "literals": sorted(symbols),
+        "assumptions": assumptions,
+        "contraries": contraries,
+        "rules": rules,
+        "preferences": pref_str or "",
+    }
@@ -0,0 +1,268 @@
+from src.aba_core import ABA
+from src.aba_transform import AtomicView, make_non_circular
+from src.aba_attacks import compute_attacks, compute_attacks_sets, iter_attacks, iter_attacks_sets
+from src.aba_semantics import AttackGraph, compute_extensions
+from src.aba_compiled import compile_arguments
+from src.aba_binary import ATOMIC, NON_CIRCULAR, PREFERENCES, BinaryABA, dumps
+from src.aba_control import RESOURCES, limited
+from src.aba_matrix import AttackMatrix, available as matrix_available
+from src.aba_metrics import stage
+from src.aba_view import graph_view
+
+
+def normalize_options(opts):
+    """
+    Options de calcul (venant de "__options") avec valeurs par défaut et types fixés.
+    """
+    opts = opts or {}
+    semantics = opts.get("semantics") or []
+    if isinstance(semantics, str):
+        semantics = [semantics]
+    sets_limit = opts.get("attacks_sets_limit")
+    ext_limit = opts.get("extensions_limit")
+    on_limit = str(opts.get("on_limit", "error"))
+    if on_limit not in ("error", "partial"):
+        raise ValueError(f"on_limit inconnu: {on_limit}")
+    backend = str(opts.get("attacks_backend", "python"))
+    if backend not in ("python", "numpy"):
+        raise ValueError(f"attacks_backend inconnu: {backend}")
+    if backend == "numpy" and not matrix_available():
+        raise ValueError("attacks_backend numpy : numpy n'est pas installé")
+    sets_mode = str(opts.get("attacks_sets_mode", "full"))
+    if sets_mode not in ("full", "minimal"):
+        raise ValueError(f"attacks_sets_mode inconnu: {sets_mode}")
+    sets_offset = int(opts.get("attacks_sets_offset", 0))
+    if sets_offset < 0 or (sets_limit is not None and int(sets_limit) < 0):
+        raise ValueError("attacks_sets_offset / attacks_sets_limit >= 0 attendus")
+    return {
+        "do_non_circular": bool(opts.get("do_non_circular", False)),
+        "do_atomic": bool(opts.get("do_atomic", False)),
+        "use_preferences": bool(opts.get("use_preferences", True)),
+        "attacks_backend": backend,
+        "attacks_sets_mode": sets_mode,
+        "attacks_sets_offset": sets_offset,
+        "attacks_sets_limit": None if sets_limit is None else int(sets_limit),
+        "semantics": [str(s) for s in semantics],
+        "extensions_limit": None if ext_limit is None else int(ext_limit),
+        # budgets "max_<ressource>" (voir aba_control.RESOURCES)
+        "limits": {r: int(opts[f"max_{r}"]) for r in RESOURCES if opts.get(f"max_{r}") is not None},
+        "on_limit": on_limit,
+    }
+
+
+def build_aba(data, do_non_circular=False, do_atomic=False):
+    # pour construire ABA avec les infos recup dans data
+    if isinstance(data, BinaryABA):
+        return data.build(do_non_circular, do_atomic)
+    with stage("validate"):
+        aba = ABA.from_dict(data)
+        aba.validate()
+
+    with stage("transform"):
+        if do_non_circular:
+            make_non_circular(aba)
+        if do_atomic:
+            aba = AtomicView(aba)
+    return aba
+
+
+def prepare(data, opts):
+    """
+    (aba, args, attacks) : pour un cadre binaire, arguments et attaques
+    stockés s'ils valent pour ces options ; sinon None (à calculer).
+    """
+    if isinstance(data, BinaryABA):
+        return data.prepare(opts)
+    return build_aba(data, opts["do_non_circular"], opts["do_atomic"]), None, None
+
+
+def compile_binary(data, opts):
+    """
+    Cadre transformé selon `opts`, avec ses arguments et ses attaques,
+    au format binaire (bytes, voir src.aba_binary).
+    """
+    aba = build_aba(data, opts["do_non_circular"], opts["do_atomic"])
+    args = aba.derive_arguments()
+    atks = compute_attacks(aba, args, use_preferences=opts["use_preferences"])
+    flags = ((NON_CIRCULAR if opts["do_non_circular"] else 0)
+             | (ATOMIC if opts["do_atomic"] else 0)
+             | (PREFERENCES if opts["use_preferences"] else 0))
+    return dumps(aba, args, atks, flags)
+
+
+def run_pipeline(data, opts):
+    """
+    Calcul complet pour /api/aba/run : construction, transformations,
+    arguments, attaques, attaques entre coalitions, extensions.
+    opts : options normalisées (voir normalize_options).
+    Budgets dépassés : BudgetExceeded, ou avec on_limit="partial" le résultat
+    tronqué marqué "_partial" (ressource, limite, étape).
+    """
+    with limited(opts["limits"], opts["on_limit"] == "partial") as ctl:
+        res = _run(data, opts)
+        if ctl is not None and ctl.exceeded is not None:
+            res["_partial"] = ctl.exceeded.info()
+    return res
+
+
+def _run(data, opts):
+    use_prefs = opts["use_preferences"]
+    sets_mode = opts["attacks_sets_mode"]
+    sets_offset = opts["attacks_sets_offset"]
+    sets_limit = opts["attacks_sets_limit"]
+    semantics = opts["semantics"]
+
+    aba, args, atks = prepare(data, opts)
+    with stage("derive"):
+        if args is None:
+            args = aba.derive_arguments()
+    graph = None
+    with stage("attacks"):
+        if atks is None and opts["attacks_backend"] == "numpy":
+            # relation en CSR ; les dicts ne servent qu'à la réponse
+            matrix = AttackMatrix(aba, args, use_preferences=use_prefs)
+            atks = matrix.to_dicts()
+            if semantics:
+                graph = matrix.graph(args)
+        elif atks is None:
+            atks = compute_attacks(aba, args, use_preferences=use_prefs)
+    with stage("attacks_sets"):
+        if not use_prefs:
+            atks_sets = []
+        elif sets_offset or sets_limit is not None:
+            # une page de la liste (la liste complète est énumérée en flux)
+            atks_sets = list(iter_attacks_sets(aba, args, sets_offset, sets_limit, mode=sets_mode))
+        else:
+            atks_sets = compute_attacks_sets(aba, args, mode=sets_mode)
+
+    with stage("export"):
+        res = aba.export_results(args, atks)
+        res["attacks_sets"] = atks_sets
+    if semantics:
+        with stage("extensions"):
+            res["extensions"] = compute_extensions(
+                aba, args, atks if graph is None else graph, semantics=semantics, use_preferences=use_prefs,
+                limit=opts["extensions_limit"],
+            )
+    res["_options"] = {
+        "do_non_circular": opts["do_non_circular"],
+        "do_atomic": opts["do_atomic"],
+        "use_preferences": use_prefs,
+        "attacks_sets_mode": sets_mode,
+        "semantics": list(semantics),
+    }
+    return res
+
+
+def explain(data, opts, arguments=None, roots=None, depth=None, tree=False):
+    """
+    Dérivations pour /api/aba/explain, sur le DAG partagé des dérivations :
+      - arguments : ids d'arguments (tous par défaut) -> conclusion, support
+                    et nœud racine ("node") de chacun ;
+      - roots     : à la place, nœuds à développer (frontière d'un appel précédent) ;
+      - depth     : niveaux envoyés sous chaque racine (None = tout) ;
+      - tree      : arbres développés ("tree" par argument) plutôt que les nœuds
+                    partagés ("nodes" + "frontier").
+    Les ids de nœuds et d'arguments sont stables pour un même cadre et les mêmes options.
+    """
+    aba = build_aba(data, opts["do_non_circular"], opts["do_atomic"])
+    with limited(opts["limits"]):
+        with stage("derive"):
+            args, dag = aba.derivations()
+    if roots is not None:
+        for n in roots:
+            if not isinstance(n, int) or not 0 <= n < len(dag):
+                raise ValueError(f"nœud inconnu: {n}")
+        if tree:
+            return {"trees": [dag.tree(n, depth) for n in roots]}
+        return dag.subgraph(roots, depth)
+
+    by_id = {a.id: a for a in args}
+    ids = sorted(by_id) if arguments is None else arguments
+    out = []
+    for i in ids:
+        a = by_id.get(i)
+        if a is None:
+            raise ValueError(f"argument inconnu: {i}")
+        out.append({**aba.export_argument(a), "node": dag.node_of(a)})
+    if tree:
+        for e in out:
+            e["tree"] = dag.tree(e["node"], depth)
+        return {"arguments": out}
+    return {"arguments": out, **dag.subgraph([e["node"] for e in out], depth)}
+
+
+def view_graph(data, opts, group="auto", center=None, radius=1, max_nodes=200, layout=True):
+    """
+    Vue condensée du graphe d'attaques pour /api/aba/graph (voir aba_view.graph_view) :
+    seuls les nœuds visibles, avec leurs coordonnées.
+    """
+    with limited(opts["limits"]):
+        aba, args, atks = prepare(data, opts)
+        with stage("derive"):
+            if args is None:
+                args = aba.derive_arguments()
+        with stage("attacks"):
+            if atks is None and opts["attacks_backend"] == "numpy":
+                atks = AttackMatrix(aba, args, use_preferences=opts["use_preferences"]).to_dicts()
+            elif atks is None:
+                atks = compute_attacks(aba, args, use_preferences=opts["use_preferences"])
+    with stage("view"):
+        exported = [aba.export_argument(a) for a in compile_arguments(aba, args)[1]]
+        return graph_view(exported, atks, group, center, radius, max_nodes, layout)
+
+
+def stream_pipeline(data, opts):
+    """
+    Même calcul que run_pipeline, rendu enregistrement par enregistrement
+    (une ligne NDJSON chacun) au lieu d'un seul dict :
+      {"type": "framework", ...}, {"type": "argument", ...}*, {"type": "attack", ...}*,
+      {"type": "attack_set", ...}*, [{"type": "extensions", ...}], {"type": "end", "counts": ...}
+    Les attaques sont triées par (attaquant, cible) ; les attaques entre
+    coalitions ("full") sont énumérées en flux. Seuls les arguments compilés
+    (et, si des sémantiques sont demandées, le graphe d'attaques) restent en mémoire.
+    Les budgets viennent du contrôle qui consomme le flux (SolverPool.pull) ; un
+    dépassement y interrompt le flux (pas de mode partiel).
+    """
+    use_prefs = opts["use_preferences"]
+    sets_mode = opts["attacks_sets_mode"]
+    semantics = opts["semantics"]
+
+    aba, args, atks = prepare(data, opts)
+    yield {"type": "framework", **aba.export_framework()}
+
+    if args is None:
+        args = []
+        for a in aba.iter_arguments():
+            args.append(a)
+            yield {"type": "argument", **aba.export_argument(a)}
+    else:
+        for a in args:
+            yield {"type": "argument", **aba.export_argument(a)}
+
+    if atks is None:
+        atks = iter_attacks(aba, args, use_preferences=use_prefs)
+    else:
+        atks = sorted(atks, key=lambda t: (t["attacker"], t["target"]))
+    graph = AttackGraph(args) if semantics else None
+    n_attacks = 0
+    for t in atks:
+        if graph is not None:
+            graph.add(t)
+        n_attacks += 1
+        yield {"type": "attack", **t}
+
+    n_sets = 0
+    if use_prefs:
+        sets = iter_attacks_sets(aba, args, opts["attacks_sets_offset"], opts["attacks_sets_limit"],
+                                 mode=sets_mode)
+        for e in sets:
+            n_sets += 1
+            yield {"type": "attack_set", **e}
+
+    if semantics:
+        yield {"type": "extensions", **compute_extensions(
+            aba, args, graph, semantics=semantics, use_preferences=use_prefs,
+            limit=opts["extensions_limit"],
+        )}
+    yield {"type": "end", "counts": {"arguments": len(args), "attacks": n_attacks, "attacks_sets": n_sets}}
@@ -0,0 +1,148 @@
+from src.aba_core import saturate
+from src.aba_compiled import Argument
+from src.aba_supports import SupportSet
+from src.aba_attacks import compute_attacks
+from src.aba_semantics import AttackGraph, credulously_accepted
+
+
+class GoalSolver:
+    """
+    Dérivation dirigée par le but (chaînage arrière) :
+    pour un littéral demandé, on ne garde que les règles dont la tête est
+    atteignable en remontant depuis ce littéral, puis on sature ce sous-ensemble.
+    Les supports d'un littéral ne dépendent que de ses prédécesseurs : une fois
+    calculés, ils sont définitifs et mémorisés pour les requêtes suivantes.
+    """
+
+    def __init__(self, aba):
+        self.aba = aba
+        self.fw = fw = aba.compile()
+        n = len(fw.lit_names)
+        self.heads = [[] for _ in range(n)]   # littéral -> règles qui le concluent
+        self.users = [[] for _ in range(n)]   # littéral -> règles qui l'utilisent
+        for idx, (head, body) in enumerate(fw.rules):
+            self.heads[head].append(idx)
+            for b in body:
+                self.users[b].append(idx)
+        self.supports = [SupportSet() for _ in range(n)]
+        self.done = set()   # littéraux dont les supports sont définitifs
+
+    def lit(self, name):
+        try:
+            return self.fw.lit_id[name]
+        except KeyError:
+            raise ValueError(f"littéral inconnu: {name}")
+
+    def backward(self, lits):
+        """Littéraux dont dépendent `lits` (eux compris)."""
+        seen = set(lits)
+        stack = list(lits)
+        while stack:
+            l = stack.pop()
+            for idx in self.heads[l]:
+                for b in self.fw.rules[idx][1]:
+                    if b not in seen:
+                        seen.add(b)
+                        stack.append(b)
+        return seen
+
+    def forward(self, lits):
+        """Littéraux dérivables en utilisant `lits` (eux compris)."""
+        seen = set(lits)
+        stack = list(lits)
+        while stack:
+            l = stack.pop()
+            for idx in self.users[l]:
+                h = self.fw.rules[idx][0]
+                if h not in seen:
+                    seen.add(h)
+                    stack.append(h)
+        return seen
+
+    def relevant(self, goal, use_preferences=False):
+        """
+        Littéraux nécessaires pour décider l'acceptation de `goal` :
+        ses dépendances, les contraires des assumptions rencontrées (attaquants,
+        défenseurs, ...) et, avec préférences, les arguments qui contiennent une
+        assumption dont le contraire est déjà pertinent (attaques reverse).
+        """
+        fw = self.fw
+        lits = self.backward([goal])
+        while True:
+            extra = set()
+            for l in lits:
+                b = fw.lit_bit[l]
+                if b >= 0 and fw.contrary[b] >= 0:
+                    extra.add(fw.contrary[b])
+            if use_preferences:
+                starts = [fw.asm_lit[b] for b, c in enumerate(fw.contrary) if c in lits]
+                extra |= self.forward(starts)
+            extra -= lits
+            if not extra:
+                return lits
+            lits |= self.backward(extra)
+
+    def derive(self, lits):
+        """Sature les littéraux `lits` (clos par dépendances) non encore calculés."""
+        fw = self.fw
+        todo = set(lits) - self.done
+        if not todo:
+            return
+        supports = self.supports
+        for l in todo:
+            b = fw.lit_bit[l]
+            if b >= 0:
+                supports[l].add(1 << b)
+        rule_ids = sorted({idx for l in todo for idx in self.heads[l]})
+        for idx in rule_ids:
+            head, body = fw.rules[idx]
+            if not body:
+                supports[head].add(0)
+        # les littéraux déjà calculés servent de point de départ figé
+        delta = {}
+        for idx in rule_ids:
+            for b in fw.rules[idx][1]:
+                if supports[b]:
+                    delta[b] = set(supports[b])
+        for l in todo:
+            if supports[l]:
+                delta[l] = set(supports[l])
+        saturate(fw, supports, rule_ids, delta)
+        self.done |= todo
+
+    def arguments(self, lits):
+        """Arguments (forme compilée) des littéraux `lits`, numérotés dans l'ordre des ids."""
+        self.derive(self.backward(lits))
+        args = []
+        for l in sorted(lits):
+            for S in sorted(self.supports[l]):
+                args.append(Argument(len(args), S, l, self.fw))
+        return args
+
+    def query(self, goal, use_preferences=False, credulous=True):
+        """
+        Répond pour un littéral :
+          - supported  : existe-t-il un argument pour `goal` ?
+          - arguments  : ses supports minimaux ;
+          - credulous  : un argument pour `goal` appartient-il à une extension
+                         admissible (donc préférée) ? calculé sur le sous-cadre pertinent.
+        """
+        g = self.lit(goal)
+        fw = self.fw
+        out = {"goal": goal}
+        if credulous:
+            lits = self.relevant(g, use_preferences)
+        else:
+            lits = self.backward([g])
+        args = self.arguments(lits)
+        mine = [a for a in args if a.concl == g]
+        out["supported"] = bool(mine)
+        out["arguments"] = [fw.sorted_names_of(a.mask) for a in mine]
+        if credulous:
+            atks = compute_attacks(self.aba, args, use_preferences=use_preferences)
+            graph = AttackGraph(args, atks)
+            out["credulous"] = credulously_accepted(graph, [a.id for a in mine])
+        out["relevant_literals"] = len(lits)
+        out["total_literals"] = len(fw.lit_names)
+        return out
+
@@ -0,0 +1,278 @@
+from src.aba_attacks import set_attacks
+from src.aba_control import current
+from src.aba_metrics import current as current_profile
+
+SEMANTICS = ("grounded", "admissible", "preferred", "stable")
+
+# étiquettes du backtracking
+BLANK, IN, OUT, MUST_OUT, UNDEC = range(5)
+
+
+class AttackGraph:
+    """
+    Graphe d'attaques entre arguments, indexé par position (0..n-1).
+    Construit une fois à partir de la liste d'arguments et de compute_attacks.
+    """
+
+    __slots__ = ("ids", "pos", "attackers", "targets")
+
+    def __init__(self, args, attacks=()):
+        self.ids = [a["id"] for a in args]
+        self.pos = {i: k for k, i in enumerate(self.ids)}
+        n = len(self.ids)
+        self.attackers = [set() for _ in range(n)]
+        self.targets = [set() for _ in range(n)]
+        for t in attacks:
+            self.add(t)
+
+    def add(self, t):
+        """Ajoute une arête {"attacker", "target"} (construction au fil d'un flux)."""
+        i, j = self.pos[t["attacker"]], self.pos[t["target"]]
+        self.targets[i].add(j)
+        self.attackers[j].add(i)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def to_ids(self, positions):
+        return sorted(self.ids[k] for k in positions)
+
+
+def grounded_extension(graph):
+    """
+    Extension fondée en temps linéaire : un argument entre dès que tous
+    ses attaquants sont OUT ; les cibles d'un argument IN passent OUT.
+    """
+    n = len(graph)
+    remaining = [len(graph.attackers[k]) for k in range(n)]
+    state = [BLANK] * n
+    queue = [k for k in range(n) if remaining[k] == 0]
+    for k in queue:
+        state[k] = IN
+    inside = []
+    while queue:
+        k = queue.pop()
+        inside.append(k)
+        for t in graph.targets[k]:
+            if state[t] != BLANK:
+                continue
+            state[t] = OUT
+            for u in graph.targets[t]:
+                remaining[u] -= 1
+                if remaining[u] == 0 and state[u] == BLANK:
+                    state[u] = IN
+                    queue.append(u)
+    return graph.to_ids(inside)
+
+
+def _search(graph, keep_maximal, limit, forced=None):
+    """
+    Backtracking par étiquetage (IN / OUT / MUST_OUT / UNDEC) :
+      - IN : l'argument est dans l'ensemble, ses cibles passent OUT,
+        ses attaquants non encore OUT deviennent MUST_OUT ;
+      - UNDEC : l'argument est laissé hors de l'ensemble.
+    Une branche est coupée dès qu'un MUST_OUT n'a plus d'attaquant BLANK
+    pour le mettre OUT, ou (si keep_maximal) quand IN ∪ BLANK est inclus
+    dans une extension déjà trouvée.
+    forced : position d'un argument imposé IN (acceptation crédule).
+    Retourne les ensembles admissibles (les maximaux si keep_maximal).
+    """
+    n = len(graph)
+    att = graph.attackers
+    tgt = graph.targets
+    found = []
+    ctl = current()
+
+    lab = [BLANK] * n
+    for k in range(n):
+        if k in tgt[k]:
+            lab[k] = UNDEC  # auto-attaque : jamais IN
+
+    def put_in(lab, x):
+        lab[x] = IN
+        for y in tgt[x]:
+            lab[y] = OUT
+        for z in att[x]:
+            if lab[z] != OUT:
+                lab[z] = MUST_OUT
+
+    def dead(lab):
+        for k in range(n):
+            if lab[k] == MUST_OUT and not any(lab[z] == BLANK for z in att[k]):
+                return True
+        return False
+
+    def dominated(lab):
+        cand = {k for k in range(n) if lab[k] in (IN, BLANK)}
+        return any(cand <= S for S in found)
+
+    if forced is not None:
+        if lab[forced] != BLANK:
+            return found
+        put_in(lab, forced)
+        if dead(lab):
+            return found
+
+    # parcours en profondeur itératif (la pile évite la limite de récursion)
+    stack = [lab]
+    explored = 0
+    while stack:
+        if limit is not None and len(found) >= limit:
+            break
+        lab = stack.pop()
+        explored += 1
+        if ctl is not None:
+            ctl.progress("extensions", explored)
+            ctl.checkpoint()
+        if keep_maximal and dominated(lab):
+            continue
+        x = next((k for k in range(n) if lab[k] == BLANK), None)
+        if x is None:
+            if MUST_OUT in lab:
+                continue
+            S = {k for k in range(n) if lab[k] == IN}
+            if keep_maximal:
+                found[:] = [T for T in found if not T <= S]
+            found.append(S)
+            continue
+
+        # branche 2 : x hors de l'ensemble (empilée d'abord, explorée ensuite)
+        lab_out = list(lab)
+        lab_out[x] = UNDEC
+        if not dead(lab_out):
+            stack.append(lab_out)
+
+        # branche 1 : x IN
+        lab_in = list(lab)
+        put_in(lab_in, x)
+        if not dead(lab_in):
+            stack.append(lab_in)
+
+    prof = current_profile()
+    if prof is not None:
+        prof.count("labellings", explored)
+    return found
+
+
+def admissible_extensions(graph, limit=None):
+    return sorted(graph.to_ids(S) for S in _search(graph, False, limit))
+
+
+def preferred_extensions(graph, limit=None):
+    return sorted(graph.to_ids(S) for S in _search(graph, True, limit))
+
+
+def stable_extensions(graph, limit=None):
+    """Les stables sont les préférées qui attaquent tout argument hors de l'ensemble."""
+    out = []
+    for S in _search(graph, True, None):
+        hit = set(S)
+        for k in S:
+            hit |= graph.targets[k]
+        if len(hit) == len(graph):
+            out.append(graph.to_ids(S))
+            if limit is not None and len(out) >= limit:
+                break
+    return sorted(out)
+
+
+def credulously_accepted(graph, ids):
+    """
+    Un des arguments `ids` appartient-il à un ensemble admissible
+    (de façon équivalente : à une extension préférée) ?
+    """
+    return any(_search(graph, False, 1, forced=graph.pos[i]) for i in ids)
+
+
+# ---------- extensions au niveau des assumptions (attaques entre coalitions) ----------
+
+def assumption_extensions(sa, semantics, limit=None):
+    """
+    Extensions d'assumptions à partir des attaques entre coalitions (SetAttacks).
+    Les attaques étant fermées vers le haut, un ensemble qui s'attaque lui-même
+    rend conflictuels tous ses sur-ensembles : le parcours coupe ces branches.
+    semantics ∈ {"admissible", "preferred", "stable"}.
+    """
+    fw = sa.fw
+    n = fw.n_assumptions
+    ctl = current()
+
+    def conflict(X):
+        return bool(sa.normal_witnesses(X) & X) or bool(sa.reverse_witnesses(X) & X)
+
+    def attackers(X):
+        # attaquants suffisants : supports S (normal, y ∈ X) et {x} (reverse, S' ⊆ X)
+        out = [S for S, y in sa.normal if X >> y & 1]
+        out.extend(1 << x for x, S in sa.reverse if S & X == S)
+        return out
+
+    def attacks(X, Y):
+        return bool(sa.normal_witnesses(X) & Y) or bool(sa.reverse_witnesses(Y) & X)
+
+    def admissible(X):
+        return all(attacks(X, Y) for Y in attackers(X))
+
+    def stable(X):
+        rest = ((1 << n) - 1) & ~X
+        return all(attacks(X, 1 << b) for b in range(n) if rest >> b & 1)
+
+    # coalitions sans conflit, énumérées par ajout de bits croissants
+    free = []
+
+    def rec(X, start):
+        if ctl is not None:
+            ctl.checkpoint()
+        free.append(X)
+        for b in range(start, n):
+            Y = X | (1 << b)
+            if not conflict(Y):
+                rec(Y, b + 1)
+
+    if not conflict(0):
+        rec(0, 0)
+    prof = current_profile()
+    if prof is not None:
+        prof.count("coalitions", len(free))
+
+    if semantics == "stable":
+        found = [X for X in free if stable(X)]
+    else:
+        found = [X for X in free if admissible(X)]
+        if semantics == "preferred":
+            found = [X for X in found if not any(X != Y and X & Y == X for Y in found)]
+        elif semantics != "admissible":
+            raise ValueError(f"sémantique inconnue: {semantics}")
+    if limit is not None:
+        found = found[:limit]
+    return sorted(fw.sorted_names_of(X) for X in found)
+
+
+def compute_extensions(aba, args, attacks, semantics=SEMANTICS, use_preferences=True, limit=None):
+    """
+    Calcule les extensions demandées :
+      - "arguments"   : sur le graphe argument -> argument (ids) ;
+      - "assumptions" : sur les attaques entre coalitions (noms), sauf "grounded".
+    attacks : liste d'arêtes ou AttackGraph déjà construit.
+    """
+    for s in semantics:
+        if s not in SEMANTICS:
+            raise ValueError(f"sémantique inconnue: {s}")
+
+    graph = attacks if isinstance(attacks, AttackGraph) else AttackGraph(args, attacks)
+    by_args = {}
+    by_asms = {}
+    sa = None
+    for s in semantics:
+        if s == "grounded":
+            by_args[s] = grounded_extension(graph)
+            continue
+        if s == "admissible":
+            by_args[s] = admissible_extensions(graph, limit)
+        elif s == "preferred":
+            by_args[s] = preferred_extensions(graph, limit)
+        else:
+            by_args[s] = stable_extensions(graph, limit)
+        if sa is None:
+            sa = set_attacks(aba, args, use_preferences=use_preferences)
+        by_asms[s] = assumption_extensions(sa, s, limit)
+    return {"arguments": by_args, "assumptions": by_asms}
@@ -0,0 +1,476 @@
+from itertools import product
+import threading
+
+from src.aba_core import ABA, saturate
+from src.aba_compiled import Argument, iter_bits, rank_of, worse_masks
+from src.aba_supports import SupportSet
+from src.aba_attacks import SetAttacks
+from src.utils import parse_preferences
+
+
+def _names(x):
+    return isinstance(x, list) and all(isinstance(v, str) for v in x)
+
+
+def check_edit(edit):
+    """
+    Vérifie la forme d'une édition {"op": ...} sans rien modifier (ValueError
+    sinon) : noms de littéraux en str, corps en liste de str, préférences en
+    texte ou en dict {assumption: rang ou [assumptions]}.
+    """
+    op = edit.get("op") if isinstance(edit, dict) else None
+    if op == "add_rule":
+        if not isinstance(edit.get("head"), str) or not _names(edit.get("body", [])):
+            raise ValueError("add_rule : 'head' (str) et 'body' (liste de str) attendus")
+    elif op == "remove_rule":
+        index = edit.get("index")
+        if index is not None:
+            if not isinstance(index, int) or isinstance(index, bool):
+                raise ValueError("remove_rule : 'index' entier attendu")
+        elif not isinstance(edit.get("head"), str) or not _names(edit.get("body") or []):
+            raise ValueError("remove_rule : 'index', ou 'head' (str) et 'body' (liste de str) attendus")
+    elif op == "set_contrary":
+        if not isinstance(edit.get("assumption"), str) or not isinstance(edit.get("contrary"), str):
+            raise ValueError("set_contrary : 'assumption' et 'contrary' (str) attendus")
+    elif op == "set_preferences":
+        prefs = edit.get("preferences", {})
+        if prefs is None or isinstance(prefs, str):
+            return
+        if not isinstance(prefs, dict) or not all(
+                isinstance(a, str) and (_names(v) or rank_of(v) is not None)
+                for a, v in prefs.items()):
+            raise ValueError("set_preferences : texte ou {assumption: rang ou [assumptions]} attendu")
+    else:
+        raise ValueError(f"édition inconnue: {op}")
+
+
+class ABASession:
+    """
+    Cadre ABA compilé gardé en mémoire entre deux éditions.
+    Chaque édition ne recalcule que ce qu'elle touche :
+      - add_rule      : propagation semi-naïve depuis la nouvelle règle ;
+      - remove_rule   : on efface puis re-dérive les littéraux qui dépendent de la tête ;
+      - set_contrary  : seules les attaques dont le témoin est cette assumption ;
+      - set_preferences : seules les attaques (attaquant, témoin b) dont le support
+                          contient une assumption dont la comparaison avec b change.
+    Les ids d'arguments sont stables d'une édition à l'autre.
+    Les transformations (non-circulaire, atomique) ne sont pas gérées ici.
+    """
+
+    def __init__(self, data, use_preferences=True, sets_mode="full"):
+        self.aba = ABA.from_dict(data)
+        self.use_preferences = use_preferences
+        self.sets_mode = sets_mode
+        self.lock = threading.Lock()   # éditions et lectures concurrentes (serveur)
+        self.fw = fw = self.aba.compile()
+        self.rule_ids = list(range(len(fw.rules)))   # position dans aba.rules -> id de règle
+        self.supports = [SupportSet() for _ in fw.lit_names]
+
+        self.args = {}        # id -> Argument
+        self.by_key = {}      # (concl, mask) -> id
+        self.by_concl = {}    # concl -> set(ids)
+        self.by_asm = {}      # bit -> set(ids)
+        self.next_id = 0
+        self.pairs = {}       # (i,j) -> [bits normaux, bits reverse]
+        self.gens = {}        # id -> générateurs d'attaques entre coalitions
+        self._log = None      # journal d'annulation pendant apply_all
+
+        for bit, lid in enumerate(fw.asm_lit):
+            self.supports[lid].add(1 << bit)
+        for head, body in fw.rules:
+            if not body:
+                self.supports[head].add(0)
+        saturate(fw, self.supports)
+        self._sync(range(len(fw.lit_names)))
+
+    # ---------- éditions ----------
+
+    def apply_all(self, edits):
+        """
+        Applique une liste d'éditions en bloc : toutes sont vérifiées avant la
+        première, puis appliquées en notant chaque modification (journal
+        d'annulation, de taille proportionnelle à ce qui change) ; si l'une
+        échoue, le journal est rejoué à l'envers et l'erreur relancée.
+        Retourne les changements cumulés {"added": [ids], "removed": [ids]}.
+        """
+        for edit in edits:
+            check_edit(edit)
+        self._log = []
+        added, removed = set(), set()
+        try:
+            for edit in edits:
+                ch = self._apply(edit)
+                added |= set(ch["added"])
+                removed |= set(ch["removed"])
+        except BaseException:
+            for undo in reversed(self._log):
+                undo()
+            raise
+        finally:
+            self._log = None
+        return {"added": sorted(added - removed), "removed": sorted(removed - added)}
+
+    def apply(self, edit):
+        """
+        Applique une édition {"op": ...} (tout ou rien, voir apply_all) et
+        retourne les changements {"added": [ids], "removed": [ids]} sur les arguments.
+        """
+        return self.apply_all([edit])
+
+    def _apply(self, edit):
+        op = edit.get("op")
+        if op == "add_rule":
+            return self.add_rule(edit["head"], edit.get("body", []))
+        if op == "remove_rule":
+            return self.remove_rule(edit.get("index"), edit.get("head"), edit.get("body"))
+        if op == "set_contrary":
+            return self.set_contrary(edit["assumption"], edit["contrary"])
+        if op == "set_preferences":
+            return self.set_preferences(edit.get("preferences", {}))
+        raise ValueError(f"édition inconnue: {op}")
+
+    def add_rule(self, head, body):
+        fw = self.fw
+        body = list(body)
+        if head in self.aba.assumptions:
+            raise ValueError(f"head invalide: {head}")
+        for x in [head] + body:
+            if x not in self.aba.literals:
+                self.aba.literals.add(x)
+                fw.intern(x)
+                self.supports.append(SupportSet())
+                self._undo(self._unintern, x)
+        self.aba.rules.append({"head": head, "body": body})
+        rule = (fw.lit_id[head], tuple(fw.lit_id[b] for b in body))
+        fw.rules.append(rule)
+        self.rule_ids.append(len(fw.rules) - 1)
+        self._undo(self._unappend_rule)
+
+        # combinaisons de la nouvelle règle, puis propagation du delta
+        h, ids = rule
+        cands = set()
+        for combo in product(*[self.supports[b] for b in ids]):
+            acc = 0
+            for m in combo:
+                acc |= m
+            cands.add(acc)
+        forward = self._forward([h])
+        before = self._snapshot(forward)
+        # saturate ne touche qu'aux supports des littéraux en aval de h
+        for l in forward:
+            self._keep_support(l)
+        added = self.supports[h].update(cands)
+        if added:
+            saturate(fw, self.supports, self.rule_ids, {h: set(added)})
+        return self._sync(before)
+
+    def remove_rule(self, index=None, head=None, body=None):
+        rules = self.aba.rules
+        if index is None:
+            index = next((k for k, r in enumerate(rules)
+                          if r["head"] == head and list(r.get("body", [])) == list(body or [])), None)
+        if index is None or not 0 <= index < len(rules):
+            raise ValueError("règle introuvable")
+        fw = self.fw
+        rule = rules.pop(index)
+        rid = self.rule_ids.pop(index)
+        self._undo(self._reinsert_rule, index, rule, rid)
+        h = fw.rules[rid][0]
+        self._keep(fw.rules, rid)
+        fw.rules[rid] = None
+
+        # effacer / re-dériver : les littéraux qui dépendent de h
+        affected = self._forward([h])
+        before = self._snapshot(affected)
+        live = [r for r in self.rule_ids if fw.rules[r][0] in affected]
+        for l in affected:
+            self._keep_support(l)
+            self.supports[l] = SupportSet()
+            b = fw.lit_bit[l]
+            if b >= 0:
+                self.supports[l].add(1 << b)
+        for r in live:
+            head, body = fw.rules[r]
+            if not body:
+                self.supports[head].add(0)
+        delta = {}
+        for r in live:
+            for b in fw.rules[r][1]:
+                if b not in affected and self.supports[b]:
+                    delta[b] = set(self.supports[b])
+        for l in affected:
+            if self.supports[l]:
+                delta[l] = set(self.supports[l])
+        saturate(fw, self.supports, live, delta)
+        return self._sync(before)
+
+    def set_contrary(self, assumption, contrary):
+        fw = self.fw
+        if assumption not in fw.asm_bit:
+            raise ValueError(f"contrary pour '{assumption}' qui n'est pas une assumption")
+        if contrary not in self.aba.literals:
+            raise ValueError(f"contrary '{contrary}' pas dans L")
+        b = fw.asm_bit[assumption]
+        old = fw.contrary[b]
+        self._keep(self.aba.contraries, assumption)
+        self.aba.contraries[assumption] = contrary
+        self._emit_bit(b, add=False)
+        self._keep(fw.contrary, b)
+        fw.contrary[b] = fw.lit_id[contrary]
+        self._emit_bit(b, add=True)
+        for c in (old, fw.contrary[b]):
+            for i in self.by_concl.get(c, ()):
+                self._regen(i)
+        return {"added": [], "removed": []}
+
+    def set_preferences(self, preferences):
+        fw = self.fw
+        prefs = parse_preferences(preferences) if isinstance(preferences, str) else dict(preferences or {})
+        new_worse = worse_masks(fw.asm_names, prefs)
+        self._undo(self._restore_preferences, self.aba.preferences, list(fw.rank), list(fw.worse))
+        self.aba.preferences = prefs
+        # par témoin b : assumptions dont la comparaison avec b change
+        diff = [w0 ^ w1 for w0, w1 in zip(fw.worse, new_worse)]
+        if not any(diff):
+            fw.set_preferences(prefs, new_worse)
+            return {"added": [], "removed": []}
+
+        # événements touchés : attaquant via b dont le support contient une telle assumption
+        touched = []
+        for b, c in enumerate(fw.contrary):
+            if c < 0 or not diff[b]:
+                continue
+            for i in self.by_concl.get(c, ()):
+                if self.args[i].mask & diff[b]:
+                    touched.append((i, b))
+        for i, b in touched:
+            self._emit(i, b, add=False)
+        fw.set_preferences(prefs, new_worse)
+        for i, b in touched:
+            self._emit(i, b, add=True)
+        for i in {i for i, _ in touched}:
+            self._regen(i)
+        return {"added": [], "removed": []}
+
+    # ---------- résultats ----------
+
+    def arguments(self):
+        return [self.args[i] for i in sorted(self.args)]
+
+    def attacks(self):
+        """Une arête par paire ('normal' prioritaire), triées par (attaquant, cible)."""
+        names = self.fw.asm_names
+        out = []
+        for (i, j) in sorted(self.pairs):
+            normal, reverse = self.pairs[(i, j)]
+            bits, kind = (normal, "normal") if normal else (reverse, "reverse")
+            w = (bits & -bits).bit_length() - 1
+            out.append({"attacker": i, "target": j, "kind": kind, "witness": names[w]})
+        return out
+
+    def set_attacks(self):
+        normal = []
+        reverse = []
+        for i in sorted(self.gens):
+            for g in self.gens[i]:
+                (normal if g[0] == "n" else reverse).append(g[1:])
+        return SetAttacks.from_generators(self.fw, normal, reverse)
+
+    def results(self):
+        args = self.arguments()
+        res = self.aba.export_results(args, self.attacks())
+        if not self.use_preferences:
+            res["attacks_sets"] = []
+        elif self.sets_mode == "minimal":
+            res["attacks_sets"] = self.set_attacks().minimal()
+        else:
+            res["attacks_sets"] = list(self.set_attacks().iter_expanded())
+        return res
+
+    # ---------- interne ----------
+
+    def _forward(self, lits):
+        """Littéraux dont les supports peuvent dépendre de `lits` (eux compris)."""
+        fw = self.fw
+        users = {}
+        for r in self.rule_ids:
+            head, body = fw.rules[r]
+            for b in body:
+                users.setdefault(b, []).append(head)
+        seen = set(lits)
+        stack = list(lits)
+        while stack:
+            l = stack.pop()
+            for h in users.get(l, ()):
+                if h not in seen:
+                    seen.add(h)
+                    stack.append(h)
+        return seen
+
+    # journal d'annulation : chaque modification note de quoi la défaire
+
+    def _undo(self, fn, *args):
+        if self._log is not None:
+            self._log.append(lambda: fn(*args))
+
+    def _keep(self, d, k, copy=None):
+        """Note la valeur de d[k] (dict ou liste) avant modification."""
+        if self._log is None:
+            return
+        if isinstance(d, dict) and k not in d:
+            self._log.append(lambda: d.pop(k, None))
+        else:
+            old = d[k] if copy is None else copy(d[k])
+            self._log.append(lambda: d.__setitem__(k, old))
+
+    def _keep_support(self, l):
+        self._keep(self.supports, l, SupportSet)
+
+    def _index(self, d, k, i):
+        """d[k].add(i), journalisé."""
+        ids = d.get(k)
+        if ids is None:
+            self._keep(d, k)
+            ids = d[k] = set()
+        if i not in ids:
+            ids.add(i)
+            self._undo(ids.discard, i)
+
+    def _unindex(self, d, k, i):
+        ids = d.get(k)
+        if ids is not None and i in ids:
+            ids.discard(i)
+            self._undo(ids.add, i)
+
+    def _unintern(self, x):
+        # annule, dans l'ordre inverse, l'ajout du dernier littéral
+        fw = self.fw
+        self.aba.literals.discard(x)
+        del fw.lit_id[fw.lit_names.pop()]
+        fw.lit_bit.pop()
+        self.supports.pop()
+
+    def _unappend_rule(self):
+        self.aba.rules.pop()
+        self.fw.rules.pop()
+        self.rule_ids.pop()
+
+    def _reinsert_rule(self, index, rule, rid):
+        self.aba.rules.insert(index, rule)
+        self.rule_ids.insert(index, rid)
+
+    def _restore_preferences(self, prefs, rank, worse):
+        self.aba.preferences = prefs
+        self.fw.rank[:] = rank
+        self.fw.worse[:] = worse
+
+    def _snapshot(self, lits):
+        return {l: set(self.by_concl.get(l, ())) for l in lits}
+
+    def _sync(self, before):
+        """
+        Aligne les arguments sur les supports des littéraux `before`
+        (dict littéral -> ids avant l'édition, ou simple itérable au départ)
+        et met à jour les attaques qui les concernent.
+        """
+        if not isinstance(before, dict):
+            before = {l: set() for l in before}
+        added = []
+        removed = []
+        for l, old_ids in before.items():
+            now = set(self.supports[l])
+            for i in old_ids:
+                if self.args[i].mask not in now:
+                    removed.append(i)
+            known = {self.args[i].mask for i in old_ids}
+            for S in sorted(now - known):
+                added.append(self._new_arg(S, l))
+        for i in removed:
+            self._drop_arg(i)
+        for i in added:
+            self._link_arg(i)
+        return {"added": sorted(added), "removed": sorted(removed)}
+
+    def _new_arg(self, mask, concl):
+        i = self.next_id
+        self._undo(setattr, self, "next_id", i)
+        self.next_id += 1
+        self._keep(self.args, i)
+        self.args[i] = Argument(i, mask, concl, self.fw)
+        self._keep(self.by_key, (concl, mask))
+        self.by_key[(concl, mask)] = i
+        return i
+
+    def _link_arg(self, i):
+        """Indexe l'argument i et ajoute ses attaques (comme attaquant et comme cible)."""
+        fw = self.fw
+        A = self.args[i]
+        self._index(self.by_concl, A.concl, i)
+        for b in iter_bits(A.mask):
+            self._index(self.by_asm, b, i)
+        for b, c in enumerate(fw.contrary):
+            if c == A.concl:
+                self._emit(i, b, add=True)
+        for b in iter_bits(A.mask):
+            for k in self.by_concl.get(fw.contrary[b], ()):
+                if k != i:
+                    self._emit(k, b, add=True, only=i)
+        self._regen(i)
+
+    def _drop_arg(self, i):
+        self._keep(self.args, i)
+        A = self.args.pop(i)
+        self._keep(self.by_key, (A.concl, A.mask))
+        del self.by_key[(A.concl, A.mask)]
+        self._unindex(self.by_concl, A.concl, i)
+        for b in iter_bits(A.mask):
+            self._unindex(self.by_asm, b, i)
+        for key in [k for k in self.pairs if i in k]:
+            self._keep(self.pairs, key)
+            del self.pairs[key]
+        self._keep(self.gens, i)
+        self.gens.pop(i, None)
+
+    def _less(self, mask, b):
+        return self.use_preferences and bool(mask & self.fw.worse[b])
+
+    def _emit(self, i, b, add, only=None):
+        """Ajoute/retire les événements "i attaque via b" (vers `only` seulement si donné)."""
+        A = self.args[i]
+        less = self._less(A.mask, b)
+        bit = 1 << b
+        targets = (only,) if only is not None else self.by_asm.get(b, ())
+        for j in targets:
+            key, kind = ((j, i), 1) if less else ((i, j), 0)
+            entry = self.pairs.get(key)
+            if add or entry is not None:
+                self._keep(self.pairs, key, list)
+            if add:
+                if entry is None:
+                    self.pairs[key] = entry = [0, 0]
+                entry[kind] |= bit
+            elif entry is not None:
+                entry[kind] &= ~bit
+                if not entry[0] and not entry[1]:
+                    del self.pairs[key]
+
+    def _emit_bit(self, b, add):
+        for i in list(self.by_concl.get(self.fw.contrary[b], ())):
+            self._emit(i, b, add)
+
+    def _regen(self, i):
+        """Générateurs d'attaques entre coalitions portés par l'argument i."""
+        A = self.args[i]
+        gens = []
+        for y, c in enumerate(self.fw.contrary):
+            if c != A.concl:
+                continue
+            if self._less(A.mask, y):
+                gens.append(("r", y, A.mask))
+            else:
+                gens.append(("n", A.mask, y))
+        self._keep(self.gens, i)
+        if gens:
+            self.gens[i] = gens
+        else:
+            self.gens.pop(i, None)
@@ -0,0 +1,100 @@
+from src.aba_compiled import iter_bits
+
+
+class SupportSet:
+    """
+    Ensemble de supports minimaux (antichaîne pour l'inclusion), un support
+    étant un masque d'assumptions (bit i = assumption i du CompiledABA).
+      - add(S) refuse S si un support déjà présent est inclus dans S ;
+      - sinon S est inséré et les supports qui contiennent strictement S sont évincés.
+    Un index bit -> supports qui le contiennent évite de comparer S
+    à tous les supports stockés.
+    """
+
+    __slots__ = ("_items", "_by_bit")
+
+    def __init__(self, supports=()):
+        self._items = set()
+        self._by_bit = {}
+        for s in supports:
+            self.add(s)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __contains__(self, s):
+        return s in self._items
+
+    def __bool__(self):
+        return bool(self._items)
+
+    def __repr__(self):
+        return f"SupportSet({sorted(self._items)!r})"
+
+    def covers(self, s):
+        """True si un support stocké est inclus (au sens large) dans s."""
+        items = self._items
+        if s in items or 0 in items:
+            return True
+        # peu de supports : un balayage de masques est plus rapide que l'index
+        if len(items) <= 32:
+            for t in items:
+                if t & s == t:
+                    return True
+            return False
+        seen = {}
+        for b in iter_bits(s):
+            for t in self._by_bit.get(b, ()):
+                n = seen.get(t, 0) + 1
+                if n == t.bit_count():
+                    return True
+                seen[t] = n
+        return False
+
+    def supersets(self, s):
+        """Supports stockés qui contiennent strictement s."""
+        if not s:
+            return {t for t in self._items if t}
+        pools = []
+        for b in iter_bits(s):
+            pool = self._by_bit.get(b)
+            if not pool:
+                return set()
+            pools.append(pool)
+        pools.sort(key=len)
+        out = {t for t in pools[0] if t != s}
+        for pool in pools[1:]:
+            out &= pool
+            if not out:
+                break
+        return out
+
+    def add(self, s):
+        """
+        Insère s s'il est minimal. Retourne True si s a été ajouté.
+        """
+        if self.covers(s):
+            return False
+        for t in self.supersets(s):
+            self._remove(t)
+        self._items.add(s)
+        for b in iter_bits(s):
+            self._by_bit.setdefault(b, set()).add(s)
+        return True
+
+    def update(self, supports):
+        """Insère plusieurs supports ; retourne la liste de ceux ajoutés et encore présents."""
+        added = [s for s in supports if self.add(s)]
+        return [s for s in added if s in self._items]
+
+    def _remove(self, s):
+        self._items.discard(s)
+        for b in iter_bits(s):
+            pool = self._by_bit.get(b)
+            if pool is not None:
+                pool.discard(s)
+                if not pool:
+                    del self._by_bit[b]
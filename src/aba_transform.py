@@ -1,47 +1,56 @@
 from copy import deepcopy
 
+from src.aba_compiled import CompiledABA
+from src.aba_control import current
+from src.aba_core import ABA
+from src.aba_graph import cyclic_components, dependency_graph
+
+
 def make_non_circular(aba):
     """
-    Transformation simple vers un cadre 'non-circulaire' en étageant les non-assumptions.
-    Idée  : pour chaque non-assumption s, on crée s^1, s^2, ... s^(k-1)
-    et on duplique les règles en décalant d'un niveau pour casser les cycles.
-    (k = max(1, |L\A|))
+    Transformation vers un cadre 'non-circulaire' en étageant les non-assumptions,
+    seulement là où un cycle est possible : dans chaque composante fortement
+    connexe C du graphe de dépendance qui porte un cycle, chaque s ∈ C devient
+    s^1, ..., s^(m-1), s (m = |C|) et les règles de tête dans C sont dupliquées
+    en décalant d'un niveau leurs prémisses dans C (un chemin sans répétition
+    reste dans C au plus m pas). Les autres règles sont gardées telles quelles.
+    Taille : O(|R|) hors cycles, au lieu de k copies de chaque règle
+    (k = |L \\ A|) quand on étage tous les littéraux.
     """
     A = set(aba.assumptions)
-    L = set(aba.literals)
     R = list(aba.rules)
 
-    non_assumps = sorted([x for x in L if x not in A])
-    k = max(1, len(non_assumps))
+    level_of = {}   # littéral d'une composante cyclique -> (composante, m)
+    for comp in cyclic_components(dependency_graph(R, A)):
+        comp = frozenset(comp)
+        for s in comp:
+            level_of[s] = (comp, len(comp))
 
-    def head_at_level(sym, i):
-        return sym if i == k else f"{sym}^{i}"
+    def at_level(sym, i, m):
+        return sym if i == m else f"{sym}^{i}"
 
-    new_L = set(L)
+    new_L = set(aba.literals)
     new_rules = []
 
     for r in R:
         h = r["head"]
         body = r.get("body", [])
-        body_is_atomic = all(b in A for b in body)
-
-        if body_is_atomic:
-            for i in range(1, k + 1):
-                new_rules.append({"head": head_at_level(h, i), "body": list(body)})
+        if h not in level_of:
+            new_rules.append({"head": h, "body": list(body)})
+            continue
+        comp, m = level_of[h]
+        if not any(b in comp for b in body):
+            # prémisses hors de la composante : tête disponible à tous les niveaux
+            for i in range(1, m + 1):
+                new_rules.append({"head": at_level(h, i, m), "body": list(body)})
         else:
-            for i in range(2, k + 1):
-                new_body = []
-                for b in body:
-                    if b in A:
-                        new_body.append(b)
-                    else:
-                        bj = b if (i - 1) == k else f"{b}^{i-1}"
-                        new_body.append(bj)
-                new_rules.append({"head": head_at_level(h, i), "body": new_body})
+            for i in range(2, m + 1):
+                new_body = [at_level(b, i - 1, m) if b in comp else b for b in body]
+                new_rules.append({"head": at_level(h, i, m), "body": new_body})
 
     # complete L avec les symboles de niveaux
-    for s in non_assumps:
-        for i in range(1, k):
+    for s, (_, m) in level_of.items():
+        for i in range(1, m):
             new_L.add(f"{s}^{i}")
 
     aba.literals = new_L
@@ -84,3 +93,100 @@ def make_atomic_sensitive(aba):
     aba.literals = new_L
     aba.rules = new_rules
     aba.contraries = new_contraries
+
+
+class AtomicView(ABA):
+    """
+    make_atomic_sensitive(base) sans construire le cadre transformé :
+      - compile() produit directement la forme compilée du cadre transformé
+        (s_d, s_nd internés, corps réécrits en ids), sans règles en dicts ;
+      - la dérivation n'a rien à saturer : après réécriture tous les corps ne
+        contiennent que des assumptions, chaque règle donne un seul support ;
+      - literals / assumptions / contraries / rules ne sont matérialisés
+        (une fois) que si on les lit, pour l'export du cadre.
+    Arguments, attaques et export identiques à ceux du cadre transformé.
+    """
+
+    def __init__(self, base):
+        self.base = base
+        self._frame = None
+
+    def _materialized(self):
+        if self._frame is None:
+            t = ABA()
+            t.literals = set(self.base.literals)
+            t.assumptions = set(self.base.assumptions)
+            t.contraries = self.base.contraries
+            t.rules = self.base.rules
+            t.preferences = self.base.preferences
+            make_atomic_sensitive(t)
+            self._frame = t
+        return self._frame
+
+    def _field(name):
+        return property(
+            lambda self: getattr(self._materialized(), name),
+            lambda self, value: setattr(self._materialized(), name, value),
+        )
+
+    literals = _field("literals")
+    assumptions = _field("assumptions")
+    contraries = _field("contraries")
+    rules = _field("rules")
+    del _field
+
+    @property
+    def preferences(self):
+        return self.base.preferences
+
+    @preferences.setter
+    def preferences(self, value):
+        self.base.preferences = value
+
+    def validate(self):
+        # cadre de base déjà validé : la transformation ne crée que des symboles de L
+        if self._frame is not None:
+            self._frame.validate()
+
+    def compile(self):
+        if self._frame is not None:
+            return CompiledABA.from_aba(self._frame)
+        base = self.base
+        A = base.assumptions
+        literals = set(base.literals)
+        assumptions = set(A)
+        contraries = dict(base.contraries)
+        for s in base.literals - A:
+            sd, snd = f"{s}_d", f"{s}_nd"
+            assumptions.update((sd, snd))
+            literals.update((sd, snd))
+            contraries[sd] = snd
+            contraries[snd] = s
+        fw = CompiledABA(literals, assumptions, contraries, (), base.preferences)
+        lid = fw.lit_id
+        fw.rules = [
+            (lid[r["head"]], tuple(lid[b] if b in A else lid[f"{b}_d"] for b in r.get("body", [])))
+            for r in base.rules
+        ]
+        return fw
+
+    def derive_supports(self, fw, supports, dag=None):
+        if self._frame is not None:
+            # cadre matérialisé (éventuellement modifié depuis) : cas général
+            return ABA.derive_supports(self, fw, supports, dag)
+        ctl = current()
+        for bit, lid in enumerate(fw.asm_lit):
+            supports[lid].add(1 << bit)
+            if dag is not None:
+                dag.assume(lid, 1 << bit)
+        lit_bit = fw.lit_bit
+        for idx, (head, body) in enumerate(fw.rules):
+            m = 0
+            for b in body:
+                m |= 1 << lit_bit[b]
+            if supports[head].add(m):
+                if dag is not None:
+                    dag.derive(head, m, idx, body, [1 << lit_bit[b] for b in body])
+                if ctl is not None:
+                    ctl.spend("arguments")
+                    ctl.bound("supports", len(supports[head]))
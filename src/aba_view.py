@@ -0,0 +1,290 @@
+"""
+Vues condensées du graphe d'attaques pour l'affichage (Cytoscape) : le
+navigateur ne reçoit que ce qui est visible, avec des coordonnées déjà
+calculées (layout "preset"), au lieu de tous les arguments et attaques.
+
+Regroupements (group) :
+  - argument   : un nœud par argument (pas de condensation) ;
+  - support    : arguments de même support ;
+  - conclusion : arguments de même conclusion ;
+  - scc        : composantes fortement connexes du graphe d'attaques ;
+  - assumption : résumé au niveau des assumptions (x -> b : un argument dont
+                 le support contient x conclut le contraire de b) ;
+  - auto       : le plus fin de argument, support, conclusion, scc qui tient
+                 dans max_nodes nœuds.
+Voisinage : center (ids d'arguments) et radius restreignent la vue aux
+arguments à au plus radius attaques (dans un sens ou l'autre) des centres.
+"""
+from src.aba_graph import strongly_connected
+
+GROUPS = ("argument", "support", "conclusion", "scc", "assumption")
+AUTO = ("argument", "support", "conclusion", "scc")
+
+# au plus MAX_MEMBERS ids d'arguments par nœud ("size" donne le vrai nombre)
+MAX_MEMBERS = 1000
+
+# espacement du layout en couches
+DX = 120
+DY = 110
+
+
+def _set_label(xs):
+    return "{" + ", ".join(xs) + "}" if xs else "∅"
+
+
+def neighborhood(args, attacks, center, radius=1):
+    """Positions des arguments à au plus `radius` attaques des ids `center`."""
+    pos = {a["id"]: k for k, a in enumerate(args)}
+    adj = [[] for _ in args]
+    for t in attacks:
+        i, j = pos[t["attacker"]], pos[t["target"]]
+        adj[i].append(j)
+        adj[j].append(i)
+    seen = set()
+    level = []
+    for i in center:
+        if i not in pos:
+            raise ValueError(f"argument inconnu: {i}")
+        if pos[i] not in seen:
+            seen.add(pos[i])
+            level.append(pos[i])
+    for _ in range(radius):
+        nxt = []
+        for k in level:
+            for m in adj[k]:
+                if m not in seen:
+                    seen.add(m)
+                    nxt.append(m)
+        level = nxt
+    return seen
+
+
+def _keys(args, attacks, by):
+    """(clé de groupe par argument, libellé par clé), dans l'ordre des arguments."""
+    labels = {}
+    if by == "argument":
+        keys = [f"a{a['id']}" for a in args]
+        for k, a in zip(keys, args):
+            labels[k] = a["conclusion"]
+    elif by == "support":
+        keys = []
+        for a in args:
+            supp = sorted(a["assumptions"])
+            k = "s:" + ",".join(supp)
+            keys.append(k)
+            labels.setdefault(k, _set_label(supp))
+    elif by == "conclusion":
+        keys = [f"c:{a['conclusion']}" for a in args]
+        for k, a in zip(keys, args):
+            labels[k] = a["conclusion"]
+    elif by == "scc":
+        pos = {a["id"]: k for k, a in enumerate(args)}
+        succ = {k: set() for k in range(len(args))}
+        for t in attacks:
+            succ[pos[t["attacker"]]].add(pos[t["target"]])
+        keys = [None] * len(args)
+        # numérotation : attaquants d'abord (ordre inverse de Tarjan)
+        for c, comp in enumerate(reversed(strongly_connected(succ))):
+            comp.sort()
+            k = f"scc{c}"
+            concl = sorted({args[m]["conclusion"] for m in comp})
+            labels[k] = concl[0] if len(comp) == 1 else (
+                f"{', '.join(concl[:3])}{', …' if len(concl) > 3 else ''} ({len(comp)})")
+            for m in comp:
+                keys[m] = k
+    else:
+        raise ValueError(f"regroupement inconnu: {by}")
+    return keys, labels
+
+
+def condense(args, attacks, by, outside=None):
+    """
+    Vue groupée : {"group", "nodes", "edges"}.
+    nodes : {"id", "label", "size", "members", "internal"} (internal : attaques
+    entre membres du même nœud) ; edges : {"source", "target", "weight",
+    <kind>: nombre} agrégées par paire de nœuds.
+    args : arguments exportés ; attacks : au format de compute_attacks ;
+    outside : {id d'argument: attaques vers des arguments hors de la vue},
+    cumulé par nœud dans "hidden" (sur tous les membres, pas seulement ceux listés).
+    """
+    if by == "assumption":
+        return _assumptions(args, attacks, outside)
+    keys, labels = _keys(args, attacks, by)
+    nodes = {}
+    for k, a in zip(keys, args):
+        node = nodes.get(k)
+        if node is None:
+            node = nodes[k] = {"id": k, "label": labels[k], "size": 0, "members": [], "internal": 0}
+            if outside is not None:
+                node["hidden"] = 0
+        node["size"] += 1
+        if len(node["members"]) < MAX_MEMBERS:
+            node["members"].append(a["id"])
+        if outside is not None:
+            node["hidden"] += outside.get(a["id"], 0)
+    key_of = {a["id"]: k for k, a in zip(keys, args)}
+    edges = {}
+    for t in attacks:
+        s, d = key_of[t["attacker"]], key_of[t["target"]]
+        if s == d:
+            nodes[s]["internal"] += 1
+            continue
+        _add_edge(edges, s, d, t["kind"])
+    return {"group": by, "nodes": list(nodes.values()), "edges": list(edges.values())}
+
+
+def _add_edge(edges, s, d, kind, n=1):
+    e = edges.get((s, d))
+    if e is None:
+        e = edges[(s, d)] = {"source": s, "target": d, "weight": 0}
+    e["weight"] += n
+    e[kind] = e.get(kind, 0) + n
+
+
+def _assumptions(args, attacks, outside=None):
+    """
+    Résumé par assumption : arête x -> b pour chaque attaque de témoin b,
+    x parcourant le support de l'argument qui conclut le contraire de b
+    (l'attaquant pour "normal", la cible pour "reverse"). Les attaques par un
+    argument de support vide comptent dans "unconditional" du nœud b.
+    """
+    by_id = {a["id"]: a for a in args}
+    nodes = {}
+
+    def node(x):
+        k = f"asm:{x}"
+        if k not in nodes:
+            nodes[k] = {"id": k, "label": x, "size": 0, "members": [],
+                        "internal": 0, "unconditional": 0}
+            if outside is not None:
+                nodes[k]["hidden"] = 0
+        return nodes[k]
+
+    for a in args:
+        for x in a["assumptions"]:
+            n = node(x)
+            n["size"] += 1
+            if len(n["members"]) < MAX_MEMBERS:
+                n["members"].append(a["id"])
+            if outside is not None:
+                n["hidden"] += outside.get(a["id"], 0)
+    edges = {}
+    for t in attacks:
+        w = node(t["witness"])
+        deriving = by_id[t["target"] if t["kind"] == "reverse" else t["attacker"]]
+        if not deriving["assumptions"]:
+            w["unconditional"] += 1
+        for x in deriving["assumptions"]:
+            if x == t["witness"]:
+                w["internal"] += 1
+            else:
+                _add_edge(edges, node(x)["id"], w["id"], t["kind"])
+    return {"group": "assumption", "nodes": sorted(nodes.values(), key=lambda n: n["id"]),
+            "edges": list(edges.values())}
+
+
+def layered_layout(nodes, edges):
+    """
+    Coordonnées {"x", "y"} ajoutées aux nœuds, en temps linéaire : couche =
+    plus long chemin depuis les attaquants dans le graphe des composantes
+    (une composante cyclique reste sur une couche), couches larges repliées
+    en plusieurs lignes, ordre dans une ligne par barycentre des prédécesseurs.
+    """
+    if not nodes:
+        return nodes
+    idx = {n["id"]: k for k, n in enumerate(nodes)}
+    succ = {k: set() for k in range(len(nodes))}
+    preds = [[] for _ in nodes]
+    for e in edges:
+        s, d = idx[e["source"]], idx[e["target"]]
+        succ[s].add(d)
+        preds[d].append(s)
+
+    comps = strongly_connected(succ)
+    comp_of = [0] * len(nodes)
+    for c, comp in enumerate(comps):
+        for v in comp:
+            comp_of[v] = c
+    depth = [0] * len(comps)
+    # Tarjan rend une composante après ses successeurs : ordre inverse = sources d'abord
+    for c in range(len(comps) - 1, -1, -1):
+        for v in comps[c]:
+            for w in succ[v]:
+                cw = comp_of[w]
+                if cw != c and depth[cw] < depth[c] + 1:
+                    depth[cw] = depth[c] + 1
+
+    layers = {}
+    for v in range(len(nodes)):
+        layers.setdefault(depth[comp_of[v]], []).append(v)
+    width = max(8, int(len(nodes) ** 0.5) * 2)
+    x = [0.0] * len(nodes)
+    row = 0
+    for d in sorted(layers):
+        members = layers[d]
+        # barycentre des prédécesseurs déjà placés (couches précédentes)
+        bary = {}
+        for v in members:
+            ps = [x[p] for p in preds[v] if depth[comp_of[p]] < d]
+            bary[v] = sum(ps) / len(ps) if ps else 0.0
+        members.sort(key=lambda v: (bary[v], v))
+        for start in range(0, len(members), width):
+            line = members[start:start + width]
+            off = (len(line) - 1) / 2
+            for k, v in enumerate(line):
+                x[v] = (k - off) * DX
+                nodes[v]["x"] = x[v]
+                nodes[v]["y"] = row * DY
+            row += 1
+    return nodes
+
+
+def graph_view(args, attacks, group="auto", center=None, radius=1, max_nodes=200, layout=True):
+    """
+    Vue pour /api/aba/graph : condense(...) éventuellement restreinte au
+    voisinage de `center`, avec en plus
+      - "total"     : arguments et attaques du cadre complet ;
+      - "hidden"    : par nœud, attaques vers des arguments hors de la vue (voisinage) ;
+      - "truncated" : nœuds et arguments omis si même le regroupement choisi
+                      dépasse max_nodes (les plus gros nœuds sont gardés) ;
+      - "x", "y"    : coordonnées (layered_layout) si layout.
+    """
+    if group != "auto" and group not in GROUPS:
+        raise ValueError(f"regroupement inconnu: {group}")
+    total = {"arguments": len(args), "attacks": len(attacks)}
+    outside = None
+    if center is not None:
+        keep = neighborhood(args, attacks, center, radius)
+        ids = {args[k]["id"] for k in keep}
+        outside = {}
+        for t in attacks:
+            a_in, t_in = t["attacker"] in ids, t["target"] in ids
+            if a_in != t_in:
+                i = t["attacker"] if a_in else t["target"]
+                outside[i] = outside.get(i, 0) + 1
+        args = [a for k, a in enumerate(args) if k in keep]
+        attacks = [t for t in attacks if t["attacker"] in ids and t["target"] in ids]
+
+    if group == "auto":
+        view = None
+        for by in AUTO:
+            v = condense(args, attacks, by, outside)
+            if view is None or len(v["nodes"]) < len(view["nodes"]):
+                view = v
+            if len(v["nodes"]) <= max_nodes:
+                view = v
+                break
+    else:
+        view = condense(args, attacks, group, outside)
+
+    view["total"] = total
+    if len(view["nodes"]) > max_nodes:
+        ranked = sorted(view["nodes"], key=lambda n: (-n["size"], n["id"]))
+        kept = {n["id"] for n in ranked[:max_nodes]}
+        dropped = ranked[max_nodes:]
+        view["nodes"] = [n for n in view["nodes"] if n["id"] in kept]
+        view["edges"] = [e for e in view["edges"] if e["source"] in kept and e["target"] in kept]
+        view["truncated"] = {"nodes": len(dropped), "arguments": sum(n["size"] for n in dropped)}
+    if layout:
+        layered_layout(view["nodes"], view["edges"])
+    return view
@@ -1,67 +1,14 @@
 from copy import deepcopy
 from typing import Dict, Any
-import json, re
+import json
 
+from src.aba_parser import parse_aba_text
 
-# === Parseur format texte -> dico en json === #
-def parse_aba_plain(text: str) -> dict:
-    lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
-    out = {
-        "literals": [],
-        "assumptions": [],
-        "contraries": {},
-        "rules": [],
-        "preferences": ""
-    }
-    lits = set()
-    def list_from_brackets(s):
-        s = s.strip()
-        if s.startswith("[") and s.endswith("]"):
-            s = s[1:-1]
-        return [x.strip() for x in s.split(",") if x.strip()]
-
-    rule_pat = re.compile(r"^\s*\[[^\]]*\]\s*:\s*([A-Za-z0-9_]+)\s*<-\s*(.*)\s*$")
-    contr_pat = re.compile(r"^C\s*\(\s*([A-Za-z0-9_]+)\s*\)\s*:\s*([A-Za-z0-9_]+)\s*$", re.I)
-
-    pref_str = None
-    for ln in lines:
-        if ln.startswith("L:"):
-            inside = ln.split(":",1)[1].strip()
-            for x in list_from_brackets(inside): lits.add(x)
-            continue
-        if ln.startswith("A:"):
-            inside = ln.split(":",1)[1].strip()
-            arr = list_from_brackets(inside)
-            out["assumptions"] = arr
-            for x in arr: lits.add(x)
-            continue
-        m = contr_pat.match(ln)
-        if m:
-            a, c = m.group(1), m.group(2)
-            out["contraries"][a] = c
-            lits.add(a); lits.add(c)
-            continue
-        m = rule_pat.match(ln)
-        if m:
-            head, body_txt = m.group(1), (m.group(2) or "").strip()
-            body = [] if body_txt == "" else [x.strip() for x in body_txt.split(",") if x.strip()]
-            out["rules"].append({"head": head, "body": body})
-            lits.add(head); [lits.add(x) for x in body]
-            continue
-        if ln.upper().startswith("PREF"):
-            pref_str = ln.split(":",1)[1].strip() if ":" in ln else ln.split(None,1)[1].strip()
-            continue
-        if "<-" in ln:  # ligne sans [rX]:
-            head, body_txt = [p.strip() for p in ln.split("<-",1)]
-            body = [] if body_txt == "" else [x.strip() for x in body_txt.split(",") if x.strip()]
-            out["rules"].append({"head": head, "body": body})
-            lits.add(head); [lits.add(x) for x in body]
-            continue
 
-    if not out["literals"]:
-        out["literals"] = sorted(lits)
-    out["preferences"] = pref_str or ""
-    return out
+# === Parseur format texte -> dico en json === #
+def parse_aba_plain(text) -> dict:
+    """Format texte (ou fichier texte) -> dict ; voir src.aba_parser.parse_aba_text."""
+    return parse_aba_text(text)
 
 
 def parse_any(payload: Dict[str, Any]):
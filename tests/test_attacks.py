@@ -0,0 +1,85 @@
+from pathlib import Path
+import sys
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.utils import parse_any
+from src.aba_core import ABA
+from src.aba_attacks import compute_attacks, iter_attacks
+from src.aba_compiled import worse_masks
+
+
+def naive_attacks(aba, args, use_preferences):
+    """Parcours de référence A x B x Supp(B), agrégé par paire."""
+    prefs = aba.preferences
+    pair = {}
+    for A in args:
+        for B in args:
+            for b in sorted(B["assumptions"]):
+                if aba.contraries.get(b) != A["conclusion"]:
+                    continue
+                less = use_preferences and any(
+                    a in prefs and b in prefs and prefs[a] > prefs[b] for a in A["assumptions"]
+                )
+                key, kind = ((B["id"], A["id"]), "reverse") if less else ((A["id"], B["id"]), "normal")
+                pair.setdefault(key, {"normal": set(), "reverse": set()})[kind].add(b)
+    out = []
+    for (i, j), kinds in pair.items():
+        kind = "normal" if kinds["normal"] else "reverse"
+        out.append({"attacker": i, "target": j, "kind": kind, "witness": min(kinds[kind])})
+    return out
+
+
+def test_exos4_indexed_attacks_match_naive_scan():
+    raw = (ROOT / "data" / "exos4.txt").read_text(encoding="utf-8")
+    data, _ = parse_any({"input": raw})
+    aba = ABA.from_dict(data)
+    args = aba.derive_arguments()
+
+    for use_prefs in (False, True):
+        got = compute_attacks(aba, args, use_preferences=use_prefs)
+        assert got == naive_attacks(aba, args, use_prefs)
+
+    kinds = {t["kind"] for t in compute_attacks(aba, args, use_preferences=True)}
+    assert kinds == {"normal", "reverse"}
+
+
+def test_partial_order_preferences():
+    # a > b et c > d, sans comparaison entre {a, b} et {c, d} ; a > d par transitivité via e
+    data = {
+        "literals": ["a", "b", "c", "d", "e", "x", "y"],
+        "assumptions": ["a", "b", "c", "d", "e"],
+        "contraries": {"a": "x", "b": "y", "c": "y", "d": "x"},
+        "rules": [
+            {"head": "x", "body": ["b"]},
+            {"head": "x", "body": ["e"]},
+            {"head": "y", "body": ["d"]},
+            {"head": "y", "body": ["a"]},
+        ],
+        "preferences": {"a": ["b", "e"], "c": ["d"], "e": ["d"]},
+    }
+    aba = ABA.from_dict(data)
+    fw = aba.compile()
+    bits = {name: 1 << i for i, name in enumerate(fw.asm_names)}
+    assert fw.worse[fw.asm_bit["a"]] == bits["b"] | bits["e"] | bits["d"]
+    assert fw.worse[fw.asm_bit["b"]] == 0
+
+    args = aba.derive_arguments()
+    by = {(a["conclusion"], "".join(sorted(a["assumptions"]))): a["id"] for a in args}
+    atks = {(t["attacker"], t["target"], t["kind"]) for t in compute_attacks(aba, args, True)}
+    # x{b} contre a{a} : b pire que a => reverse (a attaque x{b})
+    assert (by[("a", "a")], by[("x", "b")], "reverse") in atks
+    # y{d} contre c{c} : d pire que c => reverse ; y{a} contre b{b} : normal
+    assert (by[("c", "c")], by[("y", "d")], "reverse") in atks
+    assert (by[("y", "a")], by[("b", "b")], "normal") in atks
+    # x{e} contre d{d} : e meilleur que d => normal
+    assert (by[("x", "e")], by[("d", "d")], "normal") in atks
+    assert sorted(compute_attacks(aba, args, True), key=lambda t: (t["attacker"], t["target"])) \
+        == list(iter_attacks(aba, args, True))
+
+    with pytest.raises(ValueError):
+        worse_masks(["a", "b"], {"a": ["b"], "b": ["a"]})
@@ -0,0 +1,73 @@
+from functools import partial
+from multiprocessing import get_context
+from pathlib import Path
+import sys
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.utils import parse_any
+from src.aba_pipeline import compile_binary, normalize_options, run_pipeline
+from src.aba_batch import evaluate, run_batch
+
+
+def test_batch_matches_single_runs_in_any_order():
+    texts = [(ROOT / "data" / f).read_text(encoding="utf-8")
+             for f in ("exos1.txt", "exos4.txt", "example1.txt")]
+    payloads = [{"input": t} for t in texts] + ["pas un cadre"]
+    opts = {"attacks_sets_mode": "minimal"}
+
+    expected = []
+    for p in payloads[:3]:
+        data, _ = parse_any(p)
+        expected.append(run_pipeline(data, normalize_options(opts)))
+
+    for workers in (1, 2):
+        lines = sorted(run_batch(payloads, opts, workers=workers, chunksize=2),
+                       key=lambda l: l["index"])
+        assert [l["index"] for l in lines] == [0, 1, 2, 3]
+        assert [l["result"] for l in lines[:3]] == expected
+        # une erreur n'interrompt pas le lot
+        assert "error" in lines[3] and "result" not in lines[3]
+
+
+def test_batch_items_get_deadline_and_budgets():
+    text = (ROOT / "data" / "exos1.txt").read_text(encoding="utf-8")
+    payloads = [{"input": text}, {"input": text, "__options": {"max_arguments": 2}}]
+    opts = {"attacks_sets_mode": "minimal"}
+    task = partial(evaluate, limits={"arguments": 100})
+    with get_context("spawn").Pool(2) as pool:
+        lines = sorted(run_batch(payloads, opts, workers=2, task=task, pool=pool),
+                       key=lambda l: l["index"])
+    assert "result" in lines[0]
+    # budget propre à l'élément, combiné au plafond du serveur
+    assert lines[1]["resource"] == "arguments" and lines[1]["limit"] == 2
+
+    # plafond du serveur seul
+    line = evaluate((0, None, text, opts), limits={"arguments": 1})
+    assert line["limit"] == 1 and "result" not in line
+    # échéance : celle de l'élément, plafonnée par celle du serveur
+    line = evaluate((0, None, text, {**opts, "timeout": 30}), timeout=1e-9)
+    assert "délai" in line["error"]
+
+
+def test_batch_accepts_named_frameworks_and_files(tmp_path):
+    path = ROOT / "data" / "exos1.txt"
+    data, _ = parse_any({"input": path.read_text(encoding="utf-8")})
+    (tmp_path / "exos1.abab").write_bytes(compile_binary(data, normalize_options({})))
+    minimal = {"attacks_sets_mode": "minimal"}
+    payloads = [
+        {"framework": "exos1", "__options": minimal},   # comme /api/aba/run
+        {"framework": "absent"},
+        {"framework": "../exos1"},
+        path,                                            # lu par le worker
+    ]
+    task = partial(evaluate, frameworks_dir=str(tmp_path))
+    lines = sorted(run_batch(payloads, workers=1, task=task), key=lambda l: l["index"])
+    assert lines[0]["result"] == run_pipeline(data, normalize_options(minimal))
+    assert "cadre inconnu" in lines[1]["error"]
+    assert "nom de cadre invalide" in lines[2]["error"]
+    assert lines[3]["result"] == run_pipeline(data, normalize_options({}))
+    # sans répertoire de cadres : erreur par élément
+    assert "ABA_FRAMEWORKS_DIR" in evaluate((0, None, payloads[0], None))["error"]
@@ -0,0 +1,45 @@
+from pathlib import Path
+import sys
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.aba_core import ABA
+from src.aba_graph import RuleGraph
+from src.aba_generate import generate, to_text
+from src.aba_parser import parse_aba_text
+from src.aba_bench import PRESETS, STAGES, compare, run_bench
+
+
+def test_generator_is_seeded_valid_and_knobs_apply():
+    a = generate(n_literals=60, n_assumptions=8, depth=5, pref_density=1.0, seed=3)
+    assert a == generate(n_literals=60, n_assumptions=8, depth=5, pref_density=1.0, seed=3)
+    assert a != generate(n_literals=60, n_assumptions=8, depth=5, pref_density=1.0, seed=4)
+    assert len(a["literals"]) == 60 and len(a["assumptions"]) == 8
+    assert set(a["preferences"]) == set(a["assumptions"])
+
+    # sans arêtes retour : aucune composante cyclique ; avec : au moins une
+    acyclic = RuleGraph(ABA.from_dict(a).compile())
+    assert not any(acyclic.cyclic)
+    b = generate(n_literals=60, n_assumptions=8, depth=5, cycle_density=0.3, seed=3)
+    assert any(RuleGraph(ABA.from_dict(b).compile()).cyclic)
+
+    # le texte produit se relit à l'identique (préférences : même ordre)
+    back = parse_aba_text(to_text(a))
+    assert back["rules"] == a["rules"]
+    assert back["contraries"] == a["contraries"]
+
+
+def test_bench_records_stages_and_compare_flags_regressions():
+    res = run_bench(PRESETS["tiny"], memory=True)
+    (name, stages), = res["results"].items()
+    assert tuple(stages) == STAGES
+    assert all(m["peak_kb"] is not None for m in stages.values())
+    assert compare(res, res) == []
+
+    slower = {"results": {name: {s: dict(m) for s, m in stages.items()}}}
+    slower["results"][name]["derive"]["time"] = 1.0
+    slower["results"][name]["attacks"]["size"] = -1
+    issues = {(i["stage"], i["what"]) for i in compare(slower, res)}
+    assert issues == {("derive", "time"), ("attacks", "size")}
@@ -0,0 +1,108 @@
+from pathlib import Path
+import json
+import struct
+import sys
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.utils import parse_any
+from src.aba_core import ABA
+from src.aba_binary import BinaryFormatError, dumps, load, loads
+from src.aba_batch import main
+from src.aba_pipeline import compile_binary, normalize_options, run_pipeline, stream_pipeline
+
+
+def _data(name):
+    data, _ = parse_any({"input": (ROOT / "data" / name).read_text(encoding="utf-8")})
+    return data
+
+
+@pytest.mark.parametrize("name", ["exos1.txt", "exos4.txt", "example1.txt"])
+def test_binary_round_trip_gives_same_results(name):
+    data = _data(name)
+    opts = normalize_options({"attacks_sets_mode": "minimal", "semantics": ["preferred"]})
+    b = loads(compile_binary(data, opts))
+    assert b.has_arguments and b.has_attacks
+    assert run_pipeline(b, opts) == run_pipeline(data, opts)
+    assert list(stream_pipeline(b, opts)) == list(stream_pipeline(data, opts))
+
+    # options différentes de celles de la compilation : recalcul depuis le cadre
+    other = normalize_options({"attacks_sets_mode": "minimal", "use_preferences": False,
+                               "do_non_circular": True})
+    assert run_pipeline(b, other) == run_pipeline(data, other)
+
+
+def test_mmap_file_and_framework_only(tmp_path):
+    data = _data("exos1.txt")
+    path = tmp_path / "exos1.abab"
+    path.write_bytes(dumps(ABA.from_dict(data)))
+    opts = normalize_options({})
+    with load(path) as b:
+        assert not b.has_arguments and b.arguments() is None
+        assert b.to_dict()["rules"] == data["rules"]
+        assert run_pipeline(b, opts) == run_pipeline(data, opts)
+
+
+def test_bad_input_is_rejected():
+    good = compile_binary(_data("exos1.txt"), normalize_options({}))
+    with pytest.raises(BinaryFormatError):
+        loads(b"ABAC" + good[4:])
+    with pytest.raises(BinaryFormatError):
+        loads(good[:4] + struct.pack("<H", 99) + good[6:])
+    with pytest.raises(BinaryFormatError):
+        loads(good[:len(good) // 2])
+
+
+def test_batch_cli_compiles_then_evaluates(tmp_path, capsys):
+    out = tmp_path / "compiled"
+    main([str(ROOT / "data" / "exos1.txt"), "--workers", "1", "--compile", str(out)])
+    assert (out / "exos1.abab").is_file()
+    capsys.readouterr()
+    main([str(out), "--workers", "1"])
+    line = capsys.readouterr().out
+    assert json.loads(line)["result"] == run_pipeline(_data("exos1.txt"), normalize_options({}))
+
+
+def test_real_and_negative_ranks_round_trip():
+    data = _data("exos1.txt")
+    asms = list(data["assumptions"])
+    data["preferences"] = {asms[0]: 1.5, asms[1]: -1, asms[2]: 0}
+    opts = normalize_options({"attacks_sets_mode": "minimal"})
+    b = loads(compile_binary(data, opts))
+    assert b.to_dict()["preferences"] == data["preferences"]
+    assert isinstance(b.to_dict()["preferences"][asms[1]], int)
+    assert run_pipeline(b, opts) == run_pipeline(data, opts)
+
+    data["preferences"] = {asms[0]: float("nan")}
+    with pytest.raises(ValueError):
+        compile_binary(data, opts)
+
+
+def test_transformed_file_requires_its_transformations():
+    data = _data("exos1.txt")
+    b = loads(compile_binary(data, normalize_options({"do_non_circular": True, "attacks_sets_mode": "minimal"})))
+    opts = normalize_options({"do_non_circular": True, "attacks_sets_mode": "minimal"})
+    assert run_pipeline(b, opts) == run_pipeline(data, opts)
+    # jamais de cadre transformé rendu comme s'il ne l'était pas
+    with pytest.raises(ValueError, match="do_non_circular"):
+        run_pipeline(b, normalize_options({"attacks_sets_mode": "minimal"}))
+
+
+def test_retire_waits_for_readers_and_digest_is_cached(tmp_path):
+    path = tmp_path / "exos1.abab"
+    path.write_bytes(compile_binary(_data("exos1.txt"), normalize_options({})))
+    b = load(path)
+    d = b.digest()
+    assert d == b.digest() == loads(path.read_bytes()).digest()
+
+    with b._use():
+        b.retire()
+        assert not b.closed
+        b.to_dict()
+    assert b.closed
+    with pytest.raises(BinaryFormatError):
+        b.prepare(normalize_options({}))
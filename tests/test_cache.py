@@ -0,0 +1,64 @@
+from pathlib import Path
+import sys
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.utils import parse_any
+from src.aba_cache import ResultCache, canonical_key
+from src.aba_pipeline import normalize_options, run_pipeline
+
+
+def test_canonical_key_ignores_notation_but_not_order_or_options():
+    raw = (ROOT / "data" / "exos4.txt").read_text(encoding="utf-8")
+    data, _ = parse_any({"input": raw})
+    same = dict(data)
+    same["literals"] = list(reversed(data["literals"]))
+    same["preferences"] = {"a": 0, "b": 1}  # = "a > b"
+
+    opts = normalize_options({})
+    assert canonical_key(data, opts) == canonical_key(same, opts)
+    assert canonical_key(data, opts) != canonical_key(data, normalize_options({"do_atomic": True}))
+
+    # l'ordre des règles fixe celui de la réponse (règles, ids d'arguments)
+    reordered = dict(data)
+    reordered["rules"] = list(reversed(data["rules"]))
+    assert canonical_key(data, opts) != canonical_key(reordered, opts)
+    assert run_pipeline(data, opts)["rules"] != run_pipeline(reordered, opts)["rules"]
+
+
+def test_partial_results_are_keyed_on_effective_limits():
+    raw = (ROOT / "data" / "exos4.txt").read_text(encoding="utf-8")
+    data, _ = parse_any({"input": raw})
+    partial = normalize_options({"on_limit": "partial"})
+    assert canonical_key(data, partial, {"arguments": 5}) != canonical_key(data, partial, {"arguments": 50})
+    # sans mode partiel, la réponse ne dépend pas des plafonds (résultat complet ou erreur)
+    opts = normalize_options({})
+    assert canonical_key(data, opts, {"arguments": 5}) == canonical_key(data, opts)
+
+
+def test_result_cache_lru_and_persistence(tmp_path):
+    c = ResultCache(maxsize=2, directory=tmp_path)
+    c.put("k1", b"1")
+    c.put("k2", b"2")
+    assert c.get("k1") == b"1"      # k1 devient le plus récent
+    c.put("k3", b"3")               # évince k2
+    assert len(c) == 2 and c.evictions == 1
+    assert c.get("nope") is None
+
+    # k2 n'est plus en mémoire mais relu depuis le disque
+    assert c.get("k2") == b"2"
+    assert c.stats()["hits"] == 1 and c.stats()["disk_hits"] == 1 and c.stats()["misses"] == 1
+
+    # un nouveau cache sur le même répertoire retrouve les entrées
+    assert ResultCache(maxsize=2, directory=tmp_path).get("k3") == b"3"
+
+
+def test_disk_entries_are_bounded(tmp_path):
+    c = ResultCache(maxsize=2, directory=tmp_path, disk_maxsize=2)
+    for k in ("k1", "k2", "k3"):
+        c.put(k, k.encode())
+    assert sorted(p.name for p in tmp_path.glob("*.json")) == ["k2.json", "k3.json"]
+    assert c.stats()["disk_evictions"] == 1
+    assert ResultCache(maxsize=0, directory=tmp_path, disk_maxsize=0).stats()["persistent"] is False
@@ -0,0 +1,162 @@
+from pathlib import Path
+import asyncio
+import sys
+import threading
+import time
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.aba_core import ABA
+from src.aba_attacks import compute_attacks_sets
+from src.aba_control import BudgetExceeded, Cancelled, Control, TimedOut, current
+from src.aba_executor import Overloaded, SolverPool
+from src.aba_pipeline import normalize_options, run_pipeline
+
+
+def big_aba(n=10):
+    # n assumptions a_i, contraire c_i dérivable depuis a_{i+1} : 4^n paires (X,Y)
+    asms = [f"a{i}" for i in range(n)]
+    data = {
+        "literals": asms + [f"c{i}" for i in range(n)],
+        "assumptions": asms,
+        "contraries": {f"a{i}": f"c{i}" for i in range(n)},
+        "rules": [{"head": f"c{i}", "body": [f"a{(i + 1) % n}"]} for i in range(n)],
+        "preferences": {},
+    }
+    return ABA.from_dict(data)
+
+
+def test_deadline_interrupts_set_enumeration():
+    aba = big_aba()
+    args = aba.derive_arguments()
+    start = time.monotonic()
+    with Control(timeout=0.05).active():
+        with pytest.raises(TimedOut):
+            compute_attacks_sets(aba, args, mode="full")
+    assert time.monotonic() - start < 2
+
+    ctl = Control(every=1)
+    ctl.cancel()
+    with ctl.active():
+        with pytest.raises(Cancelled):
+            aba.derive_arguments()
+    # hors contrôle : rien ne change
+    assert len(aba.derive_arguments()) == len(args)
+
+
+def test_pool_admission_and_timeout():
+    async def scenario():
+        pool = SolverPool(workers=1, max_queue=0, timeout=0.05)
+        gate = threading.Event()
+        busy = asyncio.ensure_future(pool.run(gate.wait, deadline=False))
+        await asyncio.sleep(0.05)
+        # un worker occupé, file vide autorisée : refus immédiat
+        with pytest.raises(Overloaded):
+            await pool.run(len, [])
+        gate.set()
+        await busy
+
+        aba = big_aba()
+        args = aba.derive_arguments()
+        with pytest.raises(TimedOut):
+            await pool.run(compute_attacks_sets, aba, args)
+        stats = pool.stats()
+        pool.shutdown()
+        return stats
+
+    stats = asyncio.run(scenario())
+    assert stats["rejected"] == 1 and stats["timeouts"] == 1
+    assert stats["running"] == 0 and stats["queued"] == 0
+
+
+def blowup(n=12):
+    # p_k <- p_{k-1}, a_k | p_{k-1}, b_k : 2^n supports minimaux pour p_n
+    asms = [f"{x}{i}" for i in range(n) for x in "ab"]
+    rules = [{"head": "p0", "body": ["a0"]}, {"head": "p0", "body": ["b0"]}]
+    for k in range(1, n):
+        rules += [{"head": f"p{k}", "body": [f"p{k - 1}", f"{x}{k}"]} for x in "ab"]
+    return {
+        "literals": asms + [f"p{k}" for k in range(n)],
+        "assumptions": asms,
+        "contraries": {},
+        "rules": rules,
+        "preferences": {},
+    }
+
+
+def test_budgets_abort_or_truncate():
+    data = blowup()
+    for limits, resource in [({"max_combinations": 1000}, "combinations"),
+                             ({"max_supports": 100}, "supports"),
+                             ({"max_arguments": 500}, "arguments")]:
+        opts = normalize_options({**limits, "attacks_sets_mode": "minimal"})
+        start = time.monotonic()
+        with pytest.raises(BudgetExceeded) as exc:
+            run_pipeline(data, opts)
+        assert exc.value.resource == resource
+        assert exc.value.stage == "derive"
+        assert time.monotonic() - start < 2
+
+    opts = normalize_options({"max_arguments": 500, "on_limit": "partial", "attacks_sets_mode": "minimal"})
+    res = run_pipeline(data, opts)
+    assert res["_partial"]["resource"] == "arguments"
+    assert len(res["arguments"]) == 500
+
+    # paires de coalitions : la liste s'arrête à la dernière ligne permise
+    aba = big_aba(6)
+    args = aba.derive_arguments()
+    full = compute_attacks_sets(aba, args, mode="full")
+    ctl = Control(limits={"pairs": 64 * 10}, partial=True)
+    with ctl.active():
+        part = compute_attacks_sets(aba, args, mode="full")
+    assert ctl.exceeded.resource == "pairs"
+    assert part == full[:len(part)] and 0 < len(part) < len(full)
+
+    # sans budget : résultat complet, pas de "_partial"
+    assert "_partial" not in run_pipeline(blowup(4), normalize_options({"attacks_sets_mode": "minimal"}))
+
+
+def test_pool_pull_streams_in_chunks_and_cancels():
+    async def scenario():
+        pool = SolverPool(workers=1, max_queue=0)
+        seen = []
+
+        def records():
+            for k in range(10):
+                seen.append(current())
+                yield k
+
+        ctl = Control()
+        chunks = [c async for c in pool.pull(records(), ctl, size=4)]
+        # un seul contrôle pour tout le flux, fermé en fin de flux
+        assert chunks == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]]
+        assert all(c is ctl for c in seen) and ctl.cancelled
+
+        # flux abandonné (client parti) : le contrôle est annulé
+        ctl = Control()
+        it = pool.pull(iter(range(100)), ctl, size=1)
+        assert await it.__anext__() == [0]
+        await it.aclose()
+        assert ctl.cancelled
+
+        # un flux passe par l'admission comme une requête
+        gate = threading.Event()
+        busy = asyncio.ensure_future(pool.run(gate.wait, deadline=False))
+        await asyncio.sleep(0.05)
+        with pytest.raises(Overloaded):
+            await pool.pull(iter(range(3)), Control()).__anext__()
+        gate.set()
+        await busy
+        pool.shutdown()
+
+    asyncio.run(scenario())
+
+
+def test_unknown_option_values_are_rejected():
+    for opts in ({"on_limit": "ignore"}, {"attacks_backend": "gpu"}, {"attacks_sets_mode": "minimum"}):
+        with pytest.raises(ValueError):
+            normalize_options(opts)
@@ -0,0 +1,136 @@
+from pathlib import Path
+import sys
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.aba_core import ABA, saturate, saturate_stratified
+from src.aba_pipeline import explain, normalize_options
+from src.aba_graph import RuleGraph
+from src.aba_supports import SupportSet
+
+
+def fset(xs):
+    return frozenset(xs)
+
+
+def test_derive_arguments_cycles_and_minimal_supports():
+    """
+    Règles circulaires (p <- q, q <- p) et supports non minimaux :
+    la fermeture doit terminer et ne garder que les supports minimaux.
+    """
+    aba = ABA.from_dict({
+        "literals": ["a", "b", "p", "q", "r"],
+        "assumptions": ["a", "b"],
+        "contraries": {"a": "r", "b": "p"},
+        "rules": [
+            {"head": "p", "body": ["q"]},
+            {"head": "q", "body": ["p"]},
+            {"head": "p", "body": ["a", "b"]},
+            {"head": "q", "body": ["a"]},
+            {"head": "r", "body": ["p", "q", "b"]},
+            {"head": "r", "body": ["r"]},
+        ],
+    })
+    args = aba.derive_arguments()
+    got = {(fset(a["assumptions"]), a["conclusion"]) for a in args}
+
+    assert got == {
+        (fset(["a"]), "a"),
+        (fset(["b"]), "b"),
+        (fset(["a"]), "p"),
+        (fset(["a"]), "q"),
+        (fset(["a", "b"]), "r"),
+    }
+
+
+def _seeded(fw):
+    supports = [SupportSet() for _ in fw.lit_names]
+    for bit, lid in enumerate(fw.asm_lit):
+        supports[lid].add(1 << bit)
+    for head, body in fw.rules:
+        if not body:
+            supports[head].add(0)
+    return supports
+
+
+def test_rule_graph_strata_and_stratified_saturation():
+    aba = ABA.from_dict({
+        "literals": ["a", "b", "p", "q", "r", "s", "u"],
+        "assumptions": ["a", "b"],
+        "contraries": {"a": "r"},
+        "rules": [
+            {"head": "s", "body": ["p", "b"]},
+            {"head": "p", "body": ["q"]},
+            {"head": "q", "body": ["p"]},
+            {"head": "q", "body": ["a"]},
+            {"head": "r", "body": ["u"]},       # u sans argument : règle morte
+            {"head": "r", "body": ["s", "q"]},
+        ],
+    })
+    fw = aba.compile()
+    g = RuleGraph(fw)
+    lid = fw.lit_id
+    pos = {l: k for k, comp in enumerate(g.components) for l in comp}
+    assert pos[lid["p"]] == pos[lid["q"]] and g.cyclic[pos[lid["p"]]]
+    assert pos[lid["p"]] < pos[lid["s"]] < pos[lid["r"]]
+    assert not g.cyclic[pos[lid["s"]]]
+    assert [fw.lit_names[l] for l in g.underivable()] == ["u"]
+    assert g.dead == [4]
+    expected = saturate(fw, _seeded(fw))
+    assert [sorted(x) for x in saturate_stratified(fw, _seeded(fw), g)] == [sorted(x) for x in expected]
+
+
+def test_derivation_dag_shares_subderivations():
+    # p_k <- q_{k-1}, r_{k-1} ; q_k <- p_k ; r_k <- p_k : arbre de taille 2^n, DAG linéaire
+    n = 20
+    rules = [{"head": "p0", "body": ["a"]}]
+    for k in range(n):
+        rules += [{"head": f"q{k}", "body": [f"p{k}"]}, {"head": f"r{k}", "body": [f"p{k}"]}]
+        if k:
+            rules.append({"head": f"p{k}", "body": [f"q{k - 1}", f"r{k - 1}"]})
+    lits = ["a"] + [f"{x}{k}" for k in range(n) for x in "pqr"]
+    aba = ABA.from_dict({"literals": lits, "assumptions": ["a"], "contraries": {},
+                         "rules": rules, "preferences": {}})
+    args, dag = aba.derivations()
+    assert [(a.id, a.mask, a.concl) for a in args] == \
+           [(a.id, a.mask, a.concl) for a in aba.derive_arguments()]
+    assert len(dag) == len(args)   # une étape par support, rien de dupliqué
+
+    top = next(a for a in args if a["conclusion"] == f"p{n - 1}")
+    root = dag.node_of(top)
+    part = dag.subgraph([root], depth=2)
+    # p, q, r du niveau précédent : p partagé par q et r n'est envoyé qu'une fois
+    assert [x["conclusion"] for x in part["nodes"]] == [f"p{n - 2}", f"r{n - 2}", f"q{n - 2}", f"p{n - 1}"]
+    rest = dag.subgraph(part["frontier"])
+    assert len(part["nodes"]) + len(rest["nodes"]) == 3 * n - 1
+    tree = dag.tree(root, depth=1)
+    assert tree["conclusion"] == f"p{n - 1}"
+    assert [c["conclusion"] for c in tree["children"]] == [f"q{n - 2}", f"r{n - 2}"]
+    assert tree["children"][0]["children"] == [{"id": part["nodes"][0]["id"]}]
+
+
+def test_explain_trees_match_supports():
+    aba_data = {
+        "literals": ["a", "b", "c", "p", "q", "r"],
+        "assumptions": ["a", "b", "c"],
+        "contraries": {"a": "r"},
+        "rules": [
+            {"head": "p", "body": ["q", "b"]},
+            {"head": "q", "body": ["a"]},
+            {"head": "q", "body": ["p"]},
+            {"head": "r", "body": ["q", "c"]},
+        ],
+        "preferences": {},
+    }
+    res = explain(aba_data, normalize_options({}), tree=True)
+
+    def leaves(t):
+        if t["rule"] is None:
+            return {t["conclusion"]}
+        assert aba_data["rules"][t["rule"]]["head"] == t["conclusion"]
+        return set().union(*(leaves(c) for c in t["children"])) if t["children"] else set()
+
+    for e in res["arguments"]:
+        assert leaves(e["tree"]) == set(e["assumptions"])
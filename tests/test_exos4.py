@@ -76,3 +76,29 @@ def test_exos4_includes_some_key_edges():
 
     assert expected_normals.issubset(normals), f"Arêtes normales manquantes: {sorted(expected_normals - normals)}"
     assert expected_reverses.issubset(reverses), f"Arêtes reverse manquantes: {sorted(expected_reverses - reverses)}"
+
+
+def test_exos4_minimal_mode_generates_full_list():
+    """
+    Le mode "minimal" ne renvoie que les générateurs (X0, Y0) ; toute attaque
+    de la liste complète doit être couverte par un générateur du même type.
+    """
+    p = ROOT / "data" / "exos4.txt"
+    data, _ = parse_any({"input": p.read_text(encoding="utf-8")})
+
+    aba = ABA.from_dict(data)
+    args = aba.derive_arguments()
+    full = compute_attacks_sets(aba, args)
+    gens = compute_attacks_sets(aba, args, mode="minimal")
+
+    assert len(gens) == 3
+
+    def covered(t, kind):
+        return any(
+            g["kind"] == kind and fset(g["X"]) <= fset(t["X"]) and fset(g["Y"]) <= fset(t["Y"])
+            for g in gens
+        )
+
+    for t in full:
+        kinds = ("normal", "reverse") if t["kind"] == "both" else (t["kind"],)
+        assert all(covered(t, k) for k in kinds), t
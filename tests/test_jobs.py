@@ -0,0 +1,60 @@
+from pathlib import Path
+import sys
+import time
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.aba_core import ABA
+from src.aba_attacks import compute_attacks_sets
+from src.aba_jobs import CANCELLED, DONE, FAILED, JobManager
+
+
+def big_aba(n=11):
+    asms = [f"a{i}" for i in range(n)]
+    return ABA.from_dict({
+        "literals": asms + [f"c{i}" for i in range(n)],
+        "assumptions": asms,
+        "contraries": {f"a{i}": f"c{i}" for i in range(n)},
+        "rules": [{"head": f"c{i}", "body": [f"a{(i + 1) % n}"]} for i in range(n)],
+        "preferences": {},
+    })
+
+
+def wait(job, statuses=(DONE, FAILED, CANCELLED), pause=0.01, tries=500):
+    for _ in range(tries):
+        if job.status in statuses:
+            return job
+        time.sleep(pause)
+    raise AssertionError(job.info())
+
+
+def test_progress_cancel_and_result():
+    jobs = JobManager(workers=1)
+    aba = big_aba()
+    args = aba.derive_arguments()
+
+    slow = jobs.submit(compute_attacks_sets, aba, args)
+    # l'énumération des paires de coalitions publie son avancement
+    for _ in range(500):
+        if slow.ctl.done:
+            break
+        time.sleep(0.01)
+    info = slow.info()
+    assert info["status"] == "running" and info["stage"] == "attacks_sets"
+    assert 0 < info["progress"]["done"] < info["progress"]["total"] == 4 ** 11
+
+    jobs.cancel(slow.id)
+    assert wait(slow).status == CANCELLED and slow.result is None
+
+    # le worker est libre pour le job suivant
+    seen = []
+    ok = jobs.submit(lambda: b"{}", on_done=seen.append)
+    assert wait(ok).status == DONE and ok.result == b"{}"
+    assert seen == [b"{}"]
+
+    bad = jobs.submit(lambda: 1 / 0)
+    assert wait(bad).status == FAILED and "division" in bad.info()["error"]
+    assert jobs.stats()["jobs"] == {"cancelled": 1, "done": 1, "failed": 1}
+    jobs.shutdown()
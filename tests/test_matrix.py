@@ -0,0 +1,48 @@
+from pathlib import Path
+import sys
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+pytest.importorskip("numpy")
+
+from src.aba_core import ABA
+from src.aba_attacks import compute_attacks
+from src.aba_generate import generate
+from src.aba_matrix import AttackMatrix
+from src.aba_pipeline import normalize_options, run_pipeline
+from src.aba_semantics import AttackGraph
+
+
+def frameworks():
+    for seed in range(12):
+        data = generate(n_literals=40, n_assumptions=7, depth=4,
+                        cycle_density=0.1 * (seed % 3), pref_density=0.7, seed=seed)
+        if seed % 4 == 0:
+            a = data["assumptions"]
+            data["preferences"] = {a[0]: [a[1], a[2]], a[3]: [a[0]]}   # ordre partiel
+        yield data
+
+
+def test_same_attacks_as_python_backend():
+    for data in frameworks():
+        aba = ABA.from_dict(data)
+        args = aba.derive_arguments()
+        for prefs in (False, True):
+            expected = compute_attacks(aba, args, use_preferences=prefs)
+            m = AttackMatrix(aba, args, use_preferences=prefs)
+            assert m.to_dicts() == expected
+            assert len(m) == len(expected)
+            g = m.graph(args)
+            ref = AttackGraph(args, expected)
+            assert g.targets == ref.targets and g.attackers == ref.attackers
+
+
+def test_pipeline_backend_option():
+    for data in frameworks():
+        base = {"semantics": ["grounded"], "attacks_sets_mode": "minimal"}
+        assert (run_pipeline(data, normalize_options({**base, "attacks_backend": "numpy"}))
+                == run_pipeline(data, normalize_options(base)))
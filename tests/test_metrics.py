@@ -0,0 +1,74 @@
+from pathlib import Path
+import sys
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.aba_core import ABA
+from src.aba_metrics import Metrics, Profile, current
+from src.aba_pipeline import normalize_options, run_pipeline
+
+DATA = {
+    "literals": ["a", "b", "c", "p", "q", "r"],
+    "assumptions": ["a", "b", "c"],
+    "contraries": {"a": "q", "b": "r", "c": "p"},
+    "rules": [
+        {"head": "p", "body": ["a"]},
+        {"head": "q", "body": ["b", "p"]},
+        {"head": "r", "body": ["c"]},
+        {"head": "p", "body": ["q"]},
+    ],
+    "preferences": {"a": 0, "b": 1},
+}
+
+
+def test_counters_only_when_active():
+    aba = ABA.from_dict(DATA)
+    aba.derive_arguments()
+    assert current() is None
+
+    prof = Profile()
+    with prof.active():
+        assert current() is prof
+        aba.derive_arguments()
+    assert current() is None
+    assert prof.counters["fixpoint_rounds"] >= 1
+    assert prof.counters["combinations"] >= prof.counters["supports_pruned"] >= 0
+
+
+def test_pipeline_stages_and_counters():
+    opts = normalize_options({"semantics": ["preferred"]})
+    prof = Profile()
+    prof.add_time("parse", 0.001)
+    with prof.active():
+        res = run_pipeline(DATA, opts)
+    report = prof.report()
+    for s in ("parse", "validate", "transform", "derive", "attacks", "attacks_sets", "export", "extensions"):
+        assert s in report["stages"]
+    for c in ("fixpoint_rounds", "combinations", "attack_pairs", "coalitions", "labellings"):
+        assert report["counters"][c] > 0
+    # le profil ne change pas le résultat
+    assert res == run_pipeline(DATA, opts)
+
+
+def test_render_prometheus():
+    m = Metrics()
+    prof = Profile()
+    prof.add_time("derive", 0.5)
+    prof.count("labellings", 3)
+    m.record(prof)
+    m.record(prof)
+    m.request("run", 200)
+    text = m.render({"aba_pool_running": 1}, {"aba_cache_hits": 4, "aba_pool_rejected_total": 2})
+    lines = text.splitlines()
+    assert 'aba_requests_total{endpoint="run",status="200"} 1' in lines
+    assert 'aba_stage_seconds_total{stage="derive"} 1.000000' in lines
+    assert 'aba_stage_calls_total{stage="derive"} 2' in lines
+    assert 'aba_work_total{counter="labellings"} 6' in lines
+    assert "# TYPE aba_pool_running gauge" in lines
+    assert "aba_pool_running 1" in lines
+    # cumuls croissants : counter, suffixe _total
+    assert "# TYPE aba_cache_hits_total counter" in lines and "aba_cache_hits_total 4" in lines
+    assert "# TYPE aba_pool_rejected_total counter" in lines and "aba_pool_rejected_total 2" in lines
+    assert not any(l.startswith("# TYPE") and l.endswith("gauge") and "total" in l for l in lines)
@@ -0,0 +1,67 @@
+from pathlib import Path
+import io
+import sys
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.aba_parser import ABAParseError, parse_aba_text
+import src.aba_parser as aba_parser
+
+
+def test_exos1_text_and_file_object():
+    p = ROOT / "data" / "exos1.txt"
+    data = parse_aba_text(p.read_text(encoding="utf-8"))
+    assert data["literals"] == ["a", "b", "c", "p", "q", "r", "s", "t"]
+    assert data["assumptions"] == ["a", "b", "c"]
+    assert data["contraries"] == {"a": "r", "b": "s", "c": "t"}
+    assert data["rules"][0] == {"head": "p", "body": ["q", "a"]}
+    assert data["rules"][1] == {"head": "q", "body": []}
+    # même résultat en lisant le fichier par petits blocs
+    old = aba_parser._CHUNK
+    aba_parser._CHUNK = 7
+    try:
+        with p.open(encoding="utf-8") as fh:
+            assert parse_aba_text(fh) == data
+    finally:
+        aba_parser._CHUNK = old
+
+
+def test_symbols_are_interned_and_unlabeled_rules():
+    data = parse_aba_text("A: [a]\n# commentaire\nC(a): x\r\nx <- a , b,\n[r 2]: y <- x\nPREF: a > b\n")
+    assert data["rules"] == [{"head": "x", "body": ["a", "b"]}, {"head": "y", "body": ["x"]}]
+    assert data["preferences"] == "a > b"
+    assert data["rules"][0]["head"] is data["rules"][1]["body"][0]
+
+
+def test_pref_line_needs_colon_or_blank():
+    data = parse_aba_text("A: [a, b]\npref <- a\nprefer <- b\npref a > b\n")
+    assert [r["head"] for r in data["rules"]] == ["pref", "prefer"]
+    assert data["preferences"] == "a > b"
+    assert parse_aba_text("Pref:b > a\n")["preferences"] == "b > a"
+
+
+@pytest.mark.parametrize("text, line, col", [
+    ("L: [a, b\n", 1, 9),
+    ("A: [a]\nC(a) x\n", 2, 6),
+    ("[r1] p <- q\n", 1, 6),
+    ("\n\nbonjour\n", 3, 1),
+    ("p <- q <- r", 1, 8),
+    ("  [r1]: p <- q )", 1, 16),
+    # symboles sans virgule entre eux
+    ("p <- a b\n", 1, 8),
+    ("A: [a]\n[r1]: p <- a,, b c\n", 2, 18),
+    ("L: [x y]\n", 1, 7),
+    # mot commençant par "pref" : règle ou erreur, pas des préférences
+    ("prefer <- a b\n", 1, 13),
+    ("pref <- a b\n", 1, 11),
+    ("A: [a]\npreferences a > b\n", 2, 1),
+])
+def test_errors_have_line_and_column(text, line, col):
+    with pytest.raises(ABAParseError) as err:
+        parse_aba_text(text)
+    assert (err.value.line, err.value.col) == (line, col)
+    assert f"ligne {line}, colonne {col}" in str(err.value)
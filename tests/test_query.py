@@ -0,0 +1,32 @@
+from pathlib import Path
+import sys
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.utils import parse_any
+from src.aba_core import ABA
+from src.aba_query import GoalSolver
+
+
+def test_exos1_goal_directed_queries():
+    raw = (ROOT / "data" / "exos1.txt").read_text(encoding="utf-8")
+    data, _ = parse_any({"input": raw})
+    solver = GoalSolver(ABA.from_dict(data))
+
+    q = solver.query("q")
+    assert q["supported"] and q["arguments"] == [[]] and q["credulous"]
+    # q <- (fait) : rien d'autre n'est exploré
+    assert q["relevant_literals"] == 1
+
+    r = solver.query("r")
+    assert r["arguments"] == [["b", "c"]] and r["credulous"]
+
+    s = solver.query("s")
+    assert s["arguments"] == [["a", "c"]] and not s["credulous"]
+
+    # sans acceptation crédule : seules les dépendances de p sont saturées
+    p = solver.query("p", credulous=False)
+    assert p["arguments"] == [["a"]] and "credulous" not in p
+    assert p["relevant_literals"] == 3
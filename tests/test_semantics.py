@@ -0,0 +1,44 @@
+from pathlib import Path
+import sys
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.utils import parse_any
+from src.aba_core import ABA
+from src.aba_attacks import compute_attacks
+from src.aba_semantics import AttackGraph, compute_extensions, preferred_extensions
+
+
+def test_exos1_extensions():
+    """
+    Exo 1 (sans préférences) : {b,c} est l'unique extension préférée et stable,
+    l'extension fondée ne contient que ∅ ⊢ q.
+    """
+    raw = (ROOT / "data" / "exos1.txt").read_text(encoding="utf-8")
+    data, _ = parse_any({"input": raw})
+    aba = ABA.from_dict(data)
+    args = aba.derive_arguments()
+    atks = compute_attacks(aba, args, use_preferences=False)
+
+    ext = compute_extensions(aba, args, atks, use_preferences=False)
+    concl = {a["id"]: a["conclusion"] for a in args}
+
+    assert ext["assumptions"]["preferred"] == [["b", "c"]]
+    assert ext["assumptions"]["stable"] == [["b", "c"]]
+    assert [concl[i] for i in ext["arguments"]["grounded"]] == ["q"]
+    assert [sorted(concl[i] for i in S) for S in ext["arguments"]["preferred"]] == [["b", "c", "q", "r"]]
+    assert ext["arguments"]["stable"] == ext["arguments"]["preferred"]
+
+
+def test_odd_and_even_cycles():
+    args = [{"id": k} for k in range(3)]
+    # cycle impair : aucune extension non vide, pas de stable
+    odd = AttackGraph(args, [{"attacker": i, "target": (i + 1) % 3} for i in range(3)])
+    assert preferred_extensions(odd) == [[]]
+    # cycle pair (0 <-> 1) + 2 attaqué par 1 : deux préférées
+    even = AttackGraph(args, [
+        {"attacker": 0, "target": 1}, {"attacker": 1, "target": 0}, {"attacker": 1, "target": 2},
+    ])
+    assert preferred_extensions(even) == [[0, 2], [1]]
@@ -0,0 +1,120 @@
+from pathlib import Path
+import sys
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.utils import parse_any
+from src.aba_pipeline import normalize_options, run_pipeline
+from src.aba_session import ABASession
+
+
+def canon(res):
+    """Résultats comparables indépendamment des ids d'arguments."""
+    by_id = {a["id"]: (a["conclusion"], tuple(sorted(a["assumptions"]))) for a in res["arguments"]}
+    args = sorted(by_id.values())
+    atks = sorted((by_id[e["attacker"]], by_id[e["target"]], e["kind"], e["witness"])
+                  for e in res["attacks"])
+    sets = sorted((tuple(s["X"]), tuple(s["Y"]), s["kind"], s["witness"]) for s in res["attacks_sets"])
+    return args, atks, sets
+
+
+def fresh(sess):
+    data = {
+        "literals": sorted(sess.aba.literals),
+        "assumptions": sorted(sess.aba.assumptions),
+        "contraries": dict(sess.aba.contraries),
+        "rules": [dict(r) for r in sess.aba.rules],
+        "preferences": dict(sess.aba.preferences),
+    }
+    return run_pipeline(data, normalize_options({"attacks_sets_mode": "minimal"}))
+
+
+def test_exos1_edits_match_fresh_recompute():
+    raw = (ROOT / "data" / "exos1.txt").read_text(encoding="utf-8")
+    data, _ = parse_any({"input": raw})
+    sess = ABASession(data, sets_mode="minimal")
+    assert canon(sess.results()) == canon(fresh(sess))
+    ids = {a.id for a in sess.arguments()}
+
+    edits = [
+        {"op": "add_rule", "head": "t", "body": ["a", "q"]},
+        {"op": "set_contrary", "assumption": "c", "contrary": "t"},
+        {"op": "set_preferences", "preferences": "c > a > b"},
+        {"op": "set_preferences", "preferences": {"a": ["b"], "c": ["b"]}},   # ordre partiel
+        {"op": "remove_rule", "index": 0},
+    ]
+    for edit in edits:
+        ch = sess.apply(edit)
+        # ids stables : les arguments restants gardent leur id
+        ids = (ids - set(ch["removed"])) | set(ch["added"])
+        assert {a.id for a in sess.arguments()} == ids
+        assert canon(sess.results()) == canon(fresh(sess))
+
+
+def state(sess):
+    """État interne complet, pour vérifier qu'une annulation est exacte."""
+    fw = sess.fw
+    return (
+        sorted(sess.aba.literals), [dict(r) for r in sess.aba.rules], dict(sess.aba.contraries),
+        dict(sess.aba.preferences), list(fw.lit_names), dict(fw.lit_id), list(fw.lit_bit),
+        list(fw.rules), list(fw.contrary), list(fw.rank), list(fw.worse), list(sess.rule_ids),
+        [sorted(S) for S in sess.supports], {i: (a.concl, a.mask) for i, a in sess.args.items()},
+        dict(sess.by_key), {k: set(v) for k, v in sess.by_concl.items() if v},
+        {k: set(v) for k, v in sess.by_asm.items() if v}, sess.next_id,
+        {k: list(v) for k, v in sess.pairs.items()}, dict(sess.gens),
+    )
+
+
+def test_failed_edit_rolls_back_the_whole_batch():
+    raw = (ROOT / "data" / "exos1.txt").read_text(encoding="utf-8")
+    data, _ = parse_any({"input": raw})
+    sess = ABASession(data, sets_mode="minimal")
+    before = canon(sess.results())
+    saved = state(sess)
+    bad = [
+        {"op": "add_rule", "head": "z", "body": ["a", "q", "w"]},
+        {"op": "add_rule", "head": "t", "body": ["a", "q"]},
+        {"op": "set_contrary", "assumption": "c", "contrary": "t"},
+        {"op": "set_preferences", "preferences": "c > a > b"},
+        {"op": "remove_rule", "index": 0},
+        {"op": "remove_rule", "index": 99},
+    ]
+    with pytest.raises(ValueError):
+        sess.apply_all(bad)
+    # le journal d'annulation restaure exactement l'état
+    assert state(sess) == saved
+    assert canon(sess.results()) == before
+    # forme invalide : refusée avant toute modification
+    for edits in ([{"op": "add_rule", "head": "t"}, {"op": "set_contrary", "assumption": "c"}],
+                  [{"op": "swap"}]):
+        with pytest.raises(ValueError):
+            sess.apply_all(edits)
+    assert state(sess) == saved
+    # la session reste utilisable après l'annulation
+    ch = sess.apply_all(bad[:-1])
+    assert ch["added"] and canon(sess.results()) == canon(fresh(sess))
+
+
+def test_bad_single_edit_leaves_session_readable():
+    raw = (ROOT / "data" / "exos1.txt").read_text(encoding="utf-8")
+    data, _ = parse_any({"input": raw})
+    sess = ABASession(data, sets_mode="minimal")
+    before = canon(sess.results())
+    saved = state(sess)
+    for edit in ({"op": "add_rule", "head": "q", "body": [5]},
+                 {"op": "add_rule", "head": "q", "body": "ab"},
+                 {"op": "add_rule", "head": 1},
+                 {"op": "set_contrary", "assumption": "c", "contrary": ["t"]},
+                 {"op": "set_preferences", "preferences": {"a": {"b": 1}}},
+                 {"op": "remove_rule", "index": "0"}):
+        with pytest.raises(ValueError):
+            sess.apply(edit)
+        assert state(sess) == saved
+    # lecture puis édition valide après les refus
+    assert canon(sess.results()) == before
+    sess.apply({"op": "add_rule", "head": "t", "body": ["a", "q"]})
+    assert canon(sess.results()) == canon(fresh(sess))
@@ -0,0 +1,59 @@
+from pathlib import Path
+import sys
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.utils import parse_any
+from src.aba_pipeline import normalize_options, run_pipeline, stream_pipeline
+
+
+def test_stream_matches_full_result():
+    for name in ("example1.txt", "exos1.txt", "exos4.txt"):
+        raw = (ROOT / "data" / name).read_text(encoding="utf-8")
+        data, _ = parse_any({"input": raw})
+        for extra in ({}, {"use_preferences": False}, {"semantics": ["grounded", "preferred"]}):
+            opts = normalize_options(extra)
+            full = run_pipeline(data, opts)
+            records = list(stream_pipeline(data, opts))
+
+            by_type = {}
+            for rec in records:
+                body = {k: v for k, v in rec.items() if k != "type"}
+                by_type.setdefault(rec["type"], []).append(body)
+
+            assert records[0]["type"] == "framework" and records[-1]["type"] == "end"
+            head = by_type["framework"][0]
+            assert all(head[k] == full[k] for k in head)
+            assert by_type.get("argument", []) == full["arguments"]
+            # flux : attaques triées par (attaquant, cible)
+            assert by_type.get("attack", []) == sorted(
+                full["attacks"], key=lambda t: (t["attacker"], t["target"]))
+            assert by_type.get("attack_set", []) == full["attacks_sets"]
+            if "extensions" in full:
+                assert by_type["extensions"] == [full["extensions"]]
+            assert by_type["end"][0]["counts"] == {
+                "arguments": len(full["arguments"]),
+                "attacks": len(full["attacks"]),
+                "attacks_sets": len(full["attacks_sets"]),
+            }
+
+
+def test_attacks_sets_pages_in_both_modes():
+    raw = (ROOT / "data" / "exos4.txt").read_text(encoding="utf-8")
+    data, _ = parse_any({"input": raw})
+    for mode in ("full", "minimal"):
+        whole = run_pipeline(data, normalize_options({"attacks_sets_mode": mode}))["attacks_sets"]
+        assert len(whole) > 2
+        pages = []
+        for offset in range(0, len(whole) + 2, 2):
+            opts = normalize_options({"attacks_sets_mode": mode,
+                                      "attacks_sets_offset": offset, "attacks_sets_limit": 2})
+            page = run_pipeline(data, opts)["attacks_sets"]
+            assert page == whole[offset:offset + 2]
+            streamed = [{k: v for k, v in r.items() if k != "type"}
+                        for r in stream_pipeline(data, opts) if r["type"] == "attack_set"]
+            assert streamed == page
+            pages += page
+        assert pages == whole
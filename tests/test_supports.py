@@ -0,0 +1,43 @@
+from pathlib import Path
+import sys
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.aba_supports import SupportSet
+
+
+def mask(*bits):
+    m = 0
+    for b in bits:
+        m |= 1 << b
+    return m
+
+
+def test_support_set_keeps_antichain():
+    s = SupportSet()
+    assert s.add(mask(0, 1, 2))
+    assert s.add(mask(1, 3))
+    # sur-ensemble d'un support présent -> refusé
+    assert not s.add(mask(1, 2, 3))
+    # sous-ensemble -> inséré, et évince {0,1,2}
+    assert s.add(mask(0, 2))
+    assert set(s) == {mask(0, 2), mask(1, 3)}
+    assert s.covers(mask(0, 1, 2, 4))
+    assert not s.covers(mask(0, 1))
+
+    # le support vide domine tout
+    assert s.add(mask())
+    assert set(s) == {mask()}
+    assert not s.add(mask(5))
+
+
+def test_support_set_indexed_path():
+    # au-delà du seuil de balayage, covers/supersets passent par l'index par bit
+    s = SupportSet(mask(i, i + 1) for i in range(0, 80, 2))
+    assert len(s) == 40
+    assert s.covers(mask(10, 11, 50))
+    assert not s.covers(mask(11, 12))
+    assert s.add(mask(20))
+    assert mask(20, 21) not in s and len(s) == 40
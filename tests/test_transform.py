@@ -0,0 +1,83 @@
+from pathlib import Path
+import sys
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.aba_core import ABA
+from src.aba_graph import cyclic_components, dependency_graph, strongly_connected
+from src.aba_attacks import compute_attacks, compute_attacks_sets
+from src.aba_generate import generate
+from src.aba_transform import AtomicView, make_atomic_sensitive, make_non_circular
+from src.utils import parse_any
+
+
+def _supports(aba, lits):
+    out = {}
+    for a in aba.derive_arguments():
+        if a["conclusion"] in lits:
+            out.setdefault(a["conclusion"], set()).add(a["assumptions"])
+    return out
+
+
+def test_sccs_are_emitted_dependencies_first():
+    succ = dependency_graph([
+        {"head": "p", "body": ["q", "a"]},
+        {"head": "q", "body": ["r"]},
+        {"head": "r", "body": ["q"]},
+        {"head": "s", "body": ["s"]},
+    ], {"a"})
+    comps = [sorted(c) for c in strongly_connected(succ)]
+    assert comps.index(["q", "r"]) < comps.index(["p"])
+    assert sorted(sorted(c) for c in cyclic_components(succ)) == [["q", "r"], ["s"]]
+
+
+def test_non_circular_levels_only_cycles():
+    data = {
+        "literals": ["a", "b", "p", "q", "r", "t"],
+        "assumptions": ["a", "b"],
+        "contraries": {"a": "t", "b": "p"},
+        "rules": [
+            {"head": "p", "body": ["q", "a"]},
+            {"head": "q", "body": ["r"]},
+            {"head": "r", "body": ["q"]},
+            {"head": "r", "body": ["b"]},
+            {"head": "t", "body": ["p"]},
+        ],
+    }
+    aba = ABA.from_dict(data)
+    make_non_circular(aba)
+    # seuls q et r (cycle q <-> r) sont étagés
+    assert aba.literals - set(data["literals"]) == {"q^1", "r^1"}
+    assert {"head": "p", "body": ["q", "a"]} in aba.rules
+    assert _supports(aba, set(data["literals"])) == _supports(ABA.from_dict(data), set(data["literals"]))
+
+
+def test_non_circular_keeps_supports_on_examples():
+    for name in ("exos1.txt", "exos4.txt", "example1.txt"):
+        data, _ = parse_any({"input": (ROOT / "data" / name).read_text(encoding="utf-8")})
+        aba = ABA.from_dict(data)
+        make_non_circular(aba)
+        lits = set(data["literals"])
+        assert _supports(aba, lits) == _supports(ABA.from_dict(data), lits)
+
+
+def test_atomic_view_matches_materialized_transform():
+    for seed in range(15):
+        data = generate(n_literals=12, n_assumptions=3, depth=3,
+                        cycle_density=0.1 * (seed % 3), pref_density=0.7, seed=seed)
+        old = ABA.from_dict(data)
+        make_atomic_sensitive(old)
+        view = AtomicView(ABA.from_dict(data))
+
+        a_old, a_view = old.derive_arguments(), view.derive_arguments()
+        assert [(a.id, a["assumptions"], a["conclusion"]) for a in a_view] == \
+               [(a.id, a["assumptions"], a["conclusion"]) for a in a_old]
+        atk = compute_attacks(old, a_old, use_preferences=True)
+        assert compute_attacks(view, a_view, use_preferences=True) == atk
+        assert compute_attacks_sets(view, a_view, mode="minimal") == \
+               compute_attacks_sets(old, a_old, mode="minimal")
+        # rien n'est matérialisé avant l'export du cadre
+        assert view._frame is None
+        assert view.export_results(a_view, atk) == old.export_results(a_old, atk)
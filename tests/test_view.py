@@ -0,0 +1,104 @@
+from pathlib import Path
+import sys
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.aba_generate import generate
+from src.aba_pipeline import normalize_options, run_pipeline, view_graph
+from src.aba_view import condense, graph_view, layered_layout
+
+DATA = {
+    "literals": ["a", "b", "c", "p", "q", "r", "s", "t"],
+    "assumptions": ["a", "b", "c"],
+    "contraries": {"a": "r", "b": "s", "c": "t"},
+    "rules": [
+        {"head": "p", "body": ["q", "a"]},
+        {"head": "q", "body": []},
+        {"head": "r", "body": ["b", "c"]},
+        {"head": "t", "body": ["p", "c"]},
+        {"head": "s", "body": ["t"]},
+    ],
+    "preferences": {"a": 0, "b": 1},
+}
+
+
+def _full(data=DATA, opts=None):
+    res = run_pipeline(data, normalize_options({"attacks_sets_mode": "minimal", **(opts or {})}))
+    return res["arguments"], res["attacks"]
+
+
+def test_groups_partition_arguments_and_attacks():
+    args, atks = _full()
+    for by in ("argument", "support", "conclusion", "scc"):
+        v = condense(args, atks, by)
+        assert sorted(i for n in v["nodes"] for i in n["members"]) == sorted(a["id"] for a in args)
+        # chaque attaque compte une fois : interne à un nœud ou sur une arête
+        assert sum(n["internal"] for n in v["nodes"]) + sum(e["weight"] for e in v["edges"]) == len(atks)
+    by_arg = condense(args, atks, "argument")
+    # au niveau argument, seule une auto-attaque est interne
+    selfs = sum(t["attacker"] == t["target"] for t in atks)
+    assert len(by_arg["nodes"]) == len(args) and len(by_arg["edges"]) == len(atks) - selfs
+    by_concl = condense(args, atks, "conclusion")
+    assert {n["label"] for n in by_concl["nodes"]} == {a["conclusion"] for a in args}
+
+
+def test_assumption_summary():
+    args, atks = _full()
+    v = condense(args, atks, "assumption")
+    assert [n["id"] for n in v["nodes"]] == ["asm:a", "asm:b", "asm:c"]
+    edges = {(e["source"], e["target"]): e for e in v["edges"]}
+    # r <- b,c conclut le contraire de a
+    assert ("asm:b", "asm:a") in edges and ("asm:c", "asm:a") in edges
+
+
+def test_neighborhood_and_hidden():
+    args, atks = _full()
+    center = atks[0]["attacker"]
+    v = graph_view(args, atks, "argument", center=[center], radius=0)
+    assert [n["members"] for n in v["nodes"]] == [[center]]
+    assert v["nodes"][0]["hidden"] == sum(center in (t["attacker"], t["target"]) for t in atks)
+    near = graph_view(args, atks, "argument", center=[center], radius=1)
+    assert atks[0]["target"] in {i for n in near["nodes"] for i in n["members"]}
+    assert near["total"] == {"arguments": len(args), "attacks": len(atks)}
+
+
+def test_auto_lod_and_truncation():
+    data = generate(seed=1, n_literals=60, n_assumptions=8, depth=4, pref_density=0.5)
+    args, atks = _full(data)
+    assert len(args) > 20
+    v = graph_view(args, atks, "auto", max_nodes=len(args))
+    assert v["group"] == "argument" and "truncated" not in v
+    small = graph_view(args, atks, "auto", max_nodes=5)
+    assert len(small["nodes"]) <= 5
+    if "truncated" in small:
+        shown = sum(n["size"] for n in small["nodes"])
+        assert shown + small["truncated"]["arguments"] == len(args)
+    # même vue par le pipeline (positions comprises)
+    assert view_graph(data, normalize_options({}), "auto", max_nodes=5) == small
+
+
+def test_layered_layout_puts_attackers_above():
+    nodes = [{"id": k} for k in "abcd"]
+    edges = [{"source": "a", "target": "b"}, {"source": "b", "target": "c"},
+             {"source": "c", "target": "b"}, {"source": "c", "target": "d"}]
+    layered_layout(nodes, edges)
+    y = {n["id"]: n["y"] for n in nodes}
+    # b et c forment un cycle : même couche
+    assert y["a"] < y["b"] == y["c"] < y["d"]
+    assert len({(n["x"], n["y"]) for n in nodes}) == 4
+
+
+def test_hidden_counts_all_members(monkeypatch):
+    import src.aba_view as view
+    args, atks = _full()
+    center = atks[0]["attacker"]
+    # deux membres listés au plus : "hidden" reste calculé sur tous les membres
+    monkeypatch.setattr(view, "MAX_MEMBERS", 2)
+    full = graph_view(args, atks, "argument", center=[center], radius=1)
+    ids = {i for n in full["nodes"] for i in n["members"]}
+    expected = sum((t["attacker"] in ids) != (t["target"] in ids) for t in atks)
+    for by in ("support", "conclusion", "scc"):
+        v = graph_view(args, atks, by, center=[center], radius=1)
+        assert sum(n["hidden"] for n in v["nodes"]) == expected
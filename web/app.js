@@ -51,6 +51,11 @@
 // Configuration
 // =============================
 const ENDPOINT = '/api/aba/run';
+// vue condensée du graphe (regroupement, voisinage, coordonnées calculées côté serveur)
+const GRAPH_ENDPOINT = '/api/aba/graph';
+const GRAPH_MAX_NODES = 200;
+// au-delà, les tableaux (payload complet de ENDPOINT) ne sont chargés qu'à la demande
+const TABLES_AUTO_MAX = 500;
 
 const elInput    = document.getElementById('inputJson');
 const elFile     = document.getElementById('fileInput');
@@ -77,7 +82,10 @@ const BTN = {
   rotL:    document.getElementById('btnRotateL'),
   rotR:    document.getElementById('btnRotateR'),
   relayout:document.getElementById('btnRelayout'),
+  overview:document.getElementById('btnOverview'),
 };
+const elGroup     = document.getElementById('graphGroup');
+const elGraphInfo = document.getElementById('graphInfo');
 
 // =============================
 // Exemple par défaut
@@ -135,28 +143,55 @@ async function runAba() {
   setStatus('Calcul en cours…');
 
   try {
-    const resp = await fetch(ENDPOINT, {
-      method: 'POST',
-      headers: { 'Content-Type': 'application/json' },
-      body: JSON.stringify(payload),
-    });
-
-    if (!resp.ok) {
-      const txt = await resp.text().catch(()=> '');
-      setStatus(`Erreur ${resp.status}: ${txt || resp.statusText}`);
-      return;
+    // d'abord le graphe condensé (petit) : donne aussi la taille du cadre
+    __graphPayload = payload;
+    const g = await loadGraph(null);
+    if (!g) return;
+
+    const n = g.total?.arguments ?? 0;
+    if (n <= TABLES_AUTO_MAX) {
+      await loadTables(payload);
+    } else {
+      deferTables(payload, n, g.total?.attacks ?? 0);
+      setStatus('Terminé');
     }
-
-    const out = await resp.json();
-    setStatus('Terminé');
-
-    const view = buildViewModel(out);
-    renderAll(view);
   } catch (e) {
     setStatus(`Erreur réseau : ${e?.message ?? e}`);
   }
 }
 
+// tableaux : arguments et attaques complets (ENDPOINT)
+async function loadTables(payload) {
+  setStatus('Chargement des tableaux…');
+  const resp = await fetch(ENDPOINT, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify(payload),
+  });
+
+  if (!resp.ok) {
+    const txt = await resp.text().catch(()=> '');
+    setStatus(`Erreur ${resp.status}: ${txt || resp.statusText}`);
+    return;
+  }
+
+  const out = await resp.json();
+  setStatus('Terminé');
+  renderAll(buildViewModel(out));
+}
+
+function deferTables(payload, nArgs, nAtks) {
+  if (tblWrap) tblWrap.style.display = 'none';
+  if (tblBody) tblBody.innerHTML = '';
+  elAtks.innerHTML = '';
+  elArgs.innerHTML = '';
+  const btn = document.createElement('button');
+  btn.className = 'secondary';
+  btn.textContent = `Afficher les tableaux (${nArgs} arguments, ${nAtks} attaques)`;
+  btn.onclick = () => loadTables(payload).catch(e => setStatus(` ${e?.message ?? e}`));
+  elArgs.appendChild(btn);
+}
+
 // =============================
 // Adaptation backend -> vue
 // =============================
@@ -175,10 +210,6 @@ function buildViewModel(j) {
   // id -> argument
   const id2arg = new Map(args.map(a => [a.id, a]));
 
-  // Graphe (attaques entre arguments)
-  const nodes = args.map(a => ({ data: { id: String(a.id), label: String(a.conclusion) } }));
-  const edges = atks.map(e => ({ data: { source: String(e.attacker), target: String(e.target) } }));
-
   // Liste arguments
   const argList = args.map(a => ({
     id: a.id,
@@ -224,7 +255,6 @@ function buildViewModel(j) {
     argList,
     atkList,
     prefRows,                 // lignes “préférences” SANS le 'both'
-    graph: { nodes, edges },
     id2arg,
     opts,
   };
@@ -322,20 +352,85 @@ function renderAttacks(view) {
 }
 
 // =============================
-// Graphe Cytoscape (toolbar OK)
+// Graphe Cytoscape (vue condensée, positions du serveur)
 // =============================
 let __cy = null;
+let __graphPayload = null;   // dernière entrée calculée (input + __options)
+let __graphFocus = null;     // {center, radius} ou null (vue d'ensemble)
+
+/**
+ * /api/aba/graph :
+ * - nodes: [{id, label, size, members:[ids], internal, x, y, hidden?}]
+ * - edges: [{source, target, weight, normal?, reverse?}]
+ * - total: {arguments, attacks}, truncated?: {nodes, arguments}
+ */
+async function loadGraph(focus = __graphFocus) {
+  if (!__graphPayload) return null;
+  __graphFocus = focus;
+  const body = {
+    ...__graphPayload,
+    group: elGroup ? elGroup.value : 'auto',
+    max_nodes: GRAPH_MAX_NODES,
+    ...(focus || {}),
+  };
+  const resp = await fetch(GRAPH_ENDPOINT, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify(body),
+  });
+  if (!resp.ok) {
+    const txt = await resp.text().catch(()=> '');
+    setStatus(`Erreur graphe ${resp.status}: ${txt || resp.statusText}`);
+    return null;
+  }
+  const g = await resp.json();
+  renderGraph2D(g);
+  return g;
+}
 
-function renderGraph2D(view) {
+function graphElements(g) {
+  const nodes = (g?.nodes || []).map(n => ({
+    data: {
+      id: n.id,
+      label: n.size > 1 ? `${n.label} ×${n.size}` : n.label,
+      size: n.size,
+      members: n.members,
+      internal: n.internal || 0,
+      hidden: n.hidden || 0,
+    },
+    position: { x: n.x || 0, y: n.y || 0 },
+  }));
+  const edges = (g?.edges || []).map(e => ({
+    data: {
+      id: `${e.source}->${e.target}`,
+      source: e.source,
+      target: e.target,
+      weight: e.weight,
+      kind: (e.reverse || 0) > (e.normal || 0) ? 'reverse' : 'normal',
+    },
+  }));
+  return { nodes, edges };
+}
+
+function graphInfo(g) {
+  if (!elGraphInfo) return;
+  const t = g?.total || {};
+  let txt = `${(g?.nodes || []).length} nœuds (${g?.group}) — ${t.arguments ?? 0} arguments, ${t.attacks ?? 0} attaques`;
+  if (g?.truncated) txt += ` — ${g.truncated.nodes} nœuds omis`;
+  if (__graphFocus) txt += ' — voisinage';
+  elGraphInfo.textContent = txt;
+}
+
+function renderGraph2D(g) {
   const el = document.getElementById('graph2d');
   el.innerHTML = ''; // reset
 
-  const nodes = view?.graph?.nodes || [];
-  const edges = view?.graph?.edges || [];
+  const elements = graphElements(g);
+  const positions = Object.fromEntries(elements.nodes.map(n => [n.data.id, n.position]));
 
   __cy = cytoscape({
     container: el,
-    elements: { nodes, edges },
+    elements,
     style: [
       {
         selector: 'node',
@@ -353,19 +448,38 @@ function renderGraph2D(view) {
           'border-color': '#444'
         }
       },
+      // groupe : plus gros, double-clic pour l'ouvrir
+      { selector: 'node[size > 1]', style: { 'background-color': '#c9d6ea', 'border-width': 2 } },
+      // attaques internes au nœud
+      { selector: 'node[internal > 0]', style: { 'border-color': '#c0352a' } },
+      // voisins hors de la vue
+      { selector: 'node[hidden > 0]', style: { 'border-style': 'dashed' } },
       {
         selector: 'edge',
         style: {
           'curve-style': 'bezier',
           'target-arrow-shape': 'triangle',
           'arrow-scale': 1.2,
-          'width': 1,
+          'width': 'mapData(weight, 1, 50, 1, 6)',
           'line-color': '#b0b4b9',
           'target-arrow-color': '#b0b4b9'
         }
-      }
+      },
+      { selector: 'edge[kind = "reverse"]', style: { 'line-style': 'dashed' } }
     ],
-    layout: { name: 'cose', animate: true, fit: true, padding: 30 }
+    // positions calculées par le serveur : pas de layout animé côté navigateur
+    layout: { name: 'preset', fit: true, padding: 30 }
+  });
+  graphInfo(g);
+
+  // double-clic : ouvrir un groupe (ses membres) ou le voisinage d'un argument
+  __cy.on('dbltap', 'node', ev => {
+    const d = ev.target.data();
+    const focus = d.size > 1 || (elGroup && elGroup.value === 'assumption')
+      ? { center: d.members, radius: 0 }
+      : { center: d.members, radius: 1 };
+    if (elGroup && elGroup.value !== 'auto') elGroup.value = 'auto';
+    loadGraph(focus).catch(e => setStatus(` ${e?.message ?? e}`));
   });
 
   // Toolbar handlers
@@ -377,7 +491,8 @@ function renderGraph2D(view) {
   BTN.rotR.onclick    = () => rotateGraph(15);
   BTN.relayout.onclick= () => {
     if (!__cy) return;
-    __cy.layout({ name: 'cose', animate: true, fit: true, padding: 30 }).run();
+    // retour aux positions calculées par le serveur
+    __cy.layout({ name: 'preset', positions: n => positions[n.id()], fit: true, padding: 30 }).run();
   };
 
   // Rotation autour du centre des nœuds
@@ -404,10 +519,12 @@ function renderGraph2D(view) {
   }
 }
 
+if (BTN.overview) BTN.overview.onclick = () => loadGraph(null).catch(e => setStatus(` ${e?.message ?? e}`));
+if (elGroup) elGroup.addEventListener('change', () => loadGraph().catch(e => setStatus(` ${e?.message ?? e}`)));
+
 function renderAll(view) {
   renderArguments(view);
   renderAttacks(view);
-  renderGraph2D(view);
 }
 
 // =============================